@@ -51,6 +51,7 @@ a = Analysis(
         'nbclient',
         'nbconvert',
         'nbformat',
+        'numpy',
         'outcome',
         'packaging',
         'pandocfilters',
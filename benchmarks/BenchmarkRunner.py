@@ -0,0 +1,285 @@
+"""
+Benchmarks PlayManager against a SyntheticSportsbook and compares the results with a stored baseline.
+
+Run from the project root, e.g.:
+    python benchmarks/BenchmarkRunner.py --mode snapshot --leagues 10 --games 8 --rows 20 --cycles 50
+    python benchmarks/BenchmarkRunner.py --mode snapshot --save-baseline
+    python benchmarks/BenchmarkRunner.py --mode snapshot --lean-profile
+    python benchmarks/BenchmarkRunner.py --mode snapshot --compare-profiles
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import psutil
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from DriverLauncher import DriverLauncher  # noqa: E402
+from PlayManager import PlayManager  # noqa: E402
+from TotalsRule import TotalsRule  # noqa: E402
+from SyntheticSportsbook import SyntheticSportsbook  # noqa: E402
+
+BASELINES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+# Allowed growth of each metric over its baseline before it is reported as a regression.
+REGRESSION_TOLERANCES = {
+    'cycle_latency_p50_ms': 0.20,
+    'cycle_latency_p95_ms': 0.30,
+    'round_trips_per_cycle': 0.10,
+    'totals_search_us': 0.30,
+    'scrapper_cpu_sec_per_cycle': 0.30,
+    'browser_cpu_sec_per_cycle': 0.30,
+    'renderer_rss_mb': 0.20,
+}
+
+# Metrics the browser profile affects, reported before and after by --compare-profiles.
+PROFILE_METRICS = ('page_load_ms', 'renderer_rss_mb', 'browser_rss_mb', 'browser_cpu_sec_per_cycle',
+                   'cycle_latency_p50_ms')
+
+
+def profile_changes(default_results, lean_results):
+    """:return: a line per metric of PROFILE_METRICS, from its value with the default profile to the lean one."""
+    lines = []
+    for metric in PROFILE_METRICS:
+        before, after = default_results.get(metric), lean_results.get(metric)
+        if before is None or after is None:
+            continue
+        change = f' ({(after - before) / before:+.0%})' if before else ''
+        lines.append(f'{metric}: {before} -> {after}{change}')
+    return lines
+
+
+class BenchmarkRunner:
+
+    MODES = ('legacy', 'snapshot', 'incremental')
+
+    BROWSER_ARGUMENTS = ['--headless', '--no-sandbox', '--disable-dev-shm-usage', '--disable-gpu',
+                         '--disable-software-rasterizer']
+
+    NAVIGATION_TIME_SCRIPT = """
+        const navigation = performance.getEntriesByType('navigation')[0];
+        return navigation ? navigation.duration : null;
+    """
+
+    def __init__(self, logger, config, mode, leagues, games_per_league, odds_rows, score_churn_per_sec,
+                 odds_churn_per_sec, cycles, seed, lean_profile=False):
+        self.logger = logger
+        self.config = config
+        self.mode = mode
+        self.lean_profile = lean_profile
+        self.cycles = cycles
+        self.seed = seed
+        self.odds_rows = odds_rows
+        self.sportsbook = SyntheticSportsbook(config['elements'], leagues=leagues, games_per_league=games_per_league,
+                                              odds_rows=odds_rows, score_churn_per_sec=score_churn_per_sec,
+                                              odds_churn_per_sec=odds_churn_per_sec, seed=seed)
+        self.scenario = (f'{mode}-{leagues}x{games_per_league}x{odds_rows}'
+                         f'-s{score_churn_per_sec:g}-o{odds_churn_per_sec:g}{"-lean" if lean_profile else ""}')
+
+    def create_driver(self):
+        """Chrome with the browser_profile of the config when benchmarking the lean profile, else its defaults."""
+        profile = dict(self.config['browser_profile'], lean=True) if self.lean_profile else None
+        launcher = DriverLauncher(self.logger, platform.system(), self.BROWSER_ARGUMENTS, max_attempts=1,
+                                  state_path=os.path.join(tempfile.gettempdir(), 'benchmark-webdriver.json'),
+                                  profile=profile)
+        driver = webdriver.Chrome(service=webdriver.ChromeService(),
+                                  options=launcher.options(ChromeOptions(), 'chrome'))
+        launcher.block_resources(driver)
+        return driver
+
+    @staticmethod
+    def browser_processes(driver):
+        try:
+            service = psutil.Process(driver.service.process.pid)
+            return [service] + service.children(recursive=True)
+        except (AttributeError, psutil.Error):
+            return []
+
+    @staticmethod
+    def renderer_processes(processes):
+        renderers = []
+        for process in processes:
+            try:
+                if '--type=renderer' in process.cmdline():
+                    renderers.append(process)
+            except psutil.Error:
+                pass
+        return renderers
+
+    @staticmethod
+    def cpu_seconds(processes):
+        total = 0.0
+        for process in processes:
+            try:
+                times = process.cpu_times()
+                total += times.user + times.system
+            except psutil.Error:
+                pass
+        return total
+
+    @staticmethod
+    def rss_mb(processes):
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass
+        return round(total / (1024 * 1024), 1)
+
+    @staticmethod
+    def percentile(values, fraction):
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+    def benchmark_totals_search(self, repeats=2000):
+        """Micro benchmark of the totals search over a table of odds_rows rows, in microseconds per search."""
+        rule = TotalsRule(self.config['point_difference'], self.config['elements'])
+        generator = random.Random(self.seed)
+        rows = [(index, 150.5 + 2 * index, round(generator.uniform(1.5, 2.1), 2), round(generator.uniform(1.5, 2.1), 2))
+                for index in range(self.odds_rows)]
+        started = time.perf_counter()
+        for _ in range(repeats):
+            rule.select_row(rows, 150.5)
+        return round((time.perf_counter() - started) / repeats * 1e6, 2)
+
+    def run(self):
+        self.sportsbook.start()
+        driver = self.create_driver()
+        try:
+            manager = PlayManager(driver=driver, logger=self.logger, max_try_count=self.config['max_retry_number'],
+                                  elements=self.sportsbook.elements_for(self.config['elements']),
+                                  point_difference=self.config['point_difference'],
+                                  refreshTime=self.config['time_between_refreshes_in_sec'], game_window=None,
+                                  use_dom_snapshot=self.mode != 'legacy', use_change_feed=self.mode == 'incremental',
+                                  full_resync_interval=self.config['full_resync_interval_in_cycles'])
+            if not manager.login(self.sportsbook.url(SyntheticSportsbook.LOGIN_PATH),
+                                 self.sportsbook.url(self.config['elements']['consts']['live_events_suffix']),
+                                 'benchmark', 'benchmark'):
+                raise RuntimeError('Could not open the synthetic sportsbook.')
+            page_load_ms = driver.execute_script(self.NAVIGATION_TIME_SCRIPT)
+
+            scrapper = [psutil.Process()]
+            browser = self.browser_processes(driver)
+            scrapper_cpu, browser_cpu = self.cpu_seconds(scrapper), self.cpu_seconds(browser)
+            latencies, round_trips, mark_times = [], [], {}
+            started = time.perf_counter()
+            for cycle in range(self.cycles):
+                driver_calls = manager.driver_calls.calls
+                cycle_started = time.perf_counter()
+                manager.run_cycle()
+                latencies.append((time.perf_counter() - cycle_started) * 1000)
+                round_trips.append(manager.driver_calls.calls - driver_calls)
+                for game_key in manager.marked_games:
+                    mark_times.setdefault(game_key, time.perf_counter() - started)
+                self.logger.info(f'Cycle {cycle + 1}/{self.cycles}: {latencies[-1]:.0f} ms, '
+                                 f'{round_trips[-1]} round trips')
+
+            scrapper_cpu = self.cpu_seconds(scrapper) - scrapper_cpu
+            browser_cpu = self.cpu_seconds(browser) - browser_cpu
+            return {
+                'scenario': self.scenario,
+                'cycles': self.cycles,
+                'games': sum(len(games) for games in manager.basketballLeagues.values()),
+                'cycle_latency_p50_ms': round(self.percentile(latencies, 0.50), 1),
+                'cycle_latency_p95_ms': round(self.percentile(latencies, 0.95), 1),
+                'cycle_latency_p99_ms': round(self.percentile(latencies, 0.99), 1),
+                'cycle_latency_max_ms': round(max(latencies), 1),
+                'round_trips_per_cycle': round(statistics.mean(round_trips), 1),
+                'round_trips_max': max(round_trips),
+                'scrapper_cpu_sec_per_cycle': round(scrapper_cpu / self.cycles, 4),
+                'browser_cpu_sec_per_cycle': round(browser_cpu / self.cycles, 4),
+                'scrapper_rss_mb': self.rss_mb(scrapper),
+                'browser_rss_mb': self.rss_mb(browser),
+                'renderer_rss_mb': self.rss_mb(self.renderer_processes(self.browser_processes(driver))),
+                'page_load_ms': round(page_load_ms, 1) if page_load_ms is not None else None,
+                'marked_games': len(mark_times),
+                'time_to_first_mark_sec': round(min(mark_times.values()), 2) if mark_times else None,
+                'time_to_mark_p50_sec': round(self.percentile(list(mark_times.values()), 0.50), 2)
+                if mark_times else None,
+                'totals_search_us': self.benchmark_totals_search(),
+            }
+        finally:
+            driver.quit()
+            self.sportsbook.stop()
+
+    def baseline_path(self):
+        return os.path.join(BASELINES_DIR, f'{self.scenario}.json')
+
+    def save_baseline(self, results):
+        os.makedirs(BASELINES_DIR, exist_ok=True)
+        with open(self.baseline_path(), 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+        self.logger.info(f'Baseline saved to {self.baseline_path()}')
+
+    def compare_with_baseline(self, results):
+        """:return: the metrics that grew over their baseline by more than their tolerance."""
+        if not os.path.exists(self.baseline_path()):
+            self.logger.warning(f'No baseline for scenario {self.scenario}, run with --save-baseline to store one.')
+            return []
+        with open(self.baseline_path(), 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = []
+        for metric, tolerance in REGRESSION_TOLERANCES.items():
+            if baseline.get(metric) and results[metric] > baseline[metric] * (1 + tolerance):
+                regressions.append(f'{metric}: {baseline[metric]} -> {results[metric]}')
+        return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark PlayManager against a synthetic sportsbook.')
+    parser.add_argument('--config', default=os.path.join('assets', 'config.json'))
+    parser.add_argument('--mode', choices=BenchmarkRunner.MODES, default='snapshot')
+    parser.add_argument('--leagues', type=int, default=10)
+    parser.add_argument('--games', type=int, default=8, help='games per league')
+    parser.add_argument('--rows', type=int, default=20, help='rows of every total table')
+    parser.add_argument('--score-churn', type=float, default=0.2, help='chance per second of a game to score')
+    parser.add_argument('--odds-churn', type=float, default=0.1, help='chance per second of a total table to move')
+    parser.add_argument('--cycles', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--lean-profile', action='store_true',
+                        help='run Chrome with the lean browser_profile of the config instead of its defaults')
+    parser.add_argument('--compare-profiles', action='store_true',
+                        help='run the scenario with the default and the lean profile and report the difference')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger('benchmark')
+    with open(args.config, 'r', encoding='utf-8') as file:
+        config = json.load(file)
+
+    def benchmark(lean_profile):
+        runner = BenchmarkRunner(logger, config, args.mode, args.leagues, args.games, args.rows, args.score_churn,
+                                 args.odds_churn, args.cycles, args.seed, lean_profile)
+        results = runner.run()
+        print(json.dumps(results, indent=2))
+        # The first run of a scenario on a machine is its baseline, the latencies of other machines don't compare
+        if args.save_baseline or not os.path.exists(runner.baseline_path()):
+            runner.save_baseline(results)
+            return results, []
+        return results, runner.compare_with_baseline(results)
+
+    runs = [benchmark(lean_profile) for lean_profile in ([False, True] if args.compare_profiles
+                                                         else [args.lean_profile])]
+    if args.compare_profiles:
+        for line in profile_changes(runs[0][0], runs[1][0]):
+            logger.info(f'Lean profile {line}')
+    regressions = [regression for _, run_regressions in runs for regression in run_regressions]
+    for regression in regressions:
+        logger.error(f'Regression in {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
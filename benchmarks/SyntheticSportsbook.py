@@ -0,0 +1,219 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+
+class SyntheticSportsbook:
+    """
+    Local HTTP stand-in of the live basketball page built from the class names of config['elements']['consts'].
+    The page holds a configurable number of leagues, games and total table rows, and its own script moves the
+    scores, clocks and odds at the configured churn rates. A clicked game shows its total table, as on the site.
+    The page is generated from a seed, so two runs with the same parameters see the same games and churn.
+    """
+
+    LOGIN_PATH = '/login'
+    SECTION_ID = 'synthetic-basketball'
+    SECTION_XPATH = f"//div[@id='{SECTION_ID}']"
+
+    PAGE_CONSTS = ['leagues_section_class', 'leagues_header_class', 'collapsed_league_class', 'games_in_league_class',
+                   'first_team_name_class', 'second_team_name_class', 'game_scores_pair_section',
+                   'quarter_number_class', 'time_left_class', 'total_table_class', 'show_text_value',
+                   'table_header_class', 'table_header_text_class', 'table_text_value', 'table_rows_class',
+                   'table_row_total_score_class', 'table_row_over_score_class', 'table_row_under_score_class']
+
+    PAGE_SCRIPT = """
+        (function () {
+            const params = %s;
+            const consts = params.consts;
+            let seed = params.seed;
+            const random = () => {
+                // mulberry32, so the same seed gives the same page and churn
+                seed = (seed + 0x6D2B79F5) | 0;
+                let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+                t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+                return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+            };
+            const element = (tag, className, text) => {
+                const node = document.createElement(tag);
+                if (className) {
+                    node.className = className;
+                }
+                if (text !== undefined) {
+                    node.textContent = text;
+                }
+                return node;
+            };
+            const clock = (seconds) => String(Math.floor(seconds / 60)).padStart(2, '0') + ':' +
+                String(seconds %% 60).padStart(2, '0');
+            const quarters = ['1Q', '2Q', '3Q', '4Q'];
+
+            const section = document.getElementById(params.section_id);
+            const games = [];
+            for (let l = 0; l < params.leagues; l++) {
+                const league = element('div', consts.leagues_section_class);
+                // The scrapper treats headers carrying collapsed_league_class as expanded and clicks the others.
+                const header = element('div', consts.leagues_header_class + ' ' + consts.collapsed_league_class,
+                    'League ' + (l + 1));
+                header.addEventListener('click', () => header.classList.toggle(consts.collapsed_league_class));
+                league.appendChild(header);
+                for (let g = 0; g < params.games_per_league; g++) {
+                    const game = {
+                        first: 'Home ' + (l + 1) + '-' + (g + 1),
+                        second: 'Away ' + (l + 1) + '-' + (g + 1),
+                        scores: [Math.floor(random() * 60), Math.floor(random() * 60)],
+                        quarter: Math.floor(random() * 4),
+                        seconds: 1 + Math.floor(random() * 600),
+                        base: 140 + Math.floor(random() * 40) + 0.5,
+                        unders: []
+                    };
+                    for (let r = 0; r < params.odds_rows; r++) {
+                        game.unders.push(1.5 + Math.round(random() * 60) / 100);
+                    }
+                    game.node = element('div', consts.games_in_league_class);
+                    game.node.appendChild(element('span', consts.first_team_name_class, game.first));
+                    game.node.appendChild(element('span', consts.second_team_name_class, game.second));
+                    game.scoreNodes = [element('span', consts.game_scores_pair_section, game.scores[0]),
+                                       element('span', consts.game_scores_pair_section, game.scores[1])];
+                    game.scoreNodes.forEach((node) => game.node.appendChild(node));
+                    game.quarterNode = element('span', consts.quarter_number_class, quarters[game.quarter]);
+                    game.clockNode = element('span', consts.time_left_class, clock(game.seconds));
+                    game.node.appendChild(game.quarterNode);
+                    game.node.appendChild(game.clockNode);
+                    game.node.addEventListener('click', () => showTable(game));
+                    league.appendChild(game.node);
+                    games.push(game);
+                }
+                section.appendChild(league);
+            }
+
+            // The total table of the clicked game. Over and under values share a class name on the site, the over
+            // value is the first match and the under value the second, so both selectors find them here as well.
+            const table = element('div', consts.total_table_class + ' ' + consts.show_text_value);
+            const tableHeader = element('div', consts.table_header_class);
+            tableHeader.appendChild(element('span', consts.table_header_text_class, consts.table_text_value));
+            table.appendChild(tableHeader);
+            const rows = [];
+            for (let r = 0; r < params.odds_rows; r++) {
+                const row = element('div', consts.table_rows_class);
+                const cells = [element('span', consts.table_row_total_score_class, ''),
+                               element('span', consts.table_row_over_score_class + ' ' +
+                                   consts.table_row_under_score_class, ''),
+                               element('span', consts.table_row_under_score_class, '')];
+                cells.forEach((cell) => row.appendChild(cell));
+                table.appendChild(row);
+                rows.push(cells);
+            }
+            let shown = null;
+            const renderTable = () => {
+                shown.unders.forEach((under, r) => {
+                    rows[r][0].textContent = (shown.base + 2 * r).toFixed(1);
+                    rows[r][1].textContent = (3.7 - under).toFixed(2);
+                    rows[r][2].textContent = under.toFixed(2);
+                });
+            };
+            const showTable = (game) => {
+                shown = game;
+                renderTable();
+                if (!table.isConnected) {
+                    document.body.appendChild(table);
+                }
+            };
+
+            const tick = params.tick_ms / 1000;
+            setInterval(() => {
+                for (const game of games) {
+                    if (random() < params.score_churn_per_sec * tick) {
+                        const team = random() < 0.5 ? 0 : 1;
+                        game.scores[team] += 1 + Math.floor(random() * 3);
+                        game.scoreNodes[team].textContent = game.scores[team];
+                    }
+                    if (random() < params.odds_churn_per_sec * tick) {
+                        game.base += random() < 0.5 ? -1 : 1;
+                        game.unders = game.unders.map(() => 1.5 + Math.round(random() * 60) / 100);
+                        if (game === shown) {
+                            renderTable();
+                        }
+                    }
+                }
+            }, params.tick_ms);
+            setInterval(() => {
+                for (const game of games) {
+                    if (game.seconds > 0) {
+                        game.seconds -= 1;
+                    } else if (game.quarter < quarters.length - 1) {
+                        game.quarter += 1;
+                        game.seconds = 600;
+                        game.quarterNode.textContent = quarters[game.quarter];
+                    }
+                    game.clockNode.textContent = clock(game.seconds);
+                }
+            }, 1000);
+        })();
+    """
+
+    def __init__(self, elements, leagues=10, games_per_league=8, odds_rows=20, score_churn_per_sec=0.2,
+                 odds_churn_per_sec=0.1, seed=1, port=0, tick_ms=100):
+        """
+        :param score_churn_per_sec: chance per second of every game to score.
+        :param odds_churn_per_sec: chance per second of every game's total table to move.
+        :param port: local port to listen on, 0 for any free port.
+        """
+        self.consts = {key: elements['consts'][key] for key in self.PAGE_CONSTS}
+        self.live_events_path = elements['consts']['live_events_suffix']
+        self.login_username_name = elements['consts']['login_username_element_name']
+        self.login_password_name = elements['consts']['login_password_element_name']
+        self.params = {'consts': self.consts, 'section_id': self.SECTION_ID, 'leagues': leagues,
+                       'games_per_league': games_per_league, 'odds_rows': odds_rows,
+                       'score_churn_per_sec': score_churn_per_sec, 'odds_churn_per_sec': odds_churn_per_sec,
+                       'seed': seed, 'tick_ms': tick_ms}
+        self.port = port
+        self.server = None
+        self.thread = None
+
+    def elements_for(self, elements):
+        """A copy of the elements config pointing the basketball section at the synthetic page."""
+        consts = dict(elements['consts'], basketball_section_container_xpath=self.SECTION_XPATH)
+        return dict(elements, consts=consts)
+
+    def start(self):
+        sportsbook = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlparse(self.path).path
+                body = sportsbook.login_page() if path == sportsbook.LOGIN_PATH else sportsbook.live_page()
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def url(self, path='/'):
+        return f'http://127.0.0.1:{self.port}{path}'
+
+    def login_page(self):
+        return (f'<html><body><form onsubmit="return false">'
+                f'<input type="text" name="{self.login_username_name}">'
+                f'<input type="password" name="{self.login_password_name}">'
+                f'<input type="submit" value="Login"></form></body></html>')
+
+    def live_page(self):
+        return (f'<html><head><title>Synthetic sportsbook</title></head><body>'
+                f'<div data-sportid="2"></div><div id="{self.SECTION_ID}"></div>'
+                f'<script>{self.PAGE_SCRIPT % json.dumps(self.params)}</script></body></html>')
@@ -0,0 +1,181 @@
+import getpass
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+import uuid
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class AccessControl(QObject):
+    """
+    Verifies that the program may run from the access_allowed field of the AccessControl document.
+
+    A grant is cached in cache_path and is valid for cache_ttl seconds. It is signed with an HMAC of a random key
+    created on the first run in key_path, over the time it was verified at and the machine and user it was verified
+    for, so an edited file, a file copied from another machine or user, or one signed with anything shipped with the
+    program is ignored. The key is readable by the user running the program, so it keeps a user from sharing a grant,
+    not from forging their own one. While the grant is valid check() returns at once and the document is read again
+    in the background, then every revalidate_interval seconds. access_revoked is emitted when the document no longer
+    allows access, or when it could not be read since the cached grant expired: while the DB is unreachable the
+    program keeps running for at most cache_ttl seconds after the last successful read, so cache_ttl is kept close
+    to revalidate_interval.
+
+    The collection is only needed for the reads, so any object with a find_one() method, e.g. a collection of a
+    local mongod or an in-process stand-in, can be returned by collection_factory.
+    """
+    access_revoked = pyqtSignal()
+
+    KEY_SIZE = 32
+
+    def __init__(self, logger, collection_factory, cache_path, key_path, cache_ttl, revalidate_interval):
+        """
+        :param collection_factory: callable returning the AccessControl collection, called once on the first read.
+        :param key_path: file of the key the cached grant is signed with, created when missing.
+        """
+        super().__init__()
+        self.logger = logger
+        self.collection_factory = collection_factory
+        self.collection = None
+        self.cache_path = cache_path
+        self.key_path = key_path
+        self.signing_key = None
+        self.installation = f'{uuid.getnode():012x}:{getpass.getuser()}'
+        self.cache_ttl = cache_ttl
+        self.revalidate_interval = revalidate_interval
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.allowed = False
+
+    def check(self):
+        """:return: whether the program may run. Starts the background revalidation when it may."""
+        if self.cached_grant_time() is not None:
+            self.logger.info('Access granted by the cached verification, revalidating in the background...')
+            self.allowed = True
+            self.start(revalidate_now=True)
+            return True
+        self.allowed = bool(self.read_access())
+        if self.allowed:
+            self.write_cache()
+            self.start(revalidate_now=False)
+        return self.allowed
+
+    def start(self, revalidate_now):
+        with self.lock:
+            if self.thread:
+                return
+            self.thread = threading.Thread(target=self.run, args=(revalidate_now,), name='AccessControl', daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self, revalidate_now):
+        if revalidate_now:
+            self.revalidate()
+        while self.allowed and not self.stop_event.wait(self.revalidate_interval):
+            self.revalidate()
+
+    def revalidate(self):
+        allowed = self.read_access()
+        if allowed:
+            self.write_cache()
+        elif allowed is None and self.cached_grant_time() is not None:
+            return  # The DB is unreachable, the cached grant stays valid until it expires
+        else:
+            self.revoke()
+
+    def revoke(self):
+        self.logger.warning('Access was revoked. Stopping the program.')
+        self.allowed = False
+        self.delete_cache()
+        self.access_revoked.emit()
+
+    def read_access(self):
+        """:return: the access_allowed value of the document (False without one), None if it could not be read."""
+        try:
+            if self.collection is None:
+                self.collection = self.collection_factory()
+            access_document = self.collection.find_one()
+            return bool(access_document and access_document.get('access_allowed', False))
+        except Exception as err:
+            self.logger.error(f'Error during access verification: {err}')
+            return None
+
+    # Signed cache
+
+    def load_signing_key(self):
+        """:return: the key of this installation, created on the first run, or None if it can't be read or created."""
+        if self.signing_key is None:
+            try:
+                with open(self.key_path, 'rb') as file:
+                    key = file.read()
+                if len(key) == self.KEY_SIZE:
+                    self.signing_key = key
+            except FileNotFoundError:
+                pass
+            except OSError as err:
+                self.logger.warning(f'Could not read the access verification key: {err}')
+                return None
+        if self.signing_key is None:
+            # No key or a damaged one, the grants it signed are invalid either way
+            try:
+                os.makedirs(os.path.dirname(self.key_path) or '.', exist_ok=True)
+                key = os.urandom(self.KEY_SIZE)
+                temporary_path = self.key_path + '.tmp'
+                descriptor = os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(descriptor, 'wb') as file:
+                    file.write(key)
+                os.replace(temporary_path, self.key_path)
+                self.signing_key = key
+            except OSError as err:
+                self.logger.warning(f'Could not create the access verification key: {err}')
+        return self.signing_key
+
+    def signature(self, checked_at):
+        """:return: the signature of a grant verified at checked_at on this installation, None without a key."""
+        signing_key = self.load_signing_key()
+        if signing_key is None:
+            return None
+        message = f'access_allowed:{self.installation}:{checked_at!r}'.encode()
+        return hmac.new(signing_key, message, hashlib.sha256).hexdigest()
+
+    def cached_grant_time(self):
+        """:return: the time the cached grant was verified at if it is valid and not expired, else None."""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as file:
+                cache = json.load(file)
+            checked_at = cache['checked_at']
+            signature = self.signature(checked_at)
+            if (signature is not None and hmac.compare_digest(cache['signature'], signature)
+                    and 0 <= time.time() - checked_at < self.cache_ttl):
+                return checked_at
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def write_cache(self):
+        checked_at = time.time()
+        signature = self.signature(checked_at)
+        if signature is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            temporary_path = self.cache_path + '.tmp'
+            with open(temporary_path, 'w', encoding='utf-8') as file:
+                json.dump({'checked_at': checked_at, 'signature': signature}, file)
+            os.replace(temporary_path, self.cache_path)
+        except OSError as err:
+            self.logger.warning(f'Could not cache the access verification: {err}')
+
+    def delete_cache(self):
+        try:
+            os.remove(self.cache_path)
+        except FileNotFoundError:
+            pass
+        except OSError as err:
+            self.logger.warning(f'Could not delete the cached access verification: {err}')
@@ -0,0 +1,248 @@
+"""
+Replays the recorded games history through the marking rule for a grid of point_difference and min_under_value
+values, and reports per league how many games every pair marks, when in the game and how the marked lines ended.
+
+Run from the project root on a history directory written with the history config enabled, e.g.:
+    python src/Backtester.py --history history --from 2026-01-01 --to 2026-06-30 \
+        --point-difference 8:16:1 --min-under-value 1.7:1.95:0.05
+"""
+import argparse
+import copy
+import json
+import logging
+import os
+import statistics
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from GameState import GameSchema
+from HistoryStore import HistoryStore
+from TotalsRule import TotalsRule
+
+ODDS_DECIMALS = 3  # Precision of the totals and odds shown by the site
+
+
+def parse_grid(text):
+    """:return: the values of 'start:stop:step' (stop included) or of a comma separated list."""
+    if ':' in text:
+        start, stop, step = (float(value) for value in text.split(':'))
+        count = int(round((stop - start) / step)) + 1
+        return [round(start + index * step, 6) for index in range(count)]
+    return [float(value) for value in text.split(',')]
+
+
+def backtest_partition(path, elements, grid):
+    """
+    Backtests the games of one partition (a date and league) for every (point_difference, min_under_value) of the
+    grid. Runs in a worker process, so it only takes and returns plain values.
+
+    Like PlayManager, the first total of a game is the first row of the first total table read once the game has
+    started, and a game is marked on the first later table with a suitable row, after which it stays marked. A mark
+    is settled when the last recorded score of its game is at the end of the 4th quarter, and is won when the final
+    total stays under the selected line, at the under value of the line.
+    :return: (league name, {(point_difference, min_under_value): statistics})
+    """
+    schema = GameSchema(elements)
+    totals, dictionary = HistoryStore.load_partition(path, 'totals')
+    scores, _ = HistoryStore.load_partition(path, 'scores')
+    league_name = dictionary.get('league', os.path.basename(path))
+    quarters = dictionary.get('quarters', [])
+    empty = {'games': 0, 'marks': 0, 'settled': 0, 'wins': 0, 'losses': 0, 'pushes': 0, 'profit': 0.0,
+             'mark_quarters': {}, 'mark_seconds_left': []}
+    results = {params: copy.deepcopy(empty) for params in grid}
+    if not len(totals['time']) or not len(scores['time']):
+        return league_name, results
+
+    # Scores ordered by game then time, with the position of every game's rows
+    order = np.lexsort((scores['time'], scores['game']))
+    score_game, score_time = scores['game'][order], scores['time'][order]
+    score_quarter, score_seconds_left = scores['quarter'][order], scores['seconds_left'][order]
+    score_total = scores['first_team_score'][order].astype(np.int32) + scores['second_team_score'][order]
+    score_games, score_starts, score_counts = np.unique(score_game, return_index=True, return_counts=True)
+    score_ranges = {game: (start, start + count)
+                    for game, start, count in zip(score_games.tolist(), score_starts.tolist(), score_counts.tolist())}
+    ats_codes = [code for code, quarter in enumerate(quarters) if quarter == schema.ATS]
+    not_started = np.isin(score_quarter, ats_codes)
+
+    # Total tables: every table read is one snapshot, the rows sharing a game and a time
+    order = np.lexsort((totals['row_index'], totals['time'], totals['game']))
+    table_game, table_time = totals['game'][order], totals['time'][order]
+    # Stored as float32, rounded back to the values the live rule compared, e.g. 1.9 instead of 1.89999998
+    total, over, under = (np.round(totals[column][order].astype(np.float64), ODDS_DECIMALS).tolist()
+                          for column in ('total', 'over', 'under'))
+    rows = list(zip(totals['row_index'][order].tolist(), total, over, under))
+    boundaries = np.flatnonzero((np.diff(table_game) != 0) | (np.diff(table_time) != 0)) + 1
+    starts = np.concatenate(([0], boundaries)).tolist()
+    ends = np.concatenate((boundaries, [len(rows)])).tolist()
+
+    snapshots, first_totals, snapshot_games, snapshot_times = [], [], [], []
+    game_first_totals = {}
+    for start, end in zip(starts, ends):
+        game, read_time = int(table_game[start]), float(table_time[start])
+        if game not in score_ranges:
+            continue
+        if game not in game_first_totals:
+            low, high = score_ranges[game]
+            last_not_started = score_time[low:high][not_started[low:high]]
+            if (len(last_not_started) and read_time < last_not_started[-1]) or rows[start][0] != 0:
+                continue
+            game_first_totals[game] = rows[start][1]
+            continue
+        snapshots.append(rows[start:end])
+        first_totals.append(game_first_totals[game])
+        snapshot_games.append(game)
+        snapshot_times.append(read_time)
+
+    for (point_difference, min_under_value), result in results.items():
+        result['games'] = len(game_first_totals)
+        rule_elements = {'consts': dict(elements['consts'], min_under_value=min_under_value)}
+        selected_rows = TotalsRule(point_difference, rule_elements).select_rows(snapshots, first_totals)
+        marked = set()
+        for game, read_time, selected_row in zip(snapshot_games, snapshot_times, selected_rows):
+            if selected_row is None or game in marked:
+                continue
+            marked.add(game)
+            low, high = score_ranges[game]
+            position = low + max(0, int(np.searchsorted(score_time[low:high], read_time, side='right')) - 1)
+            quarter = quarters[score_quarter[position]] if score_quarter[position] < len(quarters) else ''
+            result['marks'] += 1
+            result['mark_quarters'][quarter] = result['mark_quarters'].get(quarter, 0) + 1
+            result['mark_seconds_left'].append(int(score_seconds_left[position]))
+
+            last = high - 1
+            if score_quarter[last] >= len(quarters) or quarters[score_quarter[last]] != schema.last_quarter \
+                    or score_seconds_left[last] != 0:
+                continue
+            line = selected_row[schema.total_text_value]
+            under_value = selected_row[elements['consts']['under_text_value']]
+            result['settled'] += 1
+            if score_total[last] < line:
+                result['wins'] += 1
+                result['profit'] += under_value - 1
+            elif score_total[last] > line:
+                result['losses'] += 1
+                result['profit'] -= 1
+            else:
+                result['pushes'] += 1
+    return league_name, results
+
+
+class Backtester:
+    """Runs backtest_partition over every partition of a date range on a process pool and aggregates per league."""
+
+    def __init__(self, logger, elements, directory, workers=None):
+        self.logger = logger
+        self.elements = elements
+        self.directory = directory
+        self.workers = workers or os.cpu_count()
+
+    def partitions(self, first_date, last_date, leagues=None):
+        if not os.path.isdir(self.directory):
+            return []
+        dates = sorted(name for name in os.listdir(self.directory)
+                       if (not first_date or name >= first_date) and (not last_date or name <= last_date))
+        paths = [path for date in dates for path in HistoryStore.partitions_of(self.directory, date)]
+        if leagues:
+            paths = [path for path in paths
+                     if HistoryStore.read_dictionary(path).get('league', os.path.basename(path)) in leagues]
+        return paths
+
+    def run(self, point_differences, min_under_values, first_date=None, last_date=None, leagues=None):
+        """:return: one report row per league and (point_difference, min_under_value), best profit first."""
+        grid = [(point_difference, min_under_value)
+                for point_difference in point_differences for min_under_value in min_under_values]
+        paths = self.partitions(first_date, last_date, leagues)
+        self.logger.info(f'Backtesting {len(grid)} parameter pairs over {len(paths)} partitions '
+                         f'on {self.workers} processes')
+        totals = {}  # (league_name, params) -> aggregated statistics
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(backtest_partition, path, self.elements, grid) for path in paths]
+            for path, future in zip(paths, futures):
+                try:
+                    league_name, results = future.result()
+                except Exception as e:
+                    self.logger.warning(f'Failed to backtest {path}: {e}')
+                    continue
+                for params, result in results.items():
+                    self.merge(totals.setdefault((league_name, params), {}), result)
+        return sorted((self.report_row(league_name, params, result)
+                       for (league_name, params), result in totals.items()),
+                      key=lambda row: (row['league'], -row['profit'], -row['marks']))
+
+    @staticmethod
+    def merge(total, result):
+        for key, value in result.items():
+            if isinstance(value, dict):
+                total[key] = dict(Counter(total.get(key, {})) + Counter(value))
+            else:
+                total[key] = total.get(key, type(value)()) + value
+
+    @staticmethod
+    def report_row(league_name, params, result):
+        point_difference, min_under_value = params
+        decided = result['wins'] + result['losses']
+        seconds_left = result['mark_seconds_left']
+        return {
+            'league': league_name,
+            'point_difference': point_difference,
+            'min_under_value': min_under_value,
+            'games': result['games'],
+            'marks': result['marks'],
+            'mark_rate': round(result['marks'] / result['games'], 3) if result['games'] else None,
+            'mark_quarters': result['mark_quarters'],
+            'mark_seconds_left_p50': statistics.median(seconds_left) if seconds_left else None,
+            'settled': result['settled'],
+            'wins': result['wins'],
+            'losses': result['losses'],
+            'pushes': result['pushes'],
+            'hit_rate': round(result['wins'] / decided, 3) if decided else None,
+            'profit': round(result['profit'], 2),
+            'roi': round(result['profit'] / result['settled'], 3) if result['settled'] else None,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest the marking rule on the recorded games history.')
+    parser.add_argument('--config', default=os.path.join('assets', 'config.json'))
+    parser.add_argument('--history', help='history directory, the history directory of the config by default')
+    parser.add_argument('--from', dest='first_date', help='first date, YYYY-MM-DD')
+    parser.add_argument('--to', dest='last_date', help='last date, YYYY-MM-DD')
+    parser.add_argument('--league', action='append', help='backtest only this league, may be repeated')
+    parser.add_argument('--point-difference', help='start:stop:step or a comma separated list, '
+                                                   'the configured value by default')
+    parser.add_argument('--min-under-value', help='start:stop:step or a comma separated list, '
+                                                  'the configured value by default')
+    parser.add_argument('--workers', type=int, help='worker processes, the CPU count by default')
+    parser.add_argument('--output', help='also write the report to this JSON file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger('backtest')
+    with open(args.config, 'r', encoding='utf-8') as file:
+        config = json.load(file)
+
+    point_differences = parse_grid(args.point_difference) if args.point_difference else [config['point_difference']]
+    min_under_values = parse_grid(args.min_under_value) if args.min_under_value \
+        else [config['elements']['consts']['min_under_value']]
+    backtester = Backtester(logger, config['elements'], args.history or config['history']['directory'], args.workers)
+    report = backtester.run(point_differences, min_under_values, args.first_date, args.last_date, args.league)
+
+    print(f'{"league":<30} {"diff":>6} {"under":>6} {"games":>6} {"marks":>6} {"settled":>7} {"hit":>6} '
+          f'{"profit":>8} {"roi":>7}')
+    for row in report:
+        print(f'{row["league"][:30]:<30} {row["point_difference"]:>6g} {row["min_under_value"]:>6g} '
+              f'{row["games"]:>6} {row["marks"]:>6} {row["settled"]:>7} '
+              f'{"-" if row["hit_rate"] is None else row["hit_rate"]:>6} {row["profit"]:>8} '
+              f'{"-" if row["roi"] is None else row["roi"]:>7}')
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        logger.info(f'Report written to {args.output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+from DomSnapshot import DomSnapshot
+
+
+class ChangeFeed:
+    """
+    Incremental change feed of the live events page. A MutationObserver injected into the page buffers the games
+    whose score, quarter or clock changed and whether the total table changed, and each drain returns only those.
+    """
+
+    MAX_BUFFERED_GAMES = 500
+
+    INSTALL_SCRIPT = """
+        const consts = arguments[0];
+        if (window.__sportScrapperFeed) {
+            window.__sportScrapperFeed.observer.disconnect();
+            delete window.__sportScrapperFeed;
+        }
+        const section = document.evaluate(consts.basketball_section_container_xpath, document, null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        if (!section) {
+            return false;
+        }
+        const gameSelector = '.' + CSS.escape(consts.games_in_league_class);
+        const tableSelector = '.' + CSS.escape(consts.total_table_class);
+        // Games or leagues appearing or disappearing can't be applied as a delta and need a full resync.
+        const isStructural = (node) => node.nodeType === Node.ELEMENT_NODE && (
+            node.classList.contains(consts.games_in_league_class) ||
+            node.classList.contains(consts.leagues_section_class) ||
+            node.getElementsByClassName(consts.games_in_league_class).length > 0);
+        const feed = {section: section, games: new Set(), structural: false, overflow: false, tablesChanged: false};
+        feed.observer = new MutationObserver((mutations) => {
+            for (const mutation of mutations) {
+                const target = mutation.target.nodeType === Node.ELEMENT_NODE ?
+                    mutation.target : mutation.target.parentElement;
+                if (!target) {
+                    continue;
+                }
+                if (target.closest(tableSelector)) {
+                    feed.tablesChanged = true;
+                    continue;
+                }
+                if (!section.contains(target)) {
+                    continue;
+                }
+                if (mutation.type === 'childList' && (Array.from(mutation.addedNodes).some(isStructural) ||
+                        Array.from(mutation.removedNodes).some(isStructural))) {
+                    feed.structural = true;
+                    continue;
+                }
+                const game = target.closest(gameSelector);
+                if (!game) {
+                    continue;
+                }
+                if (feed.games.size >= consts.max_buffered_games) {
+                    feed.overflow = true;
+                } else {
+                    feed.games.add(game);
+                }
+            }
+        });
+        feed.observer.observe(document.body, {childList: true, characterData: true, subtree: true});
+        window.__sportScrapperFeed = feed;
+        return true;
+    """
+
+    DRAIN_SCRIPT = """
+        const consts = arguments[0];
+    """ + DomSnapshot.READ_GAME_SCRIPT + """
+        const feed = window.__sportScrapperFeed;
+        if (!feed || !feed.section.isConnected) {
+            return null;
+        }
+        const leagueSelector = '.' + CSS.escape(consts.leagues_section_class);
+        const games = [];
+        for (const game of feed.games) {
+            const league = game.isConnected && game.closest(leagueSelector);
+            const header = league && league.getElementsByClassName(consts.leagues_header_class)[0];
+            if (!header) {
+                feed.structural = true;
+                continue;
+            }
+            const gameData = readGame(game);
+            gameData.league_name = header.innerText.trim();
+            games.push(gameData);
+        }
+        const delta = {
+            games: games,
+            structural: feed.structural,
+            overflow: feed.overflow,
+            tables_changed: feed.tablesChanged,
+            game_count: feed.section.getElementsByClassName(consts.games_in_league_class).length
+        };
+        feed.games.clear();
+        feed.structural = false;
+        feed.overflow = false;
+        feed.tablesChanged = false;
+        return delta;
+    """
+
+    def __init__(self, driver, logger, elements):
+        self.driver = driver
+        self.logger = logger
+        self.script_args = {key: elements['consts'][key] for key in DomSnapshot.SNAPSHOT_CONSTS}
+        self.script_args['total_table_class'] = elements['consts']['total_table_class']
+        self.script_args['max_buffered_games'] = self.MAX_BUFFERED_GAMES
+
+    def install(self):
+        """Injects the observer, replacing any previous one. Returns False if the basketball section is missing."""
+        self.logger.debug('Installing the live events change feed...')
+        return self.driver.execute_script(self.INSTALL_SCRIPT, self.script_args)
+
+    def drain(self):
+        """
+        :return: {'games', 'structural', 'overflow', 'tables_changed', 'game_count'} with the games changed since the
+                 last drain, read like DomSnapshot games plus their 'league_name'. None in case the observer is gone,
+                 e.g. after the page was reloaded.
+        """
+        return self.driver.execute_script(self.DRAIN_SCRIPT, self.script_args)
@@ -0,0 +1,44 @@
+import time
+
+
+class CircuitBreaker:
+    """
+    Skips the games or leagues that keep failing, so one broken element doesn't cost its retries every cycle.
+
+    After failure_threshold failures in a row the circuit of a key opens and allow() is False for cooldown seconds.
+    Then the key is tried again: a success closes the circuit, a failure opens it for another cooldown. Opened and
+    closed circuits are logged and counted in circuit_transitions_total by scope.
+    """
+
+    def __init__(self, logger, metrics, scope, failure_threshold, cooldown):
+        """:param scope: what the keys are, 'game' or 'league', used in the logs and metric labels."""
+        self.logger = logger
+        self.metrics = metrics
+        self.scope = scope
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = {}  # key -> failures in a row
+        self.open_until = {}  # key -> monotonic time the open circuit lets the key be tried again
+
+    def allow(self, key, now=None):
+        open_until = self.open_until.get(key)
+        return open_until is None or (now or time.monotonic()) >= open_until
+
+    def record_success(self, key):
+        self.failures.pop(key, None)
+        if self.open_until.pop(key, None) is not None:
+            self.logger.info(f'The {self.scope} {key} recovered, collecting it again.')
+            self.metrics.inc('circuit_transitions_total', scope=self.scope, state='closed')
+
+    def record_failure(self, key, now=None):
+        self.failures[key] = self.failures.get(key, 0) + 1
+        if self.failures[key] < self.failure_threshold:
+            return
+        self.open_until[key] = (now or time.monotonic()) + self.cooldown
+        self.logger.warning(f'The {self.scope} {key} failed {self.failures[key]} times in a row, '
+                            f'skipping it for {self.cooldown} seconds.')
+        self.metrics.inc('circuit_transitions_total', scope=self.scope, state='open')
+
+    def forget(self, key):
+        self.failures.pop(key, None)
+        self.open_until.pop(key, None)
@@ -0,0 +1,125 @@
+class DomSnapshot:
+    """Reads the live basketball section and the total table, each in a single execute_script round trip."""
+
+    # Shared by the scripts reading games, expects `consts` to hold the class names of SNAPSHOT_CONSTS.
+    READ_GAME_SCRIPT = """
+        const textOf = (root, className) => {
+            const element = root.getElementsByClassName(className)[0];
+            return element ? element.innerText.trim() : null;
+        };
+        const readGame = (game) => ({
+            element: game,
+            first_team: textOf(game, consts.first_team_name_class),
+            second_team: textOf(game, consts.second_team_name_class),
+            scores: Array.from(game.getElementsByClassName(consts.game_scores_pair_section),
+                score => score.innerText.trim()),
+            quarter_number: textOf(game, consts.quarter_number_class),
+            time_left: textOf(game, consts.time_left_class)
+        });
+    """
+
+    # The script receives the class names from config['elements']['consts'] and returns plain lists/dicts.
+    # DOM elements inside the result are returned by Selenium as WebElements, so callers can still click them.
+    SNAPSHOT_SCRIPT = """
+        const consts = arguments[0];
+    """ + READ_GAME_SCRIPT + """
+        const section = document.evaluate(consts.basketball_section_container_xpath, document, null,
+            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        if (!section) {
+            return null;
+        }
+        const leagues = [];
+        for (const league of section.getElementsByClassName(consts.leagues_section_class)) {
+            const header = league.getElementsByClassName(consts.leagues_header_class)[0];
+            if (!header) {
+                continue;
+            }
+            const games = Array.from(league.getElementsByClassName(consts.games_in_league_class), readGame);
+            leagues.push({
+                name: header.innerText.trim(),
+                header: header,
+                expanded: header.className.includes(consts.collapsed_league_class),
+                games: games
+            });
+        }
+        return leagues;
+    """
+
+    SNAPSHOT_CONSTS = ['basketball_section_container_xpath', 'leagues_section_class', 'leagues_header_class',
+                       'collapsed_league_class', 'games_in_league_class', 'first_team_name_class',
+                       'second_team_name_class', 'game_scores_pair_section', 'quarter_number_class',
+                       'time_left_class']
+
+    # Reads every row of the first total table whose header matches table_text_value in one pass.
+    # Over and under values share a class name, the over value is the first match and the under value the second.
+    TOTAL_TABLE_SCRIPT = """
+        const consts = arguments[0];
+        for (const table of document.getElementsByClassName(consts.total_table_class)) {
+            const header = table.getElementsByClassName(consts.table_header_class)[0];
+            const headerText = header && header.getElementsByClassName(consts.table_header_text_class)[0];
+            if (!headerText || headerText.innerText.trim() !== consts.table_text_value) {
+                continue;
+            }
+            const textOf = (element) => element ? element.innerText.trim() : null;
+            return {
+                element: table,
+                shown: table.className.includes(consts.show_text_value),
+                rows: Array.from(table.getElementsByClassName(consts.table_rows_class), row => [
+                    textOf(row.getElementsByClassName(consts.table_row_total_score_class)[0]),
+                    textOf(row.getElementsByClassName(consts.table_row_over_score_class)[0]),
+                    textOf(row.getElementsByClassName(consts.table_row_under_score_class)[1])
+                ])
+            };
+        }
+        return null;
+    """
+
+    TOTAL_TABLE_CONSTS = ['total_table_class', 'table_header_class', 'table_header_text_class', 'table_text_value',
+                          'show_text_value', 'table_rows_class', 'table_row_total_score_class',
+                          'table_row_over_score_class', 'table_row_under_score_class']
+
+    def __init__(self, driver, logger, elements, waits=None):
+        """:param waits: optional WaitEngine, to wait for the total table to expand after clicking it."""
+        self.driver = driver
+        self.logger = logger
+        self.waits = waits
+        self.script_args = {key: elements['consts'][key] for key in self.SNAPSHOT_CONSTS}
+        self.total_table_args = {key: elements['consts'][key] for key in self.TOTAL_TABLE_CONSTS}
+
+    def collect(self):
+        """
+        :return: a list of leagues, each {'name', 'header', 'expanded', 'games'} where every game is
+                 {'element', 'first_team', 'second_team', 'scores', 'quarter_number', 'time_left'}.
+                 None in case the basketball section is not on the page yet.
+        """
+        return self.driver.execute_script(self.SNAPSHOT_SCRIPT, self.script_args)
+
+    def table_expanded(self):
+        table = self.driver.execute_script(self.TOTAL_TABLE_SCRIPT, self.total_table_args)
+        return table if table and table['shown'] else None
+
+    def collect_total_rows(self):
+        """
+        Reads the whole total table of the opened game, expanding it first when needed.
+        :return: a list of (row_index, total, over, under) tuples of floats. Rows that cannot be parsed are
+                 skipped but keep their index. None in case the total table is not on the page.
+        """
+        table = self.driver.execute_script(self.TOTAL_TABLE_SCRIPT, self.total_table_args)
+        if table is None:
+            return None
+        if not table['shown']:
+            table['element'].click()
+            if self.waits:
+                table = self.waits.until('total_table_expanded', self.table_expanded, timeout=1)
+            else:
+                table = self.driver.execute_script(self.TOTAL_TABLE_SCRIPT, self.total_table_args)
+            if table is None:
+                return None
+
+        rows = []
+        for row_index, (total, over, under) in enumerate(table['rows']):
+            try:
+                rows.append((row_index, float(total), float(over), float(under)))
+            except (TypeError, ValueError):
+                self.logger.debug(f'Skipping unreadable total table row {row_index}: {total}, {over}, {under}')
+        return rows
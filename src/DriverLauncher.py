@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+import threading
+
+from selenium.common import WebDriverException
+
+
+class DriverLauncher:
+    """
+    Launches the WebDrivers of the program.
+
+    The backend that launched last time is tried first, so the fallback chain only runs when it stops working, and
+    the driver binary of every backend is resolved once and reused from then on, as long as it is still the same
+    file (size and SHA-256). Both are kept in state_path. prewarm() launches the first driver in a background thread
+    while the welcome window is shown, and the first launch() call takes it over.
+
+    Only the Selenium modules of the backends that are actually tried are imported, so the browsers of other
+    platforms and webdriver_manager cost nothing at startup.
+
+    The lean browser profile turns off the browser features the scrapping doesn't use and the throttling of
+    background tabs and timers, and blocks the configured resource types and URL patterns, e.g. trackers, at the
+    network layer of Chrome and Edge, so they are neither downloaded nor kept in memory.
+    """
+
+    FALLBACK_CHAINS = {
+        'Windows': ('chrome', 'edge', 'firefox'),
+        'Linux': ('chrome', 'firefox'),
+        'Darwin': ('chrome', 'safari', 'firefox'),
+    }
+
+    LEAN_ARGUMENTS = ('--disable-extensions', '--disable-component-update', '--disable-default-apps', '--disable-sync',
+                      '--disable-background-networking', '--disable-background-timer-throttling',
+                      '--disable-backgrounding-occluded-windows', '--disable-renderer-backgrounding',
+                      '--disable-features=Translate,MediaRouter,OptimizationHints,CalculateNativeWinOcclusion',
+                      '--no-first-run', '--mute-audio', '--autoplay-policy=user-gesture-required')
+
+    # URL patterns of Network.setBlockedURLs for the blocked_resource_types of the profile
+    RESOURCE_TYPE_PATTERNS = {
+        'image': ('*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.avif*', '*.ico*'),
+        'font': ('*.woff*', '*.ttf*', '*.otf*', '*.eot*'),
+        'media': ('*.mp4*', '*.webm*', '*.m3u8*', '*.mp3*', '*.ogg*'),
+    }
+
+    def __init__(self, logger, system_type, arguments, max_attempts, state_path, network_log=False, profile=None):
+        """
+        :param arguments: command line arguments of the browsers, e.g. --headless.
+        :param state_path: JSON file keeping the remembered backend and driver binaries across runs.
+        :param network_log: whether Chrome reports the network traffic in its performance log, for the NetworkFeed.
+        :param profile: the browser_profile config, the browser defaults if not given.
+        """
+        self.logger = logger
+        self.arguments = arguments
+        self.network_log = network_log
+        self.profile = profile or {'lean': False, 'page_load_strategy': 'normal', 'blocked_resource_types': [],
+                                   'blocked_url_patterns': []}
+        self.max_attempts = max_attempts
+        self.state_path = state_path
+        self.backends = self.FALLBACK_CHAINS.get(system_type, ())
+        self.lock = threading.Lock()
+        self.state = self.read_state()
+        self.prewarm_thread = None
+        self.prewarmed_driver = None
+
+    def prewarm(self):
+        """Starts launching the first driver in the background."""
+        if not self.prewarm_thread:
+            self.prewarm_thread = threading.Thread(target=self.run_prewarm, name='DriverPrewarm', daemon=True)
+            self.prewarm_thread.start()
+
+    def run_prewarm(self):
+        self.prewarmed_driver = self.launch_new()
+
+    def launch(self):
+        """:return: the prewarmed driver on the first call after prewarm(), else a new one. None if it failed."""
+        with self.lock:
+            thread, self.prewarm_thread = self.prewarm_thread, None
+        if thread:
+            thread.join()
+            new_driver, self.prewarmed_driver = self.prewarmed_driver, None
+            if new_driver:
+                return new_driver
+            self.logger.warning('The prewarmed WebDriver failed to launch, launching again...')
+        return self.launch_new()
+
+    def close(self):
+        """Quits the prewarmed driver if it was never used."""
+        with self.lock:
+            thread, self.prewarm_thread = self.prewarm_thread, None
+        if thread:
+            thread.join()
+            if self.prewarmed_driver:
+                self.prewarmed_driver.quit()
+                self.prewarmed_driver = None
+
+    def launch_new(self):
+        """Creates a new WebDriver, retrying up to max_attempts in case of failure. Returns None if it failed."""
+        for attempt in range(self.max_attempts):
+            remembered = self.state.get('backend')
+            for backend in sorted(self.backends, key=lambda name: name != remembered):
+                new_driver = self.load(backend)
+                if new_driver:
+                    self.logger.info(f'{backend} WebDriver successfully launched.')
+                    if backend != remembered:
+                        self.update_state(backend=backend)
+                    return new_driver
+            self.logger.error(f'WebDriver failed to launch. Attempt {attempt + 1} of {self.max_attempts}.')
+        self.logger.critical('Failed to launch WebDriver after several attempts.')
+        return None
+
+    def load(self, backend):
+        """Attempts to launch the WebDriver of a backend, from its cached driver binary when it is still valid."""
+        try:
+            self.logger.info(f'Attempting to launch {backend} WebDriver...')
+            if backend == 'safari':
+                from selenium.webdriver.safari.webdriver import WebDriver as SafariDriver
+                return SafariDriver()
+            driver_path = self.cached_driver_path(backend)
+            if backend == 'chrome':
+                from selenium.webdriver.chrome.options import Options as ChromeOptions
+                from selenium.webdriver.chrome.service import Service as ChromeService
+                from selenium.webdriver.chrome.webdriver import WebDriver as ChromeDriver
+                # Selenium Manager resolves the driver when no cached binary is given
+                options = self.options(ChromeOptions(), backend)
+                if self.network_log:
+                    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+                new_driver = ChromeDriver(service=ChromeService(executable_path=driver_path), options=options)
+            elif backend == 'edge':
+                from selenium.webdriver.edge.options import Options as EdgeOptions
+                from selenium.webdriver.edge.service import Service as EdgeService
+                from selenium.webdriver.edge.webdriver import WebDriver as EdgeDriver
+                if not driver_path:
+                    from webdriver_manager.microsoft import EdgeChromiumDriverManager
+                    driver_path = EdgeChromiumDriverManager().install()
+                new_driver = EdgeDriver(service=EdgeService(driver_path), options=self.options(EdgeOptions(), backend))
+            else:
+                from selenium.webdriver.firefox.options import Options as FirefoxOptions
+                from selenium.webdriver.firefox.service import Service as FirefoxService
+                from selenium.webdriver.firefox.webdriver import WebDriver as FirefoxDriver
+                if not driver_path:
+                    from webdriver_manager.firefox import GeckoDriverManager
+                    driver_path = GeckoDriverManager().install()
+                new_driver = FirefoxDriver(service=FirefoxService(driver_path),
+                                           options=self.options(FirefoxOptions(), backend))
+            if self.cached_path(backend) != new_driver.service.path:
+                self.cache_driver_path(backend, new_driver.service.path)
+            self.block_resources(new_driver)
+            return new_driver
+        except (WebDriverException, Exception) as err:
+            self.logger.error(f'{backend} WebDriver failed: {str(err)}')
+            if self.state.get('drivers', {}).get(backend):
+                # The cached binary may be the reason, resolve it again on the next attempt
+                self.cache_driver_path(backend, None)
+            return None
+
+    def options(self, options, backend):
+        for argument in self.arguments:
+            options.add_argument(argument)
+        options.page_load_strategy = self.profile['page_load_strategy']
+        if self.profile['lean']:
+            blocks_images = 'image' in self.profile['blocked_resource_types']
+            if backend in ('chrome', 'edge'):
+                for argument in self.LEAN_ARGUMENTS:
+                    options.add_argument(argument)
+                if blocks_images:
+                    options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+            elif backend == 'firefox' and blocks_images:
+                options.set_preference('permissions.default.image', 2)
+        return options
+
+    def block_resources(self, driver):
+        """Blocks the resource types and URL patterns of the lean profile on a Chrome or Edge driver."""
+        if not self.profile['lean'] or not hasattr(driver, 'execute_cdp_cmd'):
+            return
+        patterns = [pattern for resource_type in self.profile['blocked_resource_types']
+                    for pattern in self.RESOURCE_TYPE_PATTERNS.get(resource_type, ())]
+        patterns += self.profile['blocked_url_patterns']
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+            self.logger.info(f'Blocking {len(patterns)} URL patterns of the lean browser profile.')
+        except Exception as e:
+            self.logger.warning(f'Failed to block the resources of the lean browser profile: {e}')
+
+    # Cached driver binaries
+
+    def cached_path(self, backend):
+        return self.state.get('drivers', {}).get(backend, {}).get('path')
+
+    def cached_driver_path(self, backend):
+        """:return: the cached driver binary of the backend if it is unchanged since it was cached, else None."""
+        cached = self.state.get('drivers', {}).get(backend)
+        if not cached:
+            return None
+        path = cached.get('path')
+        try:
+            if (os.access(path, os.X_OK) and os.path.getsize(path) == cached.get('size')
+                    and self.file_digest(path) == cached.get('sha256')):
+                return path
+        except (OSError, TypeError):
+            pass
+        self.logger.warning(f'The cached {backend} driver {path} changed or is missing, resolving it again.')
+        self.cache_driver_path(backend, None)
+        return None
+
+    def cache_driver_path(self, backend, path):
+        drivers = dict(self.state.get('drivers', {}))
+        drivers.pop(backend, None)
+        if path:
+            try:
+                drivers[backend] = {'path': path, 'size': os.path.getsize(path), 'sha256': self.file_digest(path)}
+            except OSError as err:
+                self.logger.warning(f'Could not cache the {backend} driver {path}: {err}')
+        self.update_state(drivers=drivers)
+
+    @staticmethod
+    def file_digest(path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    # Remembered state
+
+    def read_state(self):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        except OSError as err:
+            self.logger.warning(f'Could not read the WebDriver state {self.state_path}: {err}')
+            return {}
+
+    def update_state(self, **values):
+        with self.lock:
+            self.state = dict(self.state, **values)
+            try:
+                os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+                temporary_path = self.state_path + '.tmp'
+                with open(temporary_path, 'w', encoding='utf-8') as file:
+                    json.dump(self.state, file, indent=2)
+                os.replace(temporary_path, self.state_path)
+            except OSError as err:
+                self.logger.warning(f'Could not save the WebDriver state {self.state_path}: {err}')
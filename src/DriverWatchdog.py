@@ -0,0 +1,163 @@
+import statistics
+import threading
+import time
+from collections import deque
+
+import psutil
+
+
+class DriverWatchdog:
+    """
+    Watches the memory of the browser of a PlayManager and how much slower its cycles got, and recycles the browser
+    once either passes its threshold. A replacement driver is launched and logged in in a background thread while the
+    old one keeps collecting, and the PlayManager swaps to it between two cycles, keeping its games and marks.
+
+    The slowdown is the median cycle time of the last baseline_cycles cycles over the median of the first
+    baseline_cycles cycles of the browser. A browser is not recycled before it ran for min_session_age seconds.
+    """
+
+    def __init__(self, logger, metrics, driver_factory, standby_factory, watchdog_config):
+        """
+        :param driver_factory: callable returning a new WebDriver, or None if it failed to launch.
+        :param standby_factory: callable building a PlayManager for a driver, used to log the replacement in.
+        """
+        self.logger = logger
+        self.metrics = metrics
+        self.driver_factory = driver_factory
+        self.standby_factory = standby_factory
+        self.max_browser_rss = watchdog_config['max_browser_rss_in_mb']
+        self.max_renderer_rss = watchdog_config['max_renderer_rss_in_mb']
+        self.max_slowdown = watchdog_config['max_cycle_slowdown']
+        self.baseline_cycles = watchdog_config['baseline_cycles']
+        self.check_interval = watchdog_config['check_interval_in_sec']
+        self.min_session_age = watchdog_config['min_session_age_in_min'] * 60
+        self.lock = threading.Lock()
+        self.thread = None
+        self.replacement = None  # Driver logged in and ready to be swapped in
+        self.closed = False
+        self.session_started = None
+        self.last_check = 0
+        self.baseline = []  # Cycle seconds of the first cycles of the browser
+        self.recent = deque(maxlen=self.baseline_cycles)
+
+    def watch(self):
+        """Starts watching a new browser."""
+        self.session_started = time.monotonic()
+        self.last_check = self.session_started
+        self.baseline = []
+        self.recent.clear()
+
+    def cycle_finished(self, seconds):
+        if self.session_started is None:
+            self.watch()
+        if len(self.baseline) < self.baseline_cycles:
+            self.baseline.append(seconds)
+        self.recent.append(seconds)
+
+    def slowdown(self):
+        if len(self.baseline) < self.baseline_cycles or len(self.recent) < self.baseline_cycles:
+            return 1.0
+        return statistics.median(self.recent) / max(statistics.median(self.baseline), 1e-6)
+
+    @staticmethod
+    def browser_processes(driver):
+        try:
+            service = psutil.Process(driver.service.process.pid)
+            return service.children(recursive=True)
+        except (AttributeError, psutil.Error):
+            return []
+
+    @staticmethod
+    def rss_mb(processes):
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / (1024 * 1024)
+
+    def memory(self, driver):
+        """:return: the RSS of the browser and of its renderer processes in MB."""
+        processes = self.browser_processes(driver)
+        renderers = []
+        for process in processes:
+            try:
+                if '--type=renderer' in process.cmdline():
+                    renderers.append(process)
+            except psutil.Error:
+                pass
+        return self.rss_mb(processes), self.rss_mb(renderers)
+
+    def recycle_reason(self, driver):
+        """
+        Checks the browser every check_interval seconds.
+        :return: why the browser should be recycled, None while it is within the thresholds or being recycled.
+        """
+        now = time.monotonic()
+        if (self.session_started is None or self.thread or now - self.last_check < self.check_interval
+                or now - self.session_started < self.min_session_age):
+            return None
+        self.last_check = now
+        browser_rss, renderer_rss = self.memory(driver)
+        slowdown = self.slowdown()
+        self.logger.info(f'Browser RSS {browser_rss:.0f} MB, renderers {renderer_rss:.0f} MB, '
+                         f'cycles {slowdown:.2f}x slower than at its start.')
+        if browser_rss > self.max_browser_rss:
+            return 'browser_rss'
+        if renderer_rss > self.max_renderer_rss:
+            return 'renderer_rss'
+        if slowdown > self.max_slowdown:
+            return 'cycle_slowdown'
+        return None
+
+    def prepare_replacement(self, reason, login_details):
+        """Launches and logs in the replacement driver in the background."""
+        self.logger.warning(f'Recycling the browser ({reason}), preparing a replacement in the background...')
+        self.metrics.inc('driver_recycles_total', reason=reason)
+        self.thread = threading.Thread(target=self.run_replacement, args=(login_details,), name='DriverWatchdog',
+                                       daemon=True)
+        self.thread.start()
+
+    def run_replacement(self, login_details):
+        started = time.perf_counter()
+        new_driver = None
+        try:
+            new_driver = self.driver_factory()
+            if new_driver and self.standby_factory(new_driver).login(*login_details):
+                self.metrics.observe('driver_replacement_seconds', time.perf_counter() - started)
+                with self.lock:
+                    if not self.closed:
+                        self.replacement = new_driver
+                        return
+                self.quit(new_driver)
+                return
+            self.logger.error('The replacement browser could not open the live events page, keeping the current one.')
+        except Exception as e:
+            self.logger.error(f'Failed to prepare the replacement browser: {e}')
+        self.metrics.inc('driver_recycle_failures_total')
+        if new_driver:
+            self.quit(new_driver)
+        # Checked again after the next check interval
+        self.thread = None
+
+    def take_replacement(self):
+        """:return: the replacement driver once it is ready, to be swapped in between two cycles, else None."""
+        with self.lock:
+            replacement, self.replacement = self.replacement, None
+        if replacement:
+            self.thread = None
+            self.watch()
+        return replacement
+
+    def quit(self, driver):
+        """Quits a driver in the background, closing a browser can take seconds."""
+        threading.Thread(target=driver.quit, name='DriverQuit', daemon=True).start()
+
+    def close(self):
+        """Quits the replacement if it was never swapped in, now or once it is ready."""
+        with self.lock:
+            self.closed = True
+            replacement, self.replacement = self.replacement, None
+        if replacement:
+            replacement.quit()
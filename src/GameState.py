@@ -0,0 +1,98 @@
+class GameSchema:
+    """The game field names and quarter markers of config['elements']['consts'], resolved once."""
+
+    __slots__ = ('first_team', 'second_team', 'first_team_score', 'second_team_score', 'total_score',
+                 'quarter_number', 'time_left', 'first_total_score', 'quarter_when_recorded',
+                 'time_left_when_recorded', 'league_name', 'selected_row_field', 'total_text_value', 'ATS', 'B',
+                 'first_quarter', 'last_quarter', 'not_started', 'overtime', 'quarter_start_time')
+
+    def __init__(self, elements):
+        consts = elements['consts']
+        self.first_team = consts['first_team']
+        self.second_team = consts['second_team']
+        self.first_team_score = consts['first_team_score']
+        self.second_team_score = consts['second_team_score']
+        self.total_score = consts['total_score']
+        self.quarter_number = consts['quarter_number']
+        self.time_left = consts['time_left']
+        self.first_total_score = consts['first_total_score']
+        self.quarter_when_recorded = consts['quarter_when_recorded']
+        self.time_left_when_recorded = consts['time_left_when_recorded']
+        self.league_name = consts['league_name']
+        self.selected_row_field = consts['selected_row_field']
+        self.total_text_value = consts['total_text_value']
+        self.ATS = consts['ATS']
+        self.B = consts['B']
+        self.first_quarter = consts['1Q']
+        self.last_quarter = consts['4Q']
+        self.not_started = consts['NS']
+        self.overtime = consts['OT']
+        self.quarter_start_time = consts['10:00']
+
+
+class GameState:
+    """
+    The state of a single game. Scores are kept as numbers and every change bumps the revision, so publishers
+    rebuild the dict view of a game only when it actually changed.
+    """
+
+    __slots__ = ('first_team', 'second_team', 'first_team_score', 'second_team_score', 'quarter_number',
+                 'time_left', 'first_total_score', 'quarter_when_recorded', 'time_left_when_recorded', 'revision')
+
+    LIVE_FIELDS = ('first_team', 'second_team', 'first_team_score', 'second_team_score', 'quarter_number',
+                   'time_left')
+
+    def __init__(self, first_team, second_team, first_team_score, second_team_score, quarter_number, time_left):
+        self.first_team = first_team
+        self.second_team = second_team
+        self.first_team_score = first_team_score
+        self.second_team_score = second_team_score
+        self.quarter_number = quarter_number
+        self.time_left = time_left
+        self.first_total_score = None
+        self.quarter_when_recorded = None
+        self.time_left_when_recorded = None
+        self.revision = 0
+
+    @property
+    def total_score(self):
+        return self.first_team_score + self.second_team_score
+
+    def update_from(self, other):
+        """Takes the live fields of a newer read of the game, and its first total if it has one."""
+        changed = False
+        for field in self.LIVE_FIELDS:
+            value = getattr(other, field)
+            if getattr(self, field) != value:
+                setattr(self, field, value)
+                changed = True
+        first_total_changed = other.first_total_score is not None and self.set_first_total(
+            other.first_total_score, other.quarter_when_recorded, other.time_left_when_recorded)
+        if changed and not first_total_changed:
+            self.revision += 1
+        return changed or first_total_changed
+
+    def set_first_total(self, first_total_score, quarter_when_recorded, time_left_when_recorded):
+        if (self.first_total_score, self.quarter_when_recorded, self.time_left_when_recorded) == \
+                (first_total_score, quarter_when_recorded, time_left_when_recorded):
+            return False
+        self.first_total_score = first_total_score
+        self.quarter_when_recorded = quarter_when_recorded
+        self.time_left_when_recorded = time_left_when_recorded
+        self.revision += 1
+        return True
+
+    def as_dict(self, schema):
+        """The dict view of the game keyed by the configured field names, as shown by the UI."""
+        return {
+            schema.first_team: self.first_team,
+            schema.second_team: self.second_team,
+            schema.first_team_score: self.first_team_score,
+            schema.second_team_score: self.second_team_score,
+            schema.total_score: self.total_score,
+            schema.quarter_number: self.quarter_number,
+            schema.time_left: self.time_left,
+            schema.first_total_score: self.first_total_score,
+            schema.quarter_when_recorded: self.quarter_when_recorded,
+            schema.time_left_when_recorded: self.time_left_when_recorded
+        }
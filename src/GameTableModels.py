@@ -0,0 +1,165 @@
+from PyQt5.QtCore import Qt, QAbstractListModel, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QColor, QFont
+
+
+class KeyedTableModel(QAbstractTableModel):
+    """
+    Table model whose rows are keyed by game_key. Changes are applied per row with dataChanged, insert and remove
+    notifications instead of rebuilding the table, so views keep their scroll position and selection.
+    """
+
+    def __init__(self, columns, translation, highlight_color):
+        super().__init__()
+        self.columns = columns  # Translation keys of the column headers
+        self.translation = translation
+        self.highlight_color = highlight_color
+        self.keys = []  # game_key of every row, in display order
+        self.row_of = {}  # game_key -> row number
+        self.values = {}  # game_key -> tuple of the row's display values
+        self.highlighted = set()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.keys)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        key = self.keys[index.row()]
+        if role == Qt.DisplayRole:
+            return self.values[key][index.column()]
+        if role == Qt.BackgroundRole and key in self.highlighted:
+            return self.highlight_color
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.translation.get(self.columns[section], self.columns[section])
+        return super().headerData(section, orientation, role)
+
+    def set_translation(self, translation):
+        self.translation = translation
+        self.headerDataChanged.emit(Qt.Horizontal, 0, len(self.columns) - 1)
+
+    def set_rows(self, rows):
+        """Replaces the content with the given {game_key: values} rows, touching only the rows that differ."""
+        for key in [key for key in self.keys if key not in rows]:
+            self.remove_row(key)
+        for key, values in rows.items():
+            self.upsert_row(key, values)
+
+    def upsert_row(self, key, values):
+        values = tuple('' if value is None else str(value) for value in values)
+        if key in self.row_of:
+            if self.values[key] != values:
+                self.values[key] = values
+                self.emit_row_changed(key)
+            return
+        row = len(self.keys)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.keys.append(key)
+        self.row_of[key] = row
+        self.values[key] = values
+        self.endInsertRows()
+
+    def remove_row(self, key):
+        if key not in self.row_of:
+            return
+        row = self.row_of[key]
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.keys[row]
+        del self.row_of[key]
+        del self.values[key]
+        for index in range(row, len(self.keys)):
+            self.row_of[self.keys[index]] = index
+        self.highlighted.discard(key)
+        self.endRemoveRows()
+
+    def set_highlighted(self, keys):
+        """Highlights the rows of the given keys, repainting only rows whose highlight changed."""
+        keys = {key for key in keys if key in self.row_of}
+        changed = keys ^ self.highlighted
+        self.highlighted = keys
+        for key in changed:
+            self.emit_row_changed(key)
+
+    def set_row_highlighted(self, key, highlighted):
+        if key not in self.row_of or (key in self.highlighted) == highlighted:
+            return
+        if highlighted:
+            self.highlighted.add(key)
+        else:
+            self.highlighted.discard(key)
+        self.emit_row_changed(key)
+
+    def emit_row_changed(self, key):
+        row = self.row_of[key]
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.columns) - 1))
+
+
+class LeaguesModel(QAbstractListModel):
+    """The leagues sidebar. Leagues with marked games are green and the selected league is dark and bold."""
+
+    def __init__(self):
+        super().__init__()
+        self.leagues = []
+        self.row_of = {}
+        self.marked_leagues = set()
+        self.selected_league = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.leagues)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        league = self.leagues[index.row()]
+        if role == Qt.DisplayRole:
+            return league
+        if role == Qt.BackgroundRole:
+            if league == self.selected_league:
+                return QColor(0, 50, 50)
+            if league in self.marked_leagues:
+                return QColor(Qt.green)
+        if role == Qt.ForegroundRole and league == self.selected_league:
+            return QColor("white")
+        if role == Qt.FontRole and league == self.selected_league:
+            font = QFont()
+            font.setBold(True)
+            return font
+        return None
+
+    def set_leagues(self, leagues):
+        """Removes finished leagues and appends new ones, keeping the order of the others."""
+        leagues_set = set(leagues)
+        for row in reversed(range(len(self.leagues))):
+            if self.leagues[row] not in leagues_set:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.leagues[row]
+                self.row_of = {league: row for row, league in enumerate(self.leagues)}
+                self.endRemoveRows()
+        new_leagues = [league for league in leagues if league not in self.row_of]
+        if new_leagues:
+            self.beginInsertRows(QModelIndex(), len(self.leagues), len(self.leagues) + len(new_leagues) - 1)
+            self.leagues.extend(new_leagues)
+            self.row_of = {league: row for row, league in enumerate(self.leagues)}
+            self.endInsertRows()
+
+    def set_marked_leagues(self, marked_leagues):
+        changed = marked_leagues ^ self.marked_leagues
+        self.marked_leagues = marked_leagues
+        for league in changed:
+            self.emit_league_changed(league)
+
+    def set_selected_league(self, league):
+        previous = self.selected_league
+        self.selected_league = league
+        self.emit_league_changed(previous)
+        self.emit_league_changed(league)
+
+    def emit_league_changed(self, league):
+        if league in self.row_of:
+            index = self.index(self.row_of[league])
+            self.dataChanged.emit(index, index)
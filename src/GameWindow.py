@@ -1,35 +1,48 @@
 import sys
 from PyQt5.QtGui import QFont, QColor
-from PyQt5.QtWidgets import QLabel, QVBoxLayout, QWidget, QTreeWidget, QTreeWidgetItem, QHBoxLayout, QScrollArea, \
-    QTableWidget, QTableWidgetItem, QMessageBox
-from PyQt5.QtCore import Qt, pyqtSlot, pyqtSignal, QEventLoop, QTimer
+from PyQt5.QtWidgets import QLabel, QVBoxLayout, QWidget, QHBoxLayout, QListView, QTableView, QMessageBox
+from PyQt5.QtCore import Qt, pyqtSlot, pyqtSignal
+
+from GameTableModels import KeyedTableModel, LeaguesModel
+from Metrics import Metrics, timed_phase
 
 
 class GameWindow(QWidget):
     window_closed = pyqtSignal()
 
-    def __init__(self, logger, elements, translation):
+    def __init__(self, logger, elements, translation, metrics=None):
         super().__init__()
+        self.metrics = metrics or Metrics()  # Times the render phase of every applied state delta
         self.translation = translation
-        self.league_games_layout = None
-        self.league_games_widget = None
-        self.marked_games_layout = None
-        self.marked_games_area = None
-        self.marked_games_widget = None
+        self.elements = elements
+        self.marked_games_view = None
         self.sidebar = None
         self.spinner_label = None
-        self.league_games_area = None
+        self.league_games_view = None
         self.leagues_data = {}  # To store leagues and games data
         self.marked_games_data = {}  # To store marked games
         self.selected_league = None  # To track selected league
+        self.state_version = 0  # Version of the last applied state snapshot
         self.logger = logger
 
+        # Models of the sidebar and both tables, updated per row on every refresh
+        consts = elements['consts']
+        self.game_columns = [consts['first_team'], consts['second_team'], consts['first_team_score'],
+                             consts['second_team_score'], consts['total_score'], consts['quarter_number'],
+                             consts['time_left'], consts['first_total_score'], consts['quarter_when_recorded'],
+                             consts['time_left_when_recorded']]
+        self.leagues_model = LeaguesModel()
+        self.league_games_model = KeyedTableModel(self.game_columns, translation, QColor(Qt.yellow))
+        self.marked_games_model = KeyedTableModel(
+            ['Game', 'League', 'Current Score', 'First Guessed Score', 'Selected Row Number',
+             'Selected Row total Score', 'Selected Row Under Score', 'Selected Row Over Score'],
+            translation, None)
+
         # Placeholder labels for "No Data" messages
         self.no_marked_games_label = QLabel("No marked games available", self)
         self.no_league_games_label = QLabel("No league games available", self)
 
         self.init_ui()
-        self.elements = elements
 
     def close_windows(self):
         self.close()
@@ -80,10 +93,10 @@ class GameWindow(QWidget):
             leagues_label.setAlignment(Qt.AlignCenter)  # Align the label to the center
 
             # Sidebar for the leagues list
-            self.sidebar = QTreeWidget()
-            self.sidebar.setHeaderLabel("")
+            self.sidebar = QListView()
+            self.sidebar.setModel(self.leagues_model)
             self.sidebar.setStyleSheet("font-size: 12px; font-weight: bold;")
-            self.sidebar.itemClicked.connect(self.on_league_selected)
+            self.sidebar.clicked.connect(self.on_league_selected)
 
             # Add the label and sidebar to the sidebar layout
             sidebar_layout.addWidget(leagues_label)
@@ -100,13 +113,10 @@ class GameWindow(QWidget):
             marked_games_label.setStyleSheet("font-size: 20px; font-weight: bold;")
             central_layout.addWidget(marked_games_label)
 
-            self.marked_games_area = QScrollArea()
-            self.marked_games_area.setWidgetResizable(True)
-            self.marked_games_widget = QWidget()
-            self.marked_games_layout = QVBoxLayout(self.marked_games_widget)
-            self.marked_games_area.setWidget(self.marked_games_widget)
+            self.marked_games_view = QTableView()
+            self.marked_games_view.setModel(self.marked_games_model)
 
-            central_layout.addWidget(self.marked_games_area, 4)  # 30% of remaining space
+            central_layout.addWidget(self.marked_games_view, 4)  # 30% of remaining space
 
             # Add "No Data" label for marked games
             self.no_marked_games_label.setStyleSheet("font-size: 18px; color: gray;")
@@ -119,13 +129,10 @@ class GameWindow(QWidget):
             league_games_label.setStyleSheet("font-size: 20px; font-weight: bold; text-align: center;")
             central_layout.addWidget(league_games_label)
 
-            self.league_games_area = QScrollArea()
-            self.league_games_area.setWidgetResizable(True)
-            self.league_games_widget = QWidget()
-            self.league_games_layout = QVBoxLayout(self.league_games_widget)
-            self.league_games_area.setWidget(self.league_games_widget)
+            self.league_games_view = QTableView()
+            self.league_games_view.setModel(self.league_games_model)
 
-            central_layout.addWidget(self.league_games_area, 7)  # Remaining 70% for league games
+            central_layout.addWidget(self.league_games_view, 7)  # Remaining 70% for league games
 
             # Add "No Data" label for league games
             self.no_league_games_label.setStyleSheet("font-size: 18px; color: gray;")
@@ -145,9 +152,8 @@ class GameWindow(QWidget):
             self.logger.error(f'Failed to initialize game window UI on init_ui. Error: {str(e)}')
             sys.exit(1)
 
-    @pyqtSlot(dict, dict)
     def update_game_data(self, basketballLeagues, marked_games):
-        """Updates both leagues and marked games safely."""
+        """Redraws both leagues and marked games from a full state."""
         try:
             self.logger.info("Updating game data in UI thread...")
             self.update_league_games_ui(basketballLeagues, marked_games)
@@ -155,8 +161,59 @@ class GameWindow(QWidget):
         except Exception as e:
             self.logger.error(f'Received an error during update_game_data operation. Error: ${str(e)}')
 
+    @pyqtSlot(object)
+    @timed_phase('render')
+    def apply_state_delta(self, delta):
+        """Applies the changes of a published state, touching only the changed rows of the selected league."""
+        try:
+            self.leagues_data = delta.snapshot.leagues
+            self.marked_games_data = delta.snapshot.marked_games
+            if delta.version != self.state_version + 1:
+                # A missed version can't be applied as a delta, redraw from the snapshot
+                self.logger.info(f"Resyncing UI from state version {delta.version}")
+                self.state_version = delta.version
+                self.update_game_data(self.leagues_data, self.marked_games_data)
+                return
+            self.state_version = delta.version
+            consts = self.elements['consts']
+
+            self.leagues_model.set_leagues(list(self.leagues_data))
+            self.leagues_model.set_marked_leagues({mark[consts['league_name']]
+                                                   for mark in self.marked_games_data.values()})
+            if self.leagues_data:
+                self.no_league_games_label.hide()
+            else:
+                self.no_league_games_label.show()
+            if not self.selected_league:
+                return
+
+            for league_name, game_key, game_data in delta.games_added + delta.games_updated:
+                if league_name == self.selected_league:
+                    self.league_games_model.upsert_row(game_key, self.game_row(game_data))
+                    self.league_games_model.set_row_highlighted(game_key, game_key in self.marked_games_data)
+                    self.update_marked_game_row(game_key)
+            for league_name, game_key in delta.games_removed:
+                if league_name == self.selected_league:
+                    self.league_games_model.remove_row(game_key)
+                    self.marked_games_model.remove_row(game_key)
+            for game_key, mark in delta.marks_added:
+                self.league_games_model.set_row_highlighted(game_key, True)
+                self.update_marked_game_row(game_key)
+            for game_key in delta.marks_removed:
+                self.league_games_model.set_row_highlighted(game_key, False)
+                self.marked_games_model.remove_row(game_key)
+
+            if self.marked_games_model.rowCount():
+                self.no_marked_games_label.hide()
+            else:
+                self.no_marked_games_label.show()
+        except Exception as e:
+            self.logger.error(f'Received an error during apply_state_delta operation. Error: ${str(e)}')
+
     def update_translation(self, translation_new):
         self.translation = translation_new
+        self.league_games_model.set_translation(translation_new)
+        self.marked_games_model.set_translation(translation_new)
 
     def update_marked_games_ui(self, marked_games):
         """Thread-safe method to update marked games."""
@@ -164,59 +221,19 @@ class GameWindow(QWidget):
             self.logger.info("Updating marked games UI in UI thread...")
             self.marked_games_data = marked_games
 
-            # Clear the existing marked games table
-            for i in reversed(range(self.marked_games_layout.count())):
-                widget_to_remove = self.marked_games_layout.itemAt(i).widget()
-                if widget_to_remove is not None:
-                    widget_to_remove.setParent(None)
+            # Marked games are shown only for the selected league
+            rows = {}
+            for game_key in self.marked_games_data:
+                row = self.marked_game_row(game_key)
+                if row:
+                    rows[game_key] = row
+            self.marked_games_model.set_rows(rows)
 
-            # Populate marked games as a table only if a league is selected
-            if self.selected_league:
-                if self.marked_games_data:
-                    self.no_marked_games_label.hide()
-                    game_table = QTableWidget()
-
-                    # Setting the columns
-                    columns = [self.translation['Game'], self.translation['League'],
-                               self.translation['Current Score'], self.translation['First Guessed Score'],
-                               self.translation['Selected Row Number'],
-                               self.translation['Selected Row total Score'],
-                               self.translation['Selected Row Under Score'],
-                               self.translation['Selected Row Over Score']]
-                    game_table.setColumnCount(len(columns))  # Set columns based on keys
-                    game_table.setHorizontalHeaderLabels(columns)
-                    # Populate the table with the marked games
-                    for row_index, (game_key, game_data) in enumerate(self.marked_games_data.items()):
-                        if game_data[self.elements['consts']['league_name']] == self.selected_league:
-                            game_name = str(game_key)
-                            league_name = str(game_data[self.elements['consts']['league_name']])
-                            curr_league = self.leagues_data[league_name]
-                            curr_game = curr_league[game_key]
-                            selected_row = game_data[self.elements['consts']['selected_row']]
-                            current_score = str(curr_game[self.elements['consts']['total_score']])
-                            first_total = str(curr_game[self.elements['consts']['first_total_score']])
-                            selected_row_index = str(selected_row[self.elements['consts']['curr_row_index']])
-                            selected_row_total = str(selected_row[self.elements['consts']['total_text_value']])
-                            selected_row_under = str(selected_row[self.elements['consts']['under_text_value']])
-                            selected_row_over = str(selected_row[self.elements['consts']['over_text_value']])
-                            game_table.insertRow(row_index)
-                            game_table.setItem(row_index, 0, QTableWidgetItem(game_name))
-                            game_table.setItem(row_index, 1, QTableWidgetItem(league_name))
-                            game_table.setItem(row_index, 2, QTableWidgetItem(current_score))
-                            game_table.setItem(row_index, 3, QTableWidgetItem(first_total))
-                            game_table.setItem(row_index, 4, QTableWidgetItem(selected_row_index))
-                            game_table.setItem(row_index, 5, QTableWidgetItem(selected_row_total))
-                            game_table.setItem(row_index, 6, QTableWidgetItem(selected_row_under))
-                            game_table.setItem(row_index, 7, QTableWidgetItem(selected_row_over))
-
-                    self.marked_games_layout.addWidget(game_table)
-
-                else:
-                    # Show the "No Data" message
-                    self.no_marked_games_label.show()
-
-                # Make sure the layout is set
-                self.marked_games_widget.setLayout(self.marked_games_layout)
+            if self.selected_league and not rows:
+                # Show the "No Data" message
+                self.no_marked_games_label.show()
+            else:
+                self.no_marked_games_label.hide()
         except Exception as e:
             self.logger.error(
                 f'Failed to update marked games UI for league {self.selected_league} in update_marked_games_ui. Error: {e}')
@@ -225,93 +242,61 @@ class GameWindow(QWidget):
         """Thread-safe method to update league games."""
         try:
             self.leagues_data = leagues
+            league_name_key = self.elements['consts']['league_name']
 
-            # Clear the existing league games and sidebar
-            self.sidebar.clear()
-            for i in reversed(range(self.league_games_layout.count())):
-                widget_to_remove = self.league_games_layout.itemAt(i).widget()
-                if widget_to_remove is not None:
-                    widget_to_remove.setParent(None)
+            # Highlight leagues with marked games
+            self.leagues_model.set_leagues(list(leagues))
+            self.leagues_model.set_marked_leagues({mark[league_name_key] for mark in marked_games.values()})
 
-            # Populate leagues in the sidebar
             if leagues:
                 self.no_league_games_label.hide()
-                for league, games in self.leagues_data.items():
-                    league_item = QTreeWidgetItem([league])
-
-                    # Highlight leagues with marked games
-                    if any(game_mark_data[self.elements['consts']['league_name']] == league for
-                           (game_key, game_mark_data)
-                           in marked_games.items()):
-                        league_item.setBackground(0, Qt.green)
-
-                    self.sidebar.addTopLevelItem(league_item)
-
-                # Display games for the selected league as a table
-                if self.selected_league and self.selected_league in self.leagues_data:
-                    games = self.leagues_data[self.selected_league]
-                    if games:
-                        game_table = QTableWidget()
-
-                        # Set columns based on the first game's data structure (dynamically set columns based on keys)
-                        first_game = next(iter(games.values()))  # Get first game's data
-                        game_table.setColumnCount(len(first_game.keys()))
-                        columns = first_game.keys()
-                        translated_columns = [self.translation[column] for column in columns]
-                        game_table.setHorizontalHeaderLabels(translated_columns)
-
-                        # Populate rows with game data
-                        for row_index, (game_key, game_data) in enumerate(games.items()):
-                            game_table.insertRow(row_index)
-                            for col_index, (key, value) in enumerate(game_data.items()):
-                                game_table.setItem(row_index, col_index, QTableWidgetItem(str(value)))
-
-                        # Handle marked games data by highlighting rows
-                        for game_key, game_info in marked_games.items():
-                            if game_info[self.elements['consts']['league_name']] == self.selected_league:
-                                for row_index, (key, _) in enumerate(games.items()):
-                                    if key == game_key:
-                                        for col_index in range(game_table.columnCount()):
-                                            game_table.item(row_index, col_index).setBackground(
-                                                Qt.yellow)  # Highlight row
-
-                        self.league_games_layout.addWidget(game_table)
-
             else:
                 # Show the "No Data" message
                 self.no_league_games_label.show()
 
-            # Set the layout
-            self.league_games_widget.setLayout(self.league_games_layout)
+            # Display games for the selected league, highlighting the marked ones
+            games = self.leagues_data.get(self.selected_league, {}) if self.selected_league else {}
+            self.league_games_model.set_rows({game_key: self.game_row(game_data)
+                                              for game_key, game_data in games.items()})
+            self.league_games_model.set_highlighted(game_key for game_key in games if game_key in marked_games)
 
         except Exception as e:
             self.logger.error(
                 f'Failed to update view for selected league {self.selected_league} in update_league_games_ui. Error: {e}')
 
-    def on_league_selected(self, item):
+    def marked_game_row(self, game_key):
+        """The marked games table row of a game, None if it isn't a marked game of the selected league."""
+        consts = self.elements['consts']
+        mark = self.marked_games_data.get(game_key)
+        if not self.selected_league or not mark or mark[consts['league_name']] != self.selected_league:
+            return None
+        curr_game = self.leagues_data.get(self.selected_league, {}).get(game_key)
+        if curr_game is None:
+            return None
+        selected_row = mark[consts['selected_row']]
+        return (game_key, self.selected_league, curr_game[consts['total_score']],
+                curr_game[consts['first_total_score']], selected_row[consts['curr_row_index']],
+                selected_row[consts['total_text_value']], selected_row[consts['under_text_value']],
+                selected_row[consts['over_text_value']])
+
+    def update_marked_game_row(self, game_key):
+        row = self.marked_game_row(game_key)
+        if row:
+            self.marked_games_model.upsert_row(game_key, row)
+        else:
+            self.marked_games_model.remove_row(game_key)
+
+    def game_row(self, game_data):
+        return tuple(game_data.get(column) for column in self.game_columns)
+
+    def on_league_selected(self, index):
         """Handle league selection and update games display"""
         try:
-            self.selected_league = item.text(0)
+            self.selected_league = index.data()
 
             if self.selected_league:
-                # Mark the selected league with green background, and bold text
-                for i in range(self.sidebar.topLevelItemCount()):
-                    league_item = self.sidebar.topLevelItem(i)
-
-                    if league_item.text(0) == self.selected_league:
-                        # Set the selected league with green background and bold text
-                        league_item.setBackground(0, QColor(0, 50, 50))  # Dark green with RGB(0, 100, 0)
-                        league_item.setForeground(0, QColor("white"))
-                        font = league_item.font(0)
-                        font.setBold(True)
-                        league_item.setFont(0, font)
-                    else:
-                        # Reset the other league items to default
-                        league_item.setBackground(0, QColor("transparent"))
-                        league_item.setForeground(0, QColor("black"))
-                        font = league_item.font(0)
-                        font.setBold(False)
-                        league_item.setFont(0, font)
+                # Mark the selected league with dark background and bold text
+                self.leagues_model.set_selected_league(self.selected_league)
 
                 # Update the league games and marked games based on the selected league
                 self.update_league_games_ui(self.leagues_data, self.marked_games_data)
@@ -0,0 +1,213 @@
+import json
+import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+
+class HistoryStore:
+    """
+    Append-only history of every game's scores, clock, total table rows and marks.
+
+    The scrapping threads only queue the values they read, a background writer thread drops unchanged values and
+    appends the rest in batches. Data is partitioned by date and league, one directory each:
+        <directory>/<YYYY-MM-DD>/<league>/<table>.<column>.bin   raw little endian column, one value per row
+        <directory>/<YYYY-MM-DD>/<league>/dictionary.json        league name and the game and quarter names
+    Game keys and quarters are stored as indexes into the dictionary, and clocks as seconds left.
+    Columns are loaded back as read-only memory maps with load_partition.
+    """
+
+    TABLES = {
+        'scores': [('time', '<f8'), ('game', '<i4'), ('first_team_score', '<i2'), ('second_team_score', '<i2'),
+                   ('quarter', '<i2'), ('seconds_left', '<i2')],
+        'totals': [('time', '<f8'), ('game', '<i4'), ('row_index', '<i2'), ('total', '<f4'), ('over', '<f4'),
+                   ('under', '<f4')],
+        'marks': [('time', '<f8'), ('game', '<i4'), ('first_total', '<f4'), ('row_index', '<i2'), ('total', '<f4'),
+                  ('over', '<f4'), ('under', '<f4')],
+    }
+
+    UNSAFE_PATH_CHARACTERS = re.compile(r'[^\w\- .]+')
+
+    def __init__(self, logger, directory, elements, flush_interval=5.0):
+        self.logger = logger
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.total_key = elements['consts']['total_text_value']
+        self.over_key = elements['consts']['over_text_value']
+        self.under_key = elements['consts']['under_text_value']
+        self.row_index_key = elements['consts']['curr_row_index']
+        self.queue = queue.SimpleQueue()
+        self.thread = None
+        self.stop_event = threading.Event()
+        # Writer thread state
+        self.partitions = {}  # (date, league_name) -> {'path', 'games', 'quarters', 'dirty'}
+        self.last_values = {}  # (table, league_name, game_key) -> last value written, to drop repeats
+        self.buffers = {}  # (date, league_name, table) -> list of rows waiting for the next flush
+
+    # Called from the scrapping threads
+
+    def record_game(self, league_name, game_key, game_state):
+        self.queue.put(('scores', time.time(), league_name, game_key,
+                        (game_state.first_team_score, game_state.second_team_score, game_state.quarter_number,
+                         game_state.time_left)))
+
+    def record_totals(self, league_name, game_key, rows):
+        """:param rows: (row_index, total, over, under) tuples as read from the total table."""
+        if rows:
+            self.queue.put(('totals', time.time(), league_name, game_key, tuple(rows)))
+
+    def record_mark(self, league_name, game_key, first_total_score, selected_row):
+        first_total = float('nan') if first_total_score is None else first_total_score
+        self.queue.put(('marks', time.time(), league_name, game_key,
+                        (first_total, selected_row[self.row_index_key], selected_row[self.total_key],
+                         selected_row[self.over_key], selected_row[self.under_key])))
+
+    def forget_game(self, league_name, game_key):
+        """Called once a game ended, drops its last values after everything queued before was written."""
+        self.queue.put((None, time.time(), league_name, game_key, None))
+
+    # Writer thread
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='HistoryStore', daemon=True)
+        self.thread.start()
+        self.logger.info(f'Recording games history to {self.directory}')
+
+    def stop(self):
+        """Writes everything still queued and stops the writer thread."""
+        if self.thread:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+    def run(self):
+        while not self.stop_event.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        try:
+            while True:
+                try:
+                    self.buffer(*self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            # A batch that fails to be written is dropped rather than appended twice on the next flush.
+            buffers, self.buffers = self.buffers, {}
+            for (date, league_name, table), rows in buffers.items():
+                if rows:
+                    self.append(self.partitions[(date, league_name)], table, rows)
+            for partition in self.partitions.values():
+                if partition['dirty']:
+                    self.write_dictionary(partition)
+        except Exception as e:
+            self.logger.warning(f'Failed to write the games history: {e}')
+
+    def buffer(self, table, timestamp, league_name, game_key, value):
+        if table is None:
+            for name in self.TABLES:
+                self.last_values.pop((name, league_name, game_key), None)
+            return
+        last_key = (table, league_name, game_key)
+        if self.last_values.get(last_key) == value:
+            return
+        self.last_values[last_key] = value
+        date = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
+        partition = self.partition(date, league_name)
+        game = self.code(partition, 'games', game_key)
+        rows = self.buffers.setdefault((date, league_name, table), [])
+        if table == 'scores':
+            first_team_score, second_team_score, quarter_number, time_left = value
+            rows.append((timestamp, game, first_team_score, second_team_score,
+                         self.code(partition, 'quarters', quarter_number), self.seconds_left(time_left)))
+        elif table == 'totals':
+            rows.extend((timestamp, game) + tuple(row) for row in value)
+        else:
+            rows.append((timestamp, game) + tuple(value))
+
+    def partition(self, date, league_name):
+        partition = self.partitions.get((date, league_name))
+        if partition is None:
+            path = os.path.join(self.directory, date, self.UNSAFE_PATH_CHARACTERS.sub('_', league_name) or '_')
+            os.makedirs(path, exist_ok=True)
+            dictionary = self.read_dictionary(path)
+            partition = {'path': path, 'league': league_name, 'games': dictionary.get('games', []),
+                         'quarters': dictionary.get('quarters', []), 'dirty': False}
+            partition['codes'] = {name: {value: code for code, value in enumerate(partition[name])}
+                                  for name in ('games', 'quarters')}
+            self.partitions[(date, league_name)] = partition
+        return partition
+
+    @staticmethod
+    def code(partition, name, value):
+        codes = partition['codes'][name]
+        if value not in codes:
+            codes[value] = len(partition[name])
+            partition[name].append(value)
+            partition['dirty'] = True
+        return codes[value]
+
+    @staticmethod
+    def seconds_left(time_left):
+        try:
+            minutes, seconds = time_left.split(':')
+            return int(minutes) * 60 + int(seconds)
+        except (AttributeError, ValueError):
+            return -1
+
+    def append(self, partition, table, rows):
+        columns = self.TABLES[table]
+        data = np.array(rows, dtype=columns)
+        for name, _ in columns:
+            with open(os.path.join(partition['path'], f'{table}.{name}.bin'), 'ab') as file:
+                data[name].tofile(file)
+
+    @staticmethod
+    def read_dictionary(path):
+        try:
+            with open(os.path.join(path, 'dictionary.json'), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @staticmethod
+    def write_dictionary(partition):
+        temporary_path = os.path.join(partition['path'], 'dictionary.json.tmp')
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            json.dump({'league': partition['league'], 'games': partition['games'],
+                       'quarters': partition['quarters']}, file, ensure_ascii=False)
+        os.replace(temporary_path, os.path.join(partition['path'], 'dictionary.json'))
+        partition['dirty'] = False
+
+    # Analysis
+
+    @classmethod
+    def partitions_of(cls, directory, date):
+        """:return: the partition directories of every league recorded on the given YYYY-MM-DD date."""
+        day = os.path.join(directory, date)
+        if not os.path.isdir(day):
+            return []
+        return [os.path.join(day, name) for name in sorted(os.listdir(day)) if os.path.isdir(os.path.join(day, name))]
+
+    @classmethod
+    def load_partition(cls, path, table):
+        """
+        :return: ({column: read-only memory mapped numpy array}, dictionary) of a table of a partition. Columns are
+                 cut to their shortest length, in case the program stopped while appending a batch.
+        """
+        columns = cls.TABLES[table]
+        lengths = []
+        for name, dtype in columns:
+            column_path = os.path.join(path, f'{table}.{name}.bin')
+            lengths.append(os.path.getsize(column_path) // np.dtype(dtype).itemsize
+                           if os.path.exists(column_path) else 0)
+        length = min(lengths)
+        data = {}
+        for name, dtype in columns:
+            data[name] = np.memmap(os.path.join(path, f'{table}.{name}.bin'), dtype=dtype, mode='r', shape=(length,)) \
+                if length else np.empty(0, dtype=dtype)
+        return data, cls.read_dictionary(path)
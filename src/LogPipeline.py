@@ -0,0 +1,131 @@
+import copy
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+# Pass as `extra` to log a record in full regardless of the per call site rate, e.g. for marked games.
+KEEP_RECORD = {'keep': True}
+
+
+class CallSiteRateLimiter(logging.Filter):
+    """
+    Token bucket per logging call site (file and line). Records below WARNING beyond rate_per_sec, after an initial
+    burst, are dropped. The next record let through from the call site carries the number dropped in `suppressed`.
+    """
+
+    def __init__(self, rate_per_sec, burst):
+        super().__init__()
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self.lock = threading.Lock()
+        self.buckets = {}  # (pathname, lineno) -> [tokens, last refill time, suppressed count]
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or getattr(record, 'keep', False) or self.rate_per_sec <= 0:
+            return True
+        now = time.monotonic()
+        key = (record.pathname, record.lineno)
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = [self.burst, now, 0]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate_per_sec)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1
+            if bucket[2]:
+                record.suppressed = bucket[2]
+                bucket[2] = 0
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, so the log file can be filtered and aggregated by field."""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'suppressed', 0):
+            entry['suppressed'] = record.suppressed
+        if record.exc_info:
+            entry['exception'] = record.exc_text or self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class RecordQueueHandler(QueueHandler):
+    """
+    Queues the records for the handlers of the listener thread to format. The stock QueueHandler formats them on
+    the logging thread and drops exc_info, which left JsonFormatter a message with the traceback appended.
+    """
+
+    def prepare(self, record):
+        # The arguments and the traceback are rendered now, while they still describe the state of the caller
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        return record
+
+
+def compress_rotated_files(handler):
+    """Makes a RotatingFileHandler gzip every file it rotates out."""
+    def namer(name):
+        return name + '.gz'
+
+    def rotator(source, destination):
+        with open(source, 'rb') as source_file, gzip.open(destination, 'wb') as destination_file:
+            shutil.copyfileobj(source_file, destination_file)
+        os.remove(source)
+
+    handler.namer = namer
+    handler.rotator = rotator
+    return handler
+
+
+class LogPipeline:
+    """
+    Moves log formatting and I/O off the scrapping threads. Loggers only put records on a queue, and a background
+    listener writes them to the handlers. The per game lines of the collection loop are rate limited per call site
+    while warnings, errors and KEEP_RECORD records are always written.
+    """
+
+    def __init__(self, logger, handlers, rate_per_sec=5, burst=20):
+        self.logger = logger
+        self.rate_limiter = CallSiteRateLimiter(rate_per_sec, burst)
+        self.queue = queue.SimpleQueue()
+        self.queue_handler = RecordQueueHandler(self.queue)
+        self.queue_handler.addFilter(self.rate_limiter)
+        self.listener = QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.running = False
+
+    def start(self):
+        self.logger.addHandler(self.queue_handler)
+        self.listener.start()
+        self.running = True
+
+    def configure(self, rate_per_sec, burst):
+        self.rate_limiter.rate_per_sec = rate_per_sec
+        self.rate_limiter.burst = burst
+
+    def stop(self):
+        """Writes the records still on the queue and stops the background listener."""
+        if self.running:
+            self.listener.stop()
+            self.running = False
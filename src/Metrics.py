@@ -0,0 +1,165 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import StaleElementReferenceException
+
+
+class DriverCallCounter:
+    """Counts the WebDriver commands of one driver, including the ones sent through its WebElements."""
+
+    def __init__(self, metrics, driver):
+        self.metrics = metrics
+        self.calls = 0
+        self.execute = driver.execute
+        driver.execute = self.counted_execute
+
+    def counted_execute(self, driver_command, params=None):
+        self.calls += 1
+        self.metrics.inc('webdriver_calls_total', command=driver_command)
+        try:
+            return self.execute(driver_command, params)
+        except StaleElementReferenceException:
+            self.metrics.inc('stale_element_errors_total', command=driver_command)
+            raise
+
+
+class Metrics:
+    """
+    Thread-safe counters and histograms of the scrapping hot path, shared by every PlayManager and the GameWindow.
+    Exported in the Prometheus text format and as JSON by the MetricsServer.
+    """
+
+    PREFIX = 'sportscrapper_'
+
+    SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+    COUNT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+    HELP = {
+        'phase_seconds': 'Duration of every phase of a refresh cycle.',
+        'league_seconds': 'Duration of collecting the games of a league.',
+        'cycle_round_trips': 'WebDriver commands sent during a refresh cycle.',
+        'cycles_total': 'Refresh cycles run.',
+        'webdriver_calls_total': 'WebDriver commands sent, by command.',
+        'stale_element_errors_total': 'WebDriver commands that failed on a stale element, by command.',
+        'retries_total': 'Retried operations, by operation.',
+        'wait_seconds': 'Time spent waiting for a condition on the page, by condition.',
+        'wait_timeouts_total': 'Waits for a condition on the page that timed out, by condition.',
+        'cycle_wait_seconds': 'Time spent waiting for conditions on the page during a refresh cycle.',
+        'skipped_total': 'Games and leagues skipped for a cycle, by scope and reason.',
+        'deadline_exceeded_total': 'Retries given up because their backoff would end past the deadline, by operation.',
+        'circuit_transitions_total': 'Circuits of failing games and leagues opened and closed, by scope and state.',
+        'feed_frames_total': 'Network feed responses and frames read, by status.',
+        'driver_recycles_total': 'Browsers recycled by the watchdog, by reason.',
+        'driver_recycle_failures_total': 'Replacement browsers that failed to launch or log in.',
+        'driver_replacement_seconds': 'Time to launch and log in a replacement browser.',
+        'pipeline_dropped_total': 'States dropped by a pipeline consumer that fell behind, by sink.',
+        'pipeline_coalesced_total': 'States merged into the last queued state of a full pipeline queue, by sink.',
+        'pipeline_sink_seconds': 'Time a pipeline consumer took for one state, by sink.',
+        'pipeline_ack_timeouts_total': 'States the UI did not acknowledge in time.',
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}  # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [count per bucket..., count above the last bucket, sum]
+        self.buckets = {'cycle_round_trips': self.COUNT_BUCKETS}  # name -> buckets, SECONDS_BUCKETS by default
+
+    @staticmethod
+    def label_key(labels):
+        return tuple(sorted(labels.items()))
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, self.label_key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        buckets = self.buckets.get(name, self.SECONDS_BUCKETS)
+        key = (name, self.label_key(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * (len(buckets) + 2)
+            index = next((index for index, bound in enumerate(buckets) if value <= bound), len(buckets))
+            histogram[index] += 1
+            histogram[-1] += value
+
+    @contextmanager
+    def time(self, name, **labels):
+        """Observes the duration of the block in seconds, also when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def instrument_driver(self, driver):
+        """
+        :return: a DriverCallCounter counting the commands of the driver from now on, the one already counting them
+                 if the driver was instrumented before, e.g. by the PlayManager that logged in a replacement browser.
+        """
+        counter = getattr(driver.execute, '__self__', None)
+        if isinstance(counter, DriverCallCounter):
+            return counter
+        return DriverCallCounter(self, driver)
+
+    @staticmethod
+    def format_labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ''
+        escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+        return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+    def prometheus_text(self):
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, list(value)) for key, value in self.histograms.items())
+        lines = []
+        described = set()
+        for (name, labels), value in counters:
+            if name not in described:
+                described.add(name)
+                lines.append(f'# HELP {self.PREFIX}{name} {self.HELP.get(name, name)}')
+                lines.append(f'# TYPE {self.PREFIX}{name} counter')
+            lines.append(f'{self.PREFIX}{name}{self.format_labels(labels)} {value}')
+        for (name, labels), histogram in histograms:
+            if name not in described:
+                described.add(name)
+                lines.append(f'# HELP {self.PREFIX}{name} {self.HELP.get(name, name)}')
+                lines.append(f'# TYPE {self.PREFIX}{name} histogram')
+            cumulative = 0
+            for bound, count in zip(self.buckets.get(name, self.SECONDS_BUCKETS), histogram):
+                cumulative += count
+                lines.append(f'{self.PREFIX}{name}_bucket{self.format_labels(labels, [("le", bound)])} {cumulative}')
+            cumulative += histogram[-2]
+            lines.append(f'{self.PREFIX}{name}_bucket{self.format_labels(labels, [("le", "+Inf")])} {cumulative}')
+            lines.append(f'{self.PREFIX}{name}_sum{self.format_labels(labels)} {histogram[-1]}')
+            lines.append(f'{self.PREFIX}{name}_count{self.format_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+    def as_dict(self):
+        """{'counters': [...], 'histograms': [...]} with the labels, buckets, count and sum of every series."""
+        with self.lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            histograms = []
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                buckets = self.buckets.get(name, self.SECONDS_BUCKETS)
+                histograms.append({'name': name, 'labels': dict(labels),
+                                   'buckets': dict(zip([str(bound) for bound in buckets] + ['+Inf'], histogram)),
+                                   'count': sum(histogram[:-1]), 'sum': histogram[-1]})
+        return {'counters': counters, 'histograms': histograms}
+
+
+def timed_phase(phase):
+    """Decorator observing the duration of a method of an object with a `metrics` attribute as a cycle phase."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.time('phase_seconds', phase=phase):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
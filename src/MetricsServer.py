@@ -0,0 +1,55 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+
+class MetricsServer:
+    """Serves the Metrics in the Prometheus text format on /metrics and as JSON on /metrics.json."""
+
+    def __init__(self, logger, metrics, host='127.0.0.1', port=9464):
+        self.logger = logger
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlparse(self.path).path
+                if path == '/metrics':
+                    body, content_type = metrics.prometheus_text(), 'text/plain; version=0.0.4'
+                elif path == '/metrics.json':
+                    body, content_type = json.dumps(metrics.as_dict()), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass  # Every scrape would be logged
+
+        try:
+            self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError as e:
+            self.logger.warning(f'Failed to start the metrics endpoint on {self.host}:{self.port}: {e}')
+            return False
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.logger.info(f'Serving metrics on http://{self.host}:{self.server.server_address[1]}/metrics')
+        return True
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,153 @@
+import base64
+import json
+import re
+import time
+
+
+class NetworkFeed:
+    """
+    Reads the games from the page's own network traffic instead of its rendered text. Chrome reports the XHR and
+    fetch responses and the WebSocket frames of the page in its performance log, which needs the goog:loggingPrefs
+    capability. The ones whose URL matches url_pattern are parsed as JSON and mapped to games by the field paths of
+    the feed config, dotted paths into a payload like 'home.score'.
+
+    Frames may carry only the changed fields of a game, they are merged into the last known state of the game by
+    its id field, or by its team names when there is no id.
+    """
+
+    GAME_FIELDS = ('league_name', 'first_team', 'second_team', 'first_team_score', 'second_team_score',
+                   'quarter_number', 'time_left')
+
+    def __init__(self, driver, logger, metrics, feed_config):
+        self.driver = driver
+        self.logger = logger
+        self.metrics = metrics
+        self.url_pattern = re.compile(feed_config['url_pattern'])
+        self.max_silence = feed_config['max_silence_in_sec']
+        self.fields = feed_config['fields']
+        self.available = None  # None until started, then whether the browser reports its network traffic
+        self.sockets = set()  # requestId of the WebSockets whose URL matches
+        self.responses = set()  # requestId of the matching responses whose body is not loaded yet
+        self.last_frame = None  # monotonic time of the last parsed frame, or of the start
+        self.games = {}  # game id -> merged state of the game
+
+    def start(self):
+        """:return: whether the network traffic can be read, else the games must be collected from the page."""
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.get_log('performance')
+            self.available = True
+        except Exception as e:
+            self.logger.warning(f'The network feed is not available, collecting the games from the page: {e}')
+            self.available = False
+        self.last_frame = time.monotonic()
+        return self.available
+
+    def silent(self):
+        """Whether no frame arrived for max_silence seconds, e.g. the site moved its feed to another URL."""
+        return time.monotonic() - self.last_frame >= self.max_silence
+
+    def drain(self):
+        """:return: the bodies of the matching responses and frames received since the last drain."""
+        payloads = []
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+            method, params = message.get('method'), message.get('params', {})
+            if method == 'Network.webSocketCreated' and self.url_pattern.search(params.get('url', '')):
+                self.sockets.add(params['requestId'])
+            elif method == 'Network.webSocketFrameReceived' and params.get('requestId') in self.sockets:
+                frame = params['response']
+                # Binary frames (opcode 2) are reported in base64
+                self.append_payload(payloads, frame['payloadData'], frame.get('opcode') == 2)
+            elif (method == 'Network.responseReceived' and params.get('type') in ('XHR', 'Fetch')
+                  and params['response'].get('status') == 200 and self.url_pattern.search(params['response']['url'])):
+                self.responses.add(params['requestId'])
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self.responses:
+                self.responses.discard(params['requestId'])
+                try:
+                    body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': params['requestId']})
+                except Exception as e:
+                    self.logger.debug(f'The body of response {params["requestId"]} is gone: {e}')
+                    continue
+                self.append_payload(payloads, body['body'], body.get('base64Encoded'))
+        return payloads
+
+    def append_payload(self, payloads, data, base64_encoded):
+        """Skips a payload that isn't UTF-8 text, e.g. a compressed frame, instead of losing the rest of the batch."""
+        try:
+            payloads.append(base64.b64decode(data).decode('utf-8') if base64_encoded else data)
+        except ValueError:
+            self.metrics.inc('feed_frames_total', status='unreadable')
+
+    def read_games(self, payloads):
+        """
+        :return: the merged state of every game updated by the payloads, each {'league_name', 'first_team',
+                 'second_team', 'first_team_score', 'second_team_score', 'quarter_number', 'time_left', 'rows'}
+                 where rows are the (row_index, total, over, under) lines of the total table, None if not known yet.
+        """
+        updated = {}
+        for payload in payloads:
+            try:
+                items = self.value(json.loads(payload), self.fields['games'])
+            except ValueError:
+                self.metrics.inc('feed_frames_total', status='unreadable')
+                continue
+            if isinstance(items, dict):
+                items = [items]
+            if not isinstance(items, list):
+                self.metrics.inc('feed_frames_total', status='unreadable')
+                continue
+            self.metrics.inc('feed_frames_total', status='parsed')
+            self.last_frame = time.monotonic()
+            for item in items:
+                game_id = self.merge(item)
+                if game_id is not None:
+                    updated[game_id] = self.games[game_id]
+        return [game for game in updated.values()
+                if game['league_name'] and game['first_team'] and game['second_team']]
+
+    def merge(self, item):
+        """Merges a game of a frame into its known state. :return: the id of the game, None if it has none."""
+        game_id = self.value(item, self.fields['id']) if self.fields.get('id') else None
+        if game_id is None:
+            first_team, second_team = (self.value(item, self.fields['first_team']),
+                                       self.value(item, self.fields['second_team']))
+            if first_team is None or second_team is None:
+                return None
+            game_id = f'{first_team} vs {second_team}'
+        game = self.games.setdefault(game_id, dict.fromkeys(self.GAME_FIELDS + ('rows',)))
+        for field in self.GAME_FIELDS:
+            value = self.value(item, self.fields[field])
+            if value is not None:
+                game[field] = value
+        lines = self.value(item, self.fields['totals'])
+        if isinstance(lines, list):
+            game['rows'] = self.total_rows(lines)
+        return game_id
+
+    def total_rows(self, lines):
+        """:return: the lines as (row_index, total, over, under) rows, like DomSnapshot.collect_total_rows."""
+        rows = []
+        for row_index, line in enumerate(lines):
+            try:
+                rows.append((row_index, float(self.value(line, self.fields['total'])),
+                             float(self.value(line, self.fields['over'])),
+                             float(self.value(line, self.fields['under']))))
+            except (TypeError, ValueError):
+                self.logger.debug(f'Skipping unreadable total line {row_index}: {line}')
+        return rows
+
+    @staticmethod
+    def value(item, path):
+        """The value at a dotted path of a payload, e.g. 'home.score'. An empty path is the item itself."""
+        for key in path.split('.') if path else ():
+            if isinstance(item, dict):
+                item = item.get(key)
+            elif isinstance(item, list) and key.isdigit() and int(key) < len(item):
+                item = item[int(key)]
+            else:
+                return None
+        return item
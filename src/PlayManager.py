@@ -1,19 +1,48 @@
+import random
+import threading
 import time
 from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
 from selenium.common.exceptions import TimeoutException, WebDriverException, NoSuchElementException, \
-    ElementClickInterceptedException, StaleElementReferenceException
+    ElementClickInterceptedException
 
 from selenium.webdriver.common.by import By
 
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from ChangeFeed import ChangeFeed
+from CircuitBreaker import CircuitBreaker
+from DomSnapshot import DomSnapshot
+from GameState import GameSchema, GameState
+from LogPipeline import KEEP_RECORD
+from Metrics import Metrics, timed_phase
+from NetworkFeed import NetworkFeed
+from RefreshScheduler import RefreshScheduler
+from StatePublisher import StatePublisher
+from TotalsRule import TotalsRule
+from WaitEngine import WaitEngine
+
 
 class PlayManager(QObject):  # Inherit QObject for threading
     finished = pyqtSignal()  # Signal to emit when the PlayManager is done
-    data_updated = pyqtSignal(dict, dict)
-
-    def __init__(self, driver, logger, max_try_count, elements, point_difference, refreshTime, game_window):
+    state_published = pyqtSignal(object)  # StateDelta carrying the new immutable StateSnapshot
+    leagues_discovered = pyqtSignal(dict)  # Every league on the page with its games count, after a full scan
+    driver_recycled = pyqtSignal(object)  # The new WebDriver, after the watchdog replaced the browser
+
+    def __init__(self, driver, logger, max_try_count, elements, point_difference, refreshTime, game_window,
+                 use_dom_snapshot=False, use_change_feed=False, full_resync_interval=20, scheduler_config=None,
+                 recorder=None, metrics=None, history=None, session_store=None, wait_budget=None,
+                 resilience_config=None, network_feed_config=None, watchdog=None):
+        """
+        :param recorder: optional SessionRecorder capturing the pages and total tables this manager reads.
+        :param session_store: optional SessionStore, to resume the saved browser session instead of logging in.
+        :param history: optional HistoryStore recording the scores, total tables and marks of every game.
+        :param metrics: Metrics shared with the other managers and the GameWindow, a private one if not given.
+        :param wait_budget: seconds all the waits for the page of a cycle may take together, refreshTime by default.
+        :param resilience_config: time budgets of a game and a cycle, retry backoff and circuit breaker settings.
+        :param network_feed_config: when enabled, the games are read from the page's network traffic, see NetworkFeed.
+        :param watchdog: optional DriverWatchdog recycling the browser when it grew too heavy.
+        """
         super().__init__()  # Initialize QObject
         logger.info(f'Initializing the game manager...')
         self.logger = logger
@@ -23,6 +52,7 @@ class PlayManager(QObject):  # Inherit QObject for threading
         self.password = ""
         self.point_difference = point_difference
         self.elements = elements
+        self.schema = GameSchema(elements)  # Config constants of the hot path, resolved once
         self.refresh_elapse_time = refreshTime
         self.basketballLeagues = {}  # Dictionary to store leagues and their games
         self.marked_games = {}  # Dictionary to store games marked for betting
@@ -30,7 +60,60 @@ class PlayManager(QObject):  # Inherit QObject for threading
         self.game_window = game_window  # Reference to the GameWindow instance
         self.attempt_count = 0
         self.max_attempts = max_try_count
+        self.metrics = metrics or Metrics()
+        self.wait_budget = wait_budget or refreshTime
+        self.use_dom_snapshot = use_dom_snapshot
+        self.totals_rule = TotalsRule(point_difference, elements)
+        self.use_change_feed = use_change_feed
+        self.full_resync_interval = full_resync_interval
+        self.snapshot_game_count = 0
+        self.league_shard = None  # Leagues this manager collects when it runs in a worker pool, None for all
+        self.staged_league_shard = None  # Shard set from the pool's thread, applied when the next cycle starts
+        self.shard_lock = threading.Lock()
+        self.publisher = StatePublisher(self.schema)
+        self.scheduler = RefreshScheduler(logger, elements, refreshTime, scheduler_config or {
+            'enabled': False, 'hot_interval_in_sec': refreshTime, 'cold_interval_in_sec': refreshTime,
+            'hot_time_left_in_sec': 0, 'odds_moving_threshold': 1})
+        self.recorder = recorder
+        self.history = history
+        self.session_store = session_store
+        self.pending_marks = []  # (league_name, game_key, first_total_score, rows) of the total tables read this cycle
+        self.resume_league_index = 0  # Position of the league the legacy collection starts with, see collect_game_data
+        self.first_total_pending = set()  # (league_name, game_key) of games added before their total table was read
+        resilience_config = resilience_config or {
+            'game_budget_in_sec': refreshTime, 'cycle_budget_in_sec': refreshTime, 'retry_backoff_in_sec': 0.1,
+            'max_retry_backoff_in_sec': 1, 'failure_threshold': 3, 'cooldown_in_sec': 60}
+        self.game_budget = resilience_config['game_budget_in_sec']
+        self.cycle_budget = resilience_config['cycle_budget_in_sec']
+        self.retry_backoff = resilience_config['retry_backoff_in_sec']
+        self.max_retry_backoff = resilience_config['max_retry_backoff_in_sec']
+        self.game_breaker = CircuitBreaker(logger, self.metrics, 'game', resilience_config['failure_threshold'],
+                                           resilience_config['cooldown_in_sec'])
+        self.league_breaker = CircuitBreaker(logger, self.metrics, 'league', resilience_config['failure_threshold'],
+                                             resilience_config['cooldown_in_sec'])
+        self.cycle_deadline = None  # perf_counter time the collection of the current cycle should end by
+        self.cycle_skips = {}  # reason -> games and leagues skipped this cycle
+        self.network_feed_config = network_feed_config
+        self.use_network_feed = bool(network_feed_config and network_feed_config['enabled'])
+        self.feed_rows = None  # Total table rows of the game being stored from the network feed
+        self.watchdog = watchdog
+        self.bind_driver(driver)
+
+    def bind_driver(self, driver):
+        """Binds the helpers working on the browser to driver, at start and when the watchdog recycles the browser."""
         self.driver = driver
+        self.waits = WaitEngine(driver, self.metrics, self.wait_budget)
+        self.dom_snapshot = DomSnapshot(driver, self.logger, self.elements, self.waits)
+        self.change_feed = ChangeFeed(driver, self.logger, self.elements)
+        self.network_feed = NetworkFeed(driver, self.logger, self.metrics, self.network_feed_config) \
+            if self.use_network_feed else None
+        self.driver_calls = self.metrics.instrument_driver(driver)
+        if self.recorder:
+            self.recorder.driver = driver
+        self.cycles_since_resync = self.full_resync_interval  # The new page is read in full first
+        self.opened_game = None  # (league_name, game_key) of the game whose total table is shown
+        self.last_table_rows = None  # Rows last read from the total table
+        self.table_switched = False  # Another game was opened since the total table was last read
 
     def open_live_events_window(self, attempt_count, max_attempts, required_substring):
         while attempt_count < max_attempts:
@@ -54,7 +137,9 @@ class PlayManager(QObject):  # Inherit QObject for threading
                                                                           'first_game_link_class'])
                             if first_game_link is not None:
                                 first_game_link.click()
-                                time.sleep(1)  # Wait for the game page to load
+                                # Wait for the game page to load
+                                self.waits.until('live_events_page', self.waits.url_contains(required_substring),
+                                                 timeout=5)
                                 break
 
                     # Increment the attempt count
@@ -78,14 +163,17 @@ class PlayManager(QObject):  # Inherit QObject for threading
                 return False  # Stop the method if the navigation was unsuccessful
 
     def login(self, url, basketballUrl, username, password):
+        self.url = url
+        self.basketballUrl = basketballUrl
+        self.username = username
+        self.password = password
+        if self.session_store and self.resume_session():
+            return self.open_live_events_window(self.attempt_count, self.max_attempts,
+                                                self.elements["consts"]['live_events_suffix'])
         curr_retry = 0
         while curr_retry < self.max_attempts:
             try:
                 self.logger.info('Logging in to the site...')
-                self.url = url
-                self.basketballUrl = basketballUrl
-                self.username = username
-                self.password = password
 
                 # Open the login page
                 self.driver.get(self.url)
@@ -104,64 +192,332 @@ class PlayManager(QObject):  # Inherit QObject for threading
                 if login_button is not None:
                     login_button.click()
 
-                # Wait for navigation to the main page after login
-                time.sleep(3)
+                # Wait for navigation to the main page after login, at most 3 seconds
+                self.waits.until('login_submitted', self.waits.element_stale(login_button), timeout=3)
                 # Navigate to the basketball page after login
                 self.driver.get(self.basketballUrl)
-                time.sleep(3)
+                self.wait_for_live_page()
+                if self.session_store:
+                    self.session_store.save(self.driver, self.username, self.url)
 
                 return self.open_live_events_window(self.attempt_count, self.max_attempts,
                                                     self.elements["consts"]['live_events_suffix'])
             except TimeoutException as e:
                 self.logger.error(f"Timeout error during login process: {str(e)}")
                 curr_retry += 1
+                self.metrics.inc('retries_total', operation='login')
 
             except Exception as e:
                 self.logger.critical(f"Received an error during game login process: {str(e)}")
                 curr_retry += 1
+                self.metrics.inc('retries_total', operation='login')
+        return False
+
+    def resume_session(self):
+        """
+        Opens the basketball page with the saved browser session.
+        :return: True if the session is still logged in, else the login form has to be filled.
+        """
+        if not self.session_store.restore(self.driver, self.username, self.url):
+            return False
+        try:
+            self.driver.get(self.basketballUrl)
+            if self.wait_for_live_page():
+                self.logger.info('The saved browser session is still logged in, skipping the login form.')
+                return True
+        except Exception as e:
+            self.logger.warning(f'Failed to open the basketball page with the saved browser session: {e}')
+        self.logger.info('The saved browser session is no longer logged in.')
+        self.session_store.discard(self.username, self.url)
+        self.driver.delete_all_cookies()
         return False
 
+    def wait_for_live_page(self, timeout=3):
+        """
+        Waits up to timeout seconds for the page to show leagues or the login form.
+        :return: False if the login form is shown.
+        """
+        league_headers = (By.CLASS_NAME, self.elements["consts"]['league_headers_class_name'])
+        login_field = (By.NAME, self.elements["consts"]['login_username_element_name'])
+        # Times out when there are no live games right now
+        shown = self.waits.until('live_page', self.waits.any_element_present(league_headers, login_field), timeout)
+        if shown == login_field:
+            return False
+        if shown:
+            # Let the leagues finish rendering before the first collection
+            self.waits.until('live_page_stable', self.waits.dom_stable(0.3), timeout=2)
+        return not self.driver.find_elements(*login_field)
+
     @pyqtSlot(bool)
     def stop(self, stopping=True):
         """Stops the infinite loop in the play method."""
         self.logger.info('Stopping the game loop...')
         self.stop_flag = True
 
+    def set_league_shard(self, league_shard):
+        """
+        Restricts collection to the given leagues. Called by the worker pool, from its own thread, when leagues are
+        rebalanced. The play loop does not run an event loop, so the shard is staged and applied by apply_league_shard
+        when the next cycle starts, never in the middle of one.
+        """
+        with self.shard_lock:
+            self.staged_league_shard = league_shard
+
+    def apply_league_shard(self):
+        with self.shard_lock:
+            league_shard, self.staged_league_shard = self.staged_league_shard, None
+        if league_shard is not None:
+            self.logger.info(f'Collecting leagues: {sorted(league_shard)}')
+            self.league_shard = league_shard
+            self.cycles_since_resync = self.full_resync_interval
+
+    def owns_league(self, league_name):
+        return self.league_shard is None or league_name in self.league_shard
+
     def play(self):
         self.logger.info('Starting game monitoring...')
         try:
             while not self.stop_flag:  # Make sure to check for this flag
-                # Your game monitoring logic
+                cycle_started = time.perf_counter()
+                self.run_cycle()
+                if self.watchdog:
+                    self.watchdog.cycle_finished(time.perf_counter() - cycle_started)
+                    self.check_driver()
+
+                # Sleep until the next game is due, at most the configured refresh time
+                if self.scheduler.enabled:
+                    self.logger.debug(f'Poll rate decisions: {self.scheduler.decisions()}')
+                time.sleep(self.scheduler.next_wakeup(self.refresh_elapse_time))
+        except Exception as e:
+            self.logger.error(f"Unexpected error during play method: {str(e)}")
+        finally:
+            if self.session_store:
+                self.session_store.save(self.driver, self.username, self.url)
+            if self.recorder:
+                self.recorder.close()
+            if self.watchdog:
+                self.watchdog.close()
+
+    def check_driver(self):
+        """
+        Between two cycles, starts preparing a replacement of the browser when the watchdog finds it too heavy, and
+        swaps it in once it is logged in on the live events page.
+        """
+        replacement = self.watchdog.take_replacement()
+        if replacement:
+            old_driver = self.driver
+            self.bind_driver(replacement)
+            self.logger.info('Swapped in the replacement browser, closing the old one...')
+            self.driver_recycled.emit(replacement)
+            self.watchdog.quit(old_driver)
+            return
+        reason = self.watchdog.recycle_reason(self.driver)
+        if reason:
+            # The replacement resumes the current session instead of filling the login form, when sessions are kept
+            if self.session_store:
+                self.session_store.save(self.driver, self.username, self.url)
+            self.watchdog.prepare_replacement(reason, (self.url, self.basketballUrl, self.username, self.password))
+
+    def run_cycle(self):
+        """One collection cycle: collects the games with the configured method and publishes the changes."""
+        self.apply_league_shard()
+        driver_calls = self.driver_calls.calls
+        self.cycle_deadline = time.perf_counter() + self.cycle_budget
+        self.cycle_skips = {}
+        with self.metrics.time('phase_seconds', phase='cycle'), self.waits.cycle():
+            with self.metrics.time('phase_seconds', phase='url_check'):
                 if self.elements["consts"]['live_events_suffix'] not in self.driver.current_url:
                     self.open_live_events_window(self.attempt_count, self.max_attempts,
                                                  self.elements["consts"]['live_events_suffix'])
-                self.collect_game_data()
+            with self.metrics.time('phase_seconds', phase='collect'):
+                if self.use_network_feed:
+                    self.collect_game_data_network()
+                else:
+                    self.collect_game_data_page()
+            self.mark_pending_games()
+
+            # Publish the changes of this cycle to the UI
+            self.publish_state()
+            if self.recorder:
+                self.recorder.capture_page()
+        self.cycle_deadline = None
+        if self.cycle_skips:
+            self.logger.warning(f'Skipped this cycle: {self.cycle_skips}')
+        self.metrics.inc('cycles_total')
+        self.metrics.observe('cycle_round_trips', self.driver_calls.calls - driver_calls)
+
+    def collect_game_data_page(self):
+        """Collects the games from the rendered page with the configured method."""
+        if self.use_change_feed:
+            self.collect_game_data_incremental()
+        else:
+            self.collect_game_data_full()
+
+    def collect_game_data_full(self):
+        """Collects every game from the rendered page."""
+        if self.use_dom_snapshot:
+            self.collect_game_data_snapshot()
+        else:
+            self.collect_game_data()
+
+    def collect_game_data_network(self):
+        """
+        Updates the games from the network feed frames the page received since the last cycle. The games are
+        collected from the page as well every full_resync_interval cycles, which also cleans up the ended games, and
+        every cycle while the feed is not available or silent.
+        """
+        if self.network_feed.available is None:
+            self.network_feed.start()
+        self.cycles_since_resync += 1
+        if (not self.network_feed.available or self.network_feed.silent()
+                or self.cycles_since_resync >= self.full_resync_interval):
+            self.collect_game_data_full()
+            self.cycles_since_resync = 0
+        if not self.network_feed.available:
+            return
 
-                # Emit the latest game data to the UI
-                self.data_updated.emit(self.basketballLeagues, self.marked_games)
-
-                time.sleep(self.refresh_elapse_time)  # Adjust refresh time to prevent blocking
+        try:
+            payloads = self.network_feed.drain()
+            if self.recorder and payloads:
+                self.recorder.capture_frames(payloads)
+            games = self.network_feed.read_games(payloads)
         except Exception as e:
-            self.logger.error(f"Unexpected error during play method: {str(e)}")
+            self.logger.warning(f"Error reading the network feed: {e}")
+            return
+        self.logger.debug(f'Applying {len(games)} games from {len(payloads)} network feed frames')
+        for game in games:
+            league_name = game['league_name']
+            if not self.owns_league(league_name):
+                continue
+            if league_name not in self.basketballLeagues:
+                self.basketballLeagues[league_name] = {}
+            game_id = f"{league_name}/{game['first_team']} vs {game['second_team']}"
+            if not self.game_allowed(game_id, league_name, {}, budget=False):
+                continue
+            # The total table is read from the frames, not from the page
+            self.feed_rows = game['rows'] or []
+            try:
+                with self.waits.deadline(self.game_budget):
+                    self.store_game_info(league_name, {}, game['first_team'], game['second_team'],
+                                         game['first_team_score'] or 0, game['second_team_score'] or 0,
+                                         game['quarter_number'] or '', game['time_left'] or '')
+                self.game_breaker.record_success(game_id)
+            except Exception as e:
+                self.game_breaker.record_failure(game_id)
+                self.logger.warning(
+                    f"Error collecting data for a game of team {game['first_team']} in league {league_name}: {e}")
+            finally:
+                self.feed_rows = None
+        self.scheduler.reschedule_due(self.basketballLeagues, self.marked_games)
+
+    @timed_phase('publish')
+    def publish_state(self):
+        """Emits a versioned snapshot of the state with the delta of this cycle, if anything changed."""
+        delta = self.publisher.publish(self.basketballLeagues, self.marked_games)
+        if delta:
+            self.state_published.emit(delta)
+
+    def cycle_time_left(self):
+        if self.cycle_deadline is None:
+            return float('inf')
+        return self.cycle_deadline - time.perf_counter()
+
+    def skip(self, scope, reason, league_name, current_games_lists):
+        """
+        Skips a game or league for this cycle. The known games of the league are kept, so they aren't cleaned up as
+        inactive before they could be read again.
+        """
+        self.cycle_skips[reason] = self.cycle_skips.get(reason, 0) + 1
+        self.metrics.inc('skipped_total', scope=scope, reason=reason)
+        known_games = current_games_lists.setdefault(league_name, [])
+        known_games += [game_key for game_key in self.basketballLeagues.get(league_name, {})
+                        if game_key not in known_games]
+
+    def league_allowed(self, league_name, current_games_lists, budget=True):
+        """
+        :param budget: whether collecting the league takes time of the cycle budget, False when its games are only
+                       updated from a snapshot already in memory.
+        :return: whether the games of the league are collected this cycle.
+        """
+        if budget and self.cycle_time_left() <= 0:
+            self.skip('league', 'cycle_budget', league_name, current_games_lists)
+        elif not self.league_breaker.allow(league_name):
+            self.skip('league', 'circuit_open', league_name, current_games_lists)
+        else:
+            return True
+        return False
+
+    def game_allowed(self, game_id, league_name, current_games_lists, budget=True):
+        """
+        :param budget: whether collecting the game takes time of the cycle budget, see league_allowed.
+        :return: whether the game is collected this cycle.
+        """
+        if budget and self.cycle_time_left() <= 0:
+            self.skip('game', 'cycle_budget', league_name, current_games_lists)
+        elif not self.game_breaker.allow(game_id):
+            self.skip('game', 'circuit_open', league_name, current_games_lists)
+        else:
+            return True
+        return False
+
+    def back_off(self, retry, operation):
+        """
+        Waits a jittered exponential backoff before a retry of operation.
+        :return: False when the retry is past max_attempts or the backoff would end past the deadline of the waits.
+        """
+        if retry >= self.max_attempts:
+            return False
+        backoff = random.uniform(0, min(self.max_retry_backoff, self.retry_backoff * 2 ** (retry - 1)))
+        if backoff >= self.waits.time_left():
+            self.metrics.inc('deadline_exceeded_total', operation=operation)
+            return False
+        self.waits.pause('retry_backoff', backoff)
+        self.metrics.inc('retries_total', operation=operation)
+        return True
 
     def collect_game_data(self):
         self.logger.debug('Collecting games data...')
-        wait = WebDriverWait(self.driver, 10)
         try:
             # Locate basketball section container
-            basketball_section = wait.until(EC.presence_of_element_located(
-                (By.XPATH, self.elements["consts"]['basketball_section_container_xpath'])))
+            basketball_section = self.waits.until('basketball_section', self.waits.element_present(
+                (By.XPATH, self.elements["consts"]['basketball_section_container_xpath'])), timeout=10)
+            if basketball_section is None:
+                raise TimeoutException('The basketball section is not on the page.')
             leagues = basketball_section.find_elements(By.CLASS_NAME, self.elements["consts"]['leagues_section_class'])
 
             previous_league_header = None
             current_games_lists = {}
-
-            for league in leagues:
+            discovered_leagues = {}
+
+            # Starts where the cycle budget ran out last cycle, so the leagues down the page get their turn
+            start = self.resume_league_index % len(leagues) if leagues else 0
+            self.resume_league_index = 0
+            for position in list(range(start, len(leagues))) + list(range(start)):
+                league = leagues[position]
+                league_name = None
                 try:
                     # Locate and expand the league header if needed
                     league_header = league.find_element(By.CLASS_NAME, self.elements["consts"]['leagues_header_class'])
                     league_name = league_header.text.strip()
 
+                    # Leagues of other workers are only counted, their games are not read.
+                    discovered_leagues[league_name] = 1
+                    if not self.owns_league(league_name):
+                        continue
+
+                    # Leagues without a due game keep their known games until their next scan.
+                    known_games = list(self.basketballLeagues.get(league_name, {}))
+                    if not self.scheduler.is_league_due(league_name, known_games):
+                        discovered_leagues[league_name] = max(len(known_games), 1)
+                        current_games_lists[league_name] = known_games
+                        continue
+                    if not self.league_allowed(league_name, current_games_lists):
+                        discovered_leagues[league_name] = max(len(known_games), 1)
+                        if not self.resume_league_index and self.cycle_time_left() <= 0:
+                            self.resume_league_index = position
+                        continue
+
+                    league_started = time.perf_counter()
                     if league_name not in self.basketballLeagues:
                         self.basketballLeagues[league_name] = {}
 
@@ -171,15 +527,28 @@ class PlayManager(QObject):  # Inherit QObject for threading
                         previous_league_header.click()
 
                     # Expand the current league if it's collapsed
+                    games_locator = (By.CLASS_NAME, self.elements["consts"]['games_in_league_class'])
                     if self.elements["consts"]['collapsed_league_class'] not in league_header.get_attribute('class'):
                         league_header.click()
+                        self.waits.until('league_expanded', self.waits.element_present(games_locator, league),
+                                         timeout=1)
 
                     # Collect data from each game in the league
-                    games = league.find_elements(By.CLASS_NAME, self.elements["consts"]['games_in_league_class'])
+                    games = league.find_elements(*games_locator)
+                    discovered_leagues[league_name] = max(len(games), 1)
+                    failed_games = 0
                     for index, game in enumerate(games):
+                        # The legacy path only reads the names of a game when collecting it, so its position is its id
+                        game_id = f'{league_name}#{index}'
+                        if not self.game_allowed(game_id, league_name, current_games_lists):
+                            continue
                         try:
-                            self.collect_game_info(index, game, league_name, current_games_lists)
+                            with self.waits.deadline(self.game_budget):
+                                self.collect_game_info(index, game, league_name, current_games_lists)
+                            self.game_breaker.record_success(game_id)
                         except Exception as e:
+                            failed_games += 1
+                            self.game_breaker.record_failure(game_id)
                             try:
                                 g = game.find_element(By.CLASS_NAME,
                                                       self.elements["consts"]['first_team_name_class']).text
@@ -188,167 +557,380 @@ class PlayManager(QObject):  # Inherit QObject for threading
                             self.logger.warning(
                                 f"Error collecting data for a game of team {g} in league {league_name}: {e}")
 
+                    self.record_league_result(league_name, len(games), failed_games)
+                    if self.cycle_time_left() <= 0:
+                        # Some of its games may have been skipped, the league stays due and comes first next cycle
+                        self.resume_league_index = self.resume_league_index or position
+                    else:
+                        self.scheduler.league_polled(league_name)
+                    self.metrics.observe('league_seconds', time.perf_counter() - league_started, league=league_name)
                     previous_league_header = league_header
                 except (NoSuchElementException, Exception) as e:
                     self.logger.warning(f"Error processing league: {e}")
+                    if league_name:
+                        self.league_breaker.record_failure(league_name)
                     continue
 
             # Remove games that are no longer active
             self.clean_up_inactive_games(current_games_lists)
+            self.leagues_discovered.emit(discovered_leagues)
 
         except (TimeoutException, Exception) as e:
             self.logger.warning(f"Error in collect_game_data: {str(e)}")
 
-    def collect_game_info(self, game_index, game, league_name, current_games_lists):
-        """Helper method to collect information for a specific game."""
+    def record_league_result(self, league_name, game_count, failed_games):
+        """A league failed when none of its games could be collected."""
+        if game_count and failed_games == game_count:
+            self.league_breaker.record_failure(league_name)
+        else:
+            self.league_breaker.record_success(league_name)
+
+    def collect_game_data_snapshot(self):
+        """Collects all leagues and games from one DOM snapshot instead of a WebDriver call per field."""
+        self.logger.debug('Collecting games data from DOM snapshot...')
         try:
-            self.logger.info(f'Clicking game at league {league_name} at index {game_index}.')
-            game.click()
-            # Collect game data
-            self.logger.info(f'Starting collect game data...')
-            first_team_name = game.find_element(By.CLASS_NAME, self.elements["consts"]['first_team_name_class']).text
-            second_team_name = game.find_element(By.CLASS_NAME, self.elements["consts"]['second_team_name_class']).text
-            team_scores = game.find_elements(By.CLASS_NAME, self.elements["consts"]['game_scores_pair_section'])
-
-            first_team_score = team_scores[0].text if len(team_scores) >= 2 else 0
-            second_team_score = team_scores[1].text if len(team_scores) >= 2 else 0
-            quarter_number = game.find_element(By.CLASS_NAME, self.elements["consts"]['quarter_number_class']).text
-            time_left = game.find_element(By.CLASS_NAME, self.elements["consts"]['time_left_class']).text
-
-            self.logger.info(f'Creating key...')
-            game_key = f"{first_team_name} vs {second_team_name}"
-
-            self.logger.info(f'Inserting into games list...')
-            if league_name not in current_games_lists:
-                current_games_lists[league_name] = []
-            if game_key not in current_games_lists[league_name]:
-                current_games_lists[league_name].append(game_key)
-
-            self.logger.info(f'Inserting into games list...')
-            if (first_team_name == '' or second_team_name == '' or first_team_score == 'N/A' or
-                    second_team_score == 'N/A' or quarter_number == 'NS' or time_left == '--:--'):
-                self.logger.info(f'The game {game_key} has no 2 team names or score. cannot collect. ')
+            leagues = self.waits.until('dom_snapshot', self.dom_snapshot.collect, timeout=10)
+            if leagues is None:
+                raise TimeoutException('The basketball section is not on the page.')
+            current_games_lists = {}
+            table_reads = []
+            self.snapshot_game_count = sum(len(league['games']) for league in leagues)
+
+            for league in leagues:
+                league_name = league['name']
+                if not league_name or not self.owns_league(league_name):
+                    continue
+                if not self.league_allowed(league_name, current_games_lists, budget=False):
+                    continue
+                league_started = time.perf_counter()
+                if league_name not in self.basketballLeagues:
+                    self.basketballLeagues[league_name] = {}
+
+                # Leagues are left expanded, so their games are part of the next snapshots.
+                if not league['expanded']:
+                    try:
+                        league['header'].click()
+                    except Exception as e:
+                        self.logger.warning(f"Error expanding league {league_name}: {e}")
+
+                failed_games = 0
+                for index, game in enumerate(league['games']):
+                    if not self.collect_snapshot_game(index, game, league_name, current_games_lists, table_reads):
+                        failed_games += 1
+                self.record_league_result(league_name, len(league['games']), failed_games)
+                self.metrics.observe('league_seconds', time.perf_counter() - league_started, league=league_name)
+            self.read_due_tables(table_reads, current_games_lists)
+
+            # Remove games that are no longer active
+            self.clean_up_inactive_games(current_games_lists)
+            self.leagues_discovered.emit({league['name']: max(len(league['games']), 1)
+                                          for league in leagues if league['name']})
+
+        except (TimeoutException, Exception) as e:
+            self.logger.warning(f"Error in collect_game_data_snapshot: {str(e)}")
+
+    def collect_game_data_incremental(self):
+        """
+        Updates only the games reported by the change feed. A full snapshot resync is done every
+        full_resync_interval cycles, or earlier when the feed reports drift: the observer is gone, games or leagues
+        were added or removed, or the change buffer overflowed.
+        """
+        self.cycles_since_resync += 1
+        if self.cycles_since_resync < self.full_resync_interval:
+            try:
+                delta = self.change_feed.drain()
+            except Exception as e:
+                self.logger.warning(f"Error draining the change feed: {e}")
+                delta = None
+            if (delta is not None and not delta['structural'] and not delta['overflow']
+                    and delta['game_count'] == self.snapshot_game_count):
+                self.apply_change_delta(delta)
                 return
+            self.logger.info('Change feed drifted from the page, resyncing all games...')
 
-            self.logger.info(f'Creating game object...')
-            game_data = {
-                self.elements['consts']['first_team']: first_team_name,
-                self.elements['consts']['second_team']: second_team_name,
-                self.elements['consts']['first_team_score']: first_team_score,
-                self.elements['consts']['second_team_score']: second_team_score,
-                self.elements['consts']['total_score']: (int(first_team_score) + int(second_team_score)),
-                self.elements['consts']['quarter_number']: quarter_number,
-                self.elements['consts']['time_left']: time_left
-            }
-
-            self.logger.info(f'Updating game on collections')
-            # Add new game or update existing one
-            if game_key in self.basketballLeagues[league_name]:
-                self.update_game_data(game_key, game_data, league_name)
-            else:
-                self.add_new_game(game_key, game_data, league_name)
-
-        except (ElementClickInterceptedException, NoSuchElementException, TimeoutException, Exception) as e:
+        try:
+            # Installed before the snapshot so changes made while it is processed are part of the next delta.
+            if not self.change_feed.install():
+                self.logger.warning('Could not install the change feed, the basketball section was not found.')
+        except Exception as e:
+            self.logger.warning(f"Error installing the change feed: {e}")
+        self.collect_game_data_snapshot()
+        self.cycles_since_resync = 0
+
+    def apply_change_delta(self, delta):
+        """Updates the changed games and re-checks the opened game if only its total table changed."""
+        self.logger.debug(f"Applying change feed delta of {len(delta['games'])} games")
+        changed_games = set()
+        table_reads = []
+        for game in delta['games']:
+            league_name = game['league_name']
+            if not self.owns_league(league_name):
+                continue
+            if league_name not in self.basketballLeagues:
+                self.basketballLeagues[league_name] = {}
+            if self.collect_snapshot_game(None, game, league_name, {}, table_reads):
+                changed_games.add((league_name, f"{game['first_team']} vs {game['second_team']}"))
+        self.read_due_tables(table_reads, {})
+
+        if delta['tables_changed'] and self.opened_game and self.opened_game not in changed_games:
+            league_name, game_key = self.opened_game
+            if game_key in self.basketballLeagues.get(league_name, {}):
+                self.check_table_mark(league_name, game_key, self.basketballLeagues[league_name][game_key])
+        self.scheduler.reschedule_due(self.basketballLeagues, self.marked_games)
+
+    def collect_snapshot_game(self, game_index, game, league_name, current_games_lists, table_reads):
+        """
+        Updates a game read by the DOM snapshot within the time budget of a game, unless its circuit is open. The
+        game's fields are in memory, so they are updated even when the cycle is out of time, and a due total table
+        is added to table_reads for read_due_tables.
+        :return: False if collecting the game failed.
+        """
+        game_id = f"{league_name}/{game['first_team']} vs {game['second_team']}"
+        if not self.game_allowed(game_id, league_name, current_games_lists, budget=False):
+            return True
+        try:
+            with self.waits.deadline(self.game_budget):
+                self.collect_snapshot_game_info(game_index, game, league_name, current_games_lists, table_reads)
+            self.game_breaker.record_success(game_id)
+            return True
+        except Exception as e:
+            self.game_breaker.record_failure(game_id)
             self.logger.warning(
-                f"Exception on collect_game_info for game at index {game_index} in league {league_name}: {e}"
-                f" Retrying...")
-            time.sleep(1)
-            self.collect_game_info(game_index, game, league_name, current_games_lists)  # Retry
+                f"Error collecting data for a game of team {game['first_team']} in league {league_name}: {e}")
+            return False
+
+    @timed_phase('collect_game')
+    def collect_snapshot_game_info(self, game_index, game, league_name, current_games_lists, table_reads):
+        """Helper method to store a game read by the DOM snapshot. The game is clicked only when its total
+        table is about to be read, by read_due_tables."""
+        team_scores = game['scores']
+        first_team_score = team_scores[0] if len(team_scores) >= 2 else 0
+        second_team_score = team_scores[1] if len(team_scores) >= 2 else 0
+        quarter_number = game['quarter_number'] or ''
+        self.store_game_info(league_name, current_games_lists, game['first_team'] or '', game['second_team'] or '',
+                             first_team_score, second_team_score, quarter_number, game['time_left'] or '',
+                             open_game=game['element'].click, table_reads=table_reads)
+
+    def read_due_tables(self, table_reads, current_games_lists):
+        """
+        Opens the due games of a snapshot and reads their total tables, the most overdue first, until the cycle is
+        out of time. The games left over keep this cycle's fields and stay due, so they come first next cycle, and a
+        page longer than the cycle budget is read in full over a few cycles instead of only its top.
+        :param table_reads: (due time, game id, league name, store_game_info arguments, open_game) per due game.
+        """
+        for _, game_id, league_name, game_info, open_game in sorted(table_reads, key=lambda read: read[0]):
+            if not self.game_allowed(game_id, league_name, current_games_lists):
+                continue
+            try:
+                with self.waits.deadline(self.game_budget):
+                    self.store_game_info(league_name, current_games_lists, *game_info, open_game=open_game)
+                self.game_breaker.record_success(game_id)
+            except Exception as e:
+                self.game_breaker.record_failure(game_id)
+                self.logger.warning(f"Error reading the total table of game {game_id}: {e}")
+
+    @timed_phase('collect_game')
+    def collect_game_info(self, game_index, game, league_name, current_games_lists):
+        """
+        Helper method to collect information for a specific game. Failures are retried after a jittered backoff, up
+        to max_attempts and within the deadline of the waits.
+        """
+        retry = 0
+        while True:
+            try:
+                self.logger.info(f'Clicking game at league {league_name} at index {game_index}.')
+                game.click()
+                self.table_switched = True
+                # Collect game data
+                self.logger.info(f'Starting collect game data...')
+                first_team_name = game.find_element(By.CLASS_NAME,
+                                                    self.elements["consts"]['first_team_name_class']).text
+                second_team_name = game.find_element(By.CLASS_NAME,
+                                                     self.elements["consts"]['second_team_name_class']).text
+                team_scores = game.find_elements(By.CLASS_NAME, self.elements["consts"]['game_scores_pair_section'])
+
+                first_team_score = team_scores[0].text if len(team_scores) >= 2 else 0
+                second_team_score = team_scores[1].text if len(team_scores) >= 2 else 0
+                quarter_number = game.find_element(By.CLASS_NAME, self.elements["consts"]['quarter_number_class']).text
+                time_left = game.find_element(By.CLASS_NAME, self.elements["consts"]['time_left_class']).text
+
+                self.store_game_info(league_name, current_games_lists, first_team_name, second_team_name,
+                                     first_team_score, second_team_score, quarter_number, time_left)
+                return
 
-    def add_new_game(self, game_key, game_data, league_name):
+            except (ElementClickInterceptedException, NoSuchElementException, TimeoutException, Exception) as e:
+                self.logger.warning(
+                    f"Exception on collect_game_info for game at index {game_index} in league {league_name}: {e}")
+                retry += 1
+                if not self.back_off(retry, 'collect_game_info'):
+                    raise
+                # Retry once the game shows its team names again
+                self.waits.until('game_ready', self.waits.element_present(
+                    (By.CLASS_NAME, self.elements["consts"]['first_team_name_class']), game), timeout=1)
+
+    def store_game_info(self, league_name, current_games_lists, first_team_name, second_team_name,
+                        first_team_score, second_team_score, quarter_number, time_left, open_game=None,
+                        table_reads=None):
+        """
+        Registers a game as active and adds or updates it on the leagues collection.
+        :param open_game: optional callable that opens the game, called only before its total table is read.
+        :param table_reads: optional list the game is added to when its total table is due, instead of opening it
+                            now, see read_due_tables. Its fields are updated either way.
+        """
+        self.logger.info(f'Creating key...')
+        game_key = f"{first_team_name} vs {second_team_name}"
+
+        self.logger.info(f'Inserting into games list...')
+        if league_name not in current_games_lists:
+            current_games_lists[league_name] = []
+        if game_key not in current_games_lists[league_name]:
+            current_games_lists[league_name].append(game_key)
+
+        self.logger.info(f'Inserting into games list...')
+        if (first_team_name == '' or second_team_name == '' or first_team_score == 'N/A' or
+                second_team_score == 'N/A' or quarter_number == self.schema.not_started or time_left == '--:--'):
+            self.logger.info(f'The game {game_key} has no 2 team names or score. cannot collect. ')
+            return
+
+        self.logger.info(f'Creating game object...')
+        game_state = GameState(first_team_name, second_team_name, int(first_team_score), int(second_team_score),
+                               quarter_number, time_left)
+
+        # Games that are not due yet only get their fields updated, without reading the total table.
+        due = self.scheduler.is_due(game_key)
+        if table_reads is not None and open_game and due and quarter_number != self.schema.ATS:
+            table_reads.append((self.scheduler.game_due.get(game_key, 0), f'{league_name}/{game_key}', league_name,
+                                (first_team_name, second_team_name, first_team_score, second_team_score,
+                                 quarter_number, time_left), open_game))
+            due = False
+        if open_game and due and quarter_number != self.schema.ATS:
+            open_game()
+            if self.opened_game != (league_name, game_key):
+                self.table_switched = True
+            self.opened_game = (league_name, game_key)
+
+        self.logger.info(f'Updating game on collections')
+        # Add new game or update existing one
+        if game_key in self.basketballLeagues[league_name]:
+            self.update_game_data(game_key, game_state, league_name, read_totals=due)
+        else:
+            self.add_new_game(game_key, game_state, league_name, read_totals=due)
+
+        stored_game = self.basketballLeagues[league_name].get(game_key)
+        if self.history and stored_game:
+            self.history.record_game(league_name, game_key, stored_game)
+        if due:
+            self.scheduler.game_polled(game_key, stored_game or game_state, game_key in self.marked_games)
+
+    def add_new_game(self, game_key, game_state, league_name, read_totals=True):
         self.logger.debug(f'Adding new game: {game_key}')
         try:
             # Handle the case where the game has not started yet
-            game_data[self.elements['consts']['first_total_score']] = None
-            game_data[self.elements['consts']['quarter_when_recorded']] = None
-            game_data[self.elements['consts']['time_left_when_recorded']] = None
-
-            if game_data[self.elements['consts']['quarter_number']] == self.elements['consts']['ATS']:
-                self.basketballLeagues[league_name][game_key] = game_data
-            else:
+            if game_state.quarter_number != self.schema.ATS and not read_totals:
+                # The first total is read with the first total table of the game, see update_game_data
+                self.first_total_pending.add((league_name, game_key))
+            elif game_state.quarter_number != self.schema.ATS:
                 # The game is in progress, capture the first total score
-                first_total_row = self.find_first_total_in_table(game_key)
+                first_total_row = self.find_first_total_in_table(game_key, league_name)
 
-                if first_total_row and first_total_row[self.elements['consts']['total_text_value']]:
-                    game_data[self.elements['consts']['first_total_score']] = first_total_row[
-                        self.elements['consts']['total_text_value']]
-                    game_data[self.elements['consts']['quarter_when_recorded']] = game_data[
-                        self.elements['consts']['quarter_number']]
-                    game_data[self.elements['consts']['time_left_when_recorded']] = game_data[
-                        self.elements['consts']['time_left']]
+                if first_total_row and first_total_row[self.schema.total_text_value]:
+                    game_state.set_first_total(first_total_row[self.schema.total_text_value],
+                                               game_state.quarter_number, game_state.time_left)
 
-                self.basketballLeagues[league_name][game_key] = game_data
+            self.basketballLeagues[league_name][game_key] = game_state
         except Exception as e:
             self.logger.error(f"Error adding new game {game_key}: {str(e)}")
 
-    def update_game_data(self, game_key, game_data, league_name):
+    def update_game_data(self, game_key, game_state, league_name, read_totals=True):
         try:
-            self.logger.debug(f'Updating game {game_data} data')
+            self.logger.debug(f'Updating game {game_key} data')
             # Checking if game needed to be add as new game.
             existing_game = self.basketballLeagues[league_name][game_key]
             # Handle ATS and B quarter cases that does not should be updated.
-            if (game_data[self.elements['consts']['quarter_number']] == self.elements['consts']['ATS'] or
-                    self.elements['consts']['B'] in game_data[self.elements['consts']['quarter_number']]):
+            if game_state.quarter_number == self.schema.ATS or self.schema.B in game_state.quarter_number:
                 return
+            # Added while the cycle had no time left for its total table
+            first_total_read = read_totals and (league_name, game_key) in self.first_total_pending
+            if first_total_read:
+                self.first_total_pending.discard((league_name, game_key))
+                first_total_row = self.find_first_total_in_table(game_key, league_name)
+                if first_total_row and first_total_row[self.schema.total_text_value]:
+                    game_state.set_first_total(first_total_row[self.schema.total_text_value],
+                                               game_state.quarter_number, game_state.time_left)
             # Check if we moved from ats to 1Q value before game starts.
-            if (existing_game['first_total_score'] and existing_game[self.elements['consts']['quarter_number']] ==
-                    self.elements['consts']['ATS'] and game_data[self.elements['consts']['quarter_number']] ==
-                    self.elements['consts']['1Q']):
-                first_total_row = self.find_first_total_in_table(game_key)
+            elif (read_totals and existing_game.first_total_score and existing_game.quarter_number == self.schema.ATS
+                    and game_state.quarter_number == self.schema.first_quarter):
+                first_total_row = self.find_first_total_in_table(game_key, league_name)
                 if first_total_row:
-                    game_data[self.elements['consts']['first_total_score']] = first_total_row[
-                        self.elements['consts']['total_text_value']]
-                    game_data[self.elements['consts']['quarter_when_recorded']] = self.elements['consts']['1Q']
-                    game_data[self.elements['consts']['time_left_when_recorded']] = self.elements['consts']['10:00']
+                    game_state.set_first_total(first_total_row[self.schema.total_text_value],
+                                               self.schema.first_quarter, self.schema.quarter_start_time)
 
             # Update new values.
-            for key in list(game_data.keys()):
-                existing_game[key] = game_data[key]
-            self.check_table_mark(league_name, game_key, existing_game)
+            existing_game.update_from(game_state)
+            if read_totals and not first_total_read:
+                self.check_table_mark(league_name, game_key, existing_game)
         except Exception as e:
             self.logger.error(f"Error updating game data {game_key}: {str(e)}")
 
-    def check_table_mark(self, league_name, game_key, game_data):
+    def check_table_mark(self, league_name, game_key, game_state):
+        """Reads the total table of the game. The rule is evaluated for all games at once by mark_pending_games."""
         try:
-            if (self.elements['consts']['first_total_score'] and self.elements['consts'][
-                'first_total_score'] in game_data
-                    and game_data[self.elements['consts']['first_total_score']]):
-                # Find the suitable row for betting
-                selected_row = self.find_selected_total_row(
-                    game_data[self.elements['consts']['first_total_score']])
-                if selected_row:
-                    # Mark the game for betting
-                    self.marked_games[game_key] = {
-                        self.elements['consts']['league_name']: league_name,
-                        self.elements['consts']['selected_row_field']: selected_row
-                    }
-                    self.logger.debug(
-                        f"Marked Game: {game_key} in League: {league_name}, Selected Row: {selected_row}")
+            if game_state.first_total_score:
+                rows = self.read_total_rows(game_key, league_name)
+                if rows:
+                    self.pending_marks.append((league_name, game_key, game_state.first_total_score, rows))
         except Exception as e:
             self.logger.warn(f'Exception during check_table_mark: {e}')
 
+    @timed_phase('mark')
+    def mark_pending_games(self):
+        """Selects the suitable row of every total table read this cycle in one pass and marks the games."""
+        if not self.pending_marks:
+            return
+        try:
+            selected_rows = self.totals_rule.select_rows([rows for _, _, _, rows in self.pending_marks],
+                                                         [first_total for _, _, first_total, _ in self.pending_marks])
+            for (league_name, game_key, first_total_score, _), selected_row in zip(self.pending_marks, selected_rows):
+                if not selected_row:
+                    continue
+                # Mark the game for betting
+                self.marked_games[game_key] = {
+                    self.schema.league_name: league_name,
+                    self.schema.selected_row_field: selected_row
+                }
+                self.logger.info(
+                    f"Marked Game: {game_key} in League: {league_name}, Selected Row: {selected_row}",
+                    extra=KEEP_RECORD)
+                if self.history:
+                    self.history.record_mark(league_name, game_key, first_total_score, selected_row)
+        except Exception as e:
+            self.logger.warning(f'Exception during mark_pending_games: {e}')
+        finally:
+            self.pending_marks = []
+
     def handle_selected_rows(self):
         """Selects the suitable rows from the total table based on game data."""
         self.logger.debug('Selecting suitable total row from table for betting')
         try:
             for league_name, games in self.basketballLeagues.items():
-                for game_key, game_data in games.items():
-                    if self.elements['consts']['first_total_score']:
+                for game_key, game_state in games.items():
+                    if self.schema.first_total_score:
                         # Find the suitable row for betting
-                        if not game_data[self.elements['consts']['first_total_score']]:
-                            selected_row = self.find_selected_total_row(
-                                game_data[self.elements['consts']['first_total_score']])
+                        if not game_state.first_total_score:
+                            selected_row = self.find_selected_total_row(game_state.first_total_score)
                             if selected_row:
                                 # Mark the game for betting
                                 self.marked_games[game_key] = {
-                                    self.elements['consts']['league_name_field']: league_name,
-                                    self.elements['consts']['selected_row_field']: selected_row
+                                    self.schema.league_name: league_name,
+                                    self.schema.selected_row_field: selected_row
                                 }
-                                self.logger.debug(
-                                    f"Marked Game: {game_key} in League: {league_name}, Selected Row: {selected_row}")
+                                self.logger.info(
+                                    f"Marked Game: {game_key} in League: {league_name}, Selected Row: {selected_row}",
+                                    extra=KEEP_RECORD)
         except Exception as e:
             self.logger.warning(f"Error selecting total row for betting in handle_selected_rows: {e}")
 
+    @timed_phase('clean_up')
     def clean_up_inactive_games(self, active_games):
         """Remove games that are no longer active from the dictionary."""
         self.logger.debug(f'Cleaning up inactive games...')
@@ -359,152 +941,77 @@ class PlayManager(QObject):  # Inherit QObject for threading
                 if league_name in self.basketballLeagues:
                     games_list = list(self.basketballLeagues[league_name].keys())
                 for game_key in games_list:
-                    if game_key not in active_games[league_name]:
+                    if game_key not in active_games.get(league_name, []):
                         self.logger.info(f'Cleaning up inactive game: {game_key}')
                         del self.basketballLeagues[league_name][game_key]
+                        self.scheduler.forget(game_key)
+                        self.game_breaker.forget(f'{league_name}/{game_key}')
+                        self.first_total_pending.discard((league_name, game_key))
+                        if self.history:
+                            self.history.forget_game(league_name, game_key)
 
                 # Remove leagues that no longer have active games
                 if league_name not in active_games or not league_name in self.basketballLeagues:
                     self.logger.info(f'Cleaning up empty league: {league_name}')
                     del self.basketballLeagues[league_name]
+                    self.scheduler.forget_league(league_name)
+                    self.league_breaker.forget(league_name)
         except Exception as e:
             self.logger.error(f"Error cleaning up inactive games: {e}")
 
-    def find_first_total_in_table(self, game_key):
+    @timed_phase('find_first_total')
+    def find_first_total_in_table(self, game_key, league_name=None):
         """Finds the first row in the total table."""
         self.logger.debug(f'Searching for the first row in the total table for game {game_key}')
         try:
-            tables = self.driver.find_elements(By.CLASS_NAME, self.elements['consts']['total_table_class'])
-
-            for table in tables:
-                header = table.find_element(By.CLASS_NAME, self.elements['consts']['table_header_class'])
-                header_text = header.find_element(By.CLASS_NAME,
-                                                  self.elements['consts']['table_header_text_class']).text
-
-                if header_text == self.elements['consts']['table_text_value']:
-                    if self.elements['consts']['show_text_value'] not in table.get_attribute('class'):
-                        table.click()
-
-                    rows = table.find_elements(By.CLASS_NAME, self.elements['consts']['table_rows_class'])
-                    first_row = rows[0]
-
-                    expected_total_score = float(
-                        first_row.find_element(By.CLASS_NAME,
-                                               self.elements['consts']['table_row_total_score_class']).text)
-                    over_value = float(
-                        first_row.find_elements(By.CLASS_NAME, self.elements['consts']['table_row_over_score_class'])[
-                            0].text)
-                    under_value = float(
-                        first_row.find_elements(By.CLASS_NAME, self.elements['consts']['table_row_under_score_class'])[
-                            1].text)
-
-                    return {
-                        self.elements['consts']['total_text_value']: expected_total_score,
-                        self.elements['consts']['over_text_value']: over_value,
-                        self.elements['consts']['under_text_value']: under_value
-                    }
-            return None
+            rows = self.read_table()
+            if self.recorder and self.feed_rows is None:
+                self.recorder.capture_tables(game_key)
+            if self.history and league_name:
+                self.history.record_totals(league_name, game_key, rows)
+            if not rows or rows[0][0] != 0:
+                return None
+            return self.totals_rule.row_to_dict(rows[0], with_index=False)
         except Exception as e:
             self.logger.warning(f"Error finding first total in table for game {game_key}")
             return None
 
-    def find_selected_total_row(self, game_first_total_score):
+    def read_table(self):
+        """
+        Reads the total table, after waiting for it to change when another game was just opened. The rows of a game
+        stored from the network feed are taken from its frames.
+        """
+        if self.feed_rows is not None:
+            return self.feed_rows
+        if not self.table_switched:
+            self.last_table_rows = self.dom_snapshot.collect_total_rows()
+        else:
+            self.table_switched = False
+            table_changed = self.waits.value_changed(self.dom_snapshot.collect_total_rows, self.last_table_rows)
+            self.waits.until('total_table_changed', table_changed, timeout=1)
+            self.last_table_rows = table_changed.value
+        return self.last_table_rows
+
+    def find_selected_total_row(self, game_first_total_score, game_key=None, league_name=None):
         """Finds a suitable row in the total table based on the first total score of the game."""
         self.logger.debug('Finding total table based on first total score')
-        table_index = -1
-        rows_count = -1
-        curr_row_index = 0
-        obj_values = []
-        under_values = []
-        try:
-            tables = self.driver.find_elements(By.CLASS_NAME, self.elements['consts']['total_table_class'])
-
-            if table_index == -1:
-                # get the table and store its index .
-                for index, table in enumerate(tables):
-                    header = table.find_element(By.CLASS_NAME, self.elements['consts']['table_header_class'])
-                    header_text = header.find_element(By.CLASS_NAME,
-                                                      self.elements['consts']['table_header_text_class']).text
-                    if header_text == self.elements['consts']['table_text_value']:
-                        table_index = index
-                        if self.elements['consts']['show_text_value'] not in table.get_attribute('class'):
-                            table.click()
-                        rows = tables[table_index].find_elements(By.CLASS_NAME,
-                                                                 self.elements['consts']['table_rows_class'])
-                        rows_count = len(rows)
-                        break
-            # Iterate the table rows and fill the data lists.
-            while curr_row_index < rows_count:
-                # refresh the tables data and extract the row data.
-                try:
-                    res = self.extract_suitable_rows(table_index, curr_row_index, game_first_total_score)
-                    if res:
-                        if res == -1:
-                            # out of index
-                            break
-                        if res != 0:
-                            under = res[self.elements['consts']['under_text_value']]
-                            under_values.append(under)
-                            obj_values.append(res)
-                        curr_row_index += 1
-                except StaleElementReferenceException:
-                    print(f"StaleElementReferenceException: Retrying row {curr_row_index} in the table")
-            # Extract min value
-            min_index = 0
-            if len(under_values) == 0:
-                return None
-            min_value = under_values[0]
-            for index, val in enumerate(under_values):
-                if val < min_value:
-                    min_index = index
-                    min_value = val
-
-            if min_index == -1:
-                return None
-            return obj_values[min_index]
-        except Exception as e:
-            self.logger.warning(f"Error finding total row.")
+        rows = self.read_total_rows(game_key, league_name)
+        if not rows:
             return None
+        return self.totals_rule.select_row(rows, game_first_total_score)
 
-    def extract_suitable_rows(self, table_index, curr_row_index, game_first_total_score):
-        """"
-         :param table_index:  the total table index in the page tables list.
-         :param curr_row_index: the current row needed to be extracted. needed in case of exception.
-         :param game_first_total_score: the first total score value for the predicate.
-         :return: -1 in case of rows list changed and needed to be continue.
-                 0 in case the row doesn't accept the predicate.
-                 [total, under, over] in case the row accepts the predicate.
-                 None in case exception occurred and retry needed here.
-         """
+    @timed_phase('find_selected_total')
+    def read_total_rows(self, game_key=None, league_name=None):
+        """Reads the whole total table of the opened game in one round trip, see DomSnapshot.collect_total_rows."""
         try:
-            tables = self.driver.find_elements(By.CLASS_NAME, self.elements['consts']['total_table_class'])
-            rows = tables[table_index].find_elements(By.CLASS_NAME, self.elements['consts']['table_rows_class'])
-            if len(rows) <= curr_row_index:
-                return -1
-            row = rows[curr_row_index]
-            expected_total_score = float(
-                row.find_element(By.CLASS_NAME, self.elements['consts']['table_row_total_score_class']).text)
-            over_value = float(
-                row.find_elements(By.CLASS_NAME, self.elements['consts']['table_row_over_score_class'])[0].text)
-            under_value = float(
-                row.find_elements(By.CLASS_NAME, self.elements['consts']['table_row_under_score_class'])[1].text)
-            if ((game_first_total_score is not None and game_first_total_score >= 0)
-                    and (self.point_difference is not None)
-                    and (expected_total_score is not None and expected_total_score >= 0)
-                    and (under_value is not None and under_value >= 0)
-                    and self.elements['consts']['min_under_value']
-                    and self.elements['consts']['total_text_value']
-                    and self.elements['consts']['under_text_value']
-                    and self.elements['consts']['over_text_value']
-                    and under_value >= self.elements['consts']['min_under_value']
-                    and expected_total_score - self.point_difference >= game_first_total_score):
-                return {
-                    self.elements['consts']['total_text_value']: expected_total_score,
-                    self.elements['consts']['over_text_value']: over_value,
-                    self.elements['consts']['under_text_value']: under_value,
-                    self.elements['consts']['curr_row_index']: curr_row_index
-                }
-            else:
-                return 0
-        except Exception as err:
+            rows = self.read_table()
+            if game_key is not None:
+                self.scheduler.record_odds(game_key, rows)
+                if self.recorder and self.feed_rows is None:
+                    self.recorder.capture_tables(game_key)
+                if self.history and league_name:
+                    self.history.record_totals(league_name, game_key, rows)
+            return rows
+        except Exception as e:
+            self.logger.warning(f"Error reading the total table: {e}")
             return None
@@ -0,0 +1,115 @@
+import time
+
+from GameState import GameSchema
+
+
+class RefreshScheduler:
+    """
+    Gives every game and league its own next-due time. Games close to a decision are polled at the hot interval,
+    games that haven't started or are on a break at the cold interval and the rest at the configured refresh time.
+    """
+
+    HOT = 'hot'
+    NORMAL = 'normal'
+    COLD = 'cold'
+
+    def __init__(self, logger, elements, base_interval, scheduler_config):
+        self.logger = logger
+        self.schema = GameSchema(elements)
+        self.enabled = scheduler_config['enabled']
+        self.base_interval = base_interval
+        self.hot_interval = scheduler_config['hot_interval_in_sec']
+        self.cold_interval = scheduler_config['cold_interval_in_sec']
+        self.hot_time_left = scheduler_config['hot_time_left_in_sec']
+        self.odds_moving_threshold = scheduler_config['odds_moving_threshold']
+        self.game_due = {}  # game_key -> monotonic time of the next poll
+        self.game_decisions = {}  # game_key -> {'interval', 'priority', 'reason'}
+        self.league_due = {}  # league_name -> monotonic time of the next scan of the whole league
+        self.odds_rows = {}  # game_key -> total table rows of the last poll
+        self.odds_activity = {}  # game_key -> decaying count of total table changes between polls
+
+    def is_due(self, game_key, now=None):
+        """New games and every game when the scheduler is disabled are always due."""
+        if not self.enabled or game_key not in self.game_due:
+            return True
+        return (now or time.monotonic()) >= self.game_due[game_key]
+
+    def is_league_due(self, league_name, game_keys, now=None):
+        """A league is due when it wasn't scanned for cold_interval or when any of its known games is due."""
+        now = now or time.monotonic()
+        if not self.enabled or now >= self.league_due.get(league_name, 0):
+            return True
+        return any(self.is_due(game_key, now) for game_key in game_keys)
+
+    def league_polled(self, league_name, now=None):
+        self.league_due[league_name] = (now or time.monotonic()) + self.cold_interval
+
+    def game_polled(self, game_key, game_state, marked, now=None):
+        """Schedules the next poll of a game from its state right after it was polled."""
+        interval, priority, reason = self.decide(game_key, game_state, marked)
+        self.game_due[game_key] = (now or time.monotonic()) + interval
+        self.game_decisions[game_key] = {'interval': interval, 'priority': priority, 'reason': reason}
+
+    def reschedule_due(self, leagues, marked_games, now=None):
+        """
+        Reschedules the due games that a change feed or network feed cycle reported no change for. The feed was
+        their poll, otherwise they stay due and the next wakeup is always now.
+        """
+        now = now or time.monotonic()
+        for games in leagues.values():
+            for game_key, game_state in games.items():
+                if self.is_due(game_key, now):
+                    self.game_polled(game_key, game_state, game_key in marked_games, now)
+
+    def record_odds(self, game_key, rows):
+        """Tracks how fast the total table of a game moves between polls."""
+        changed = game_key in self.odds_rows and self.odds_rows[game_key] != rows
+        self.odds_activity[game_key] = self.odds_activity.get(game_key, 0) / 2 + (1 if changed else 0)
+        self.odds_rows[game_key] = rows
+
+    def decide(self, game_key, game_state, marked):
+        quarter_number = game_state.quarter_number or ''
+        if marked:
+            return self.hot_interval, self.HOT, 'marked'
+        if quarter_number in (self.schema.ATS, self.schema.not_started):
+            return self.cold_interval, self.COLD, 'not started'
+        if self.schema.B in quarter_number:
+            return self.cold_interval, self.COLD, 'break'
+        if self.odds_activity.get(game_key, 0) >= self.odds_moving_threshold:
+            return self.hot_interval, self.HOT, 'odds moving'
+        seconds_left = self.parse_time_left(game_state.time_left)
+        if ((quarter_number == self.schema.last_quarter or self.schema.overtime in quarter_number)
+                and seconds_left is not None and seconds_left <= self.hot_time_left):
+            return self.hot_interval, self.HOT, 'closing minutes'
+        return self.base_interval, self.NORMAL, 'in play'
+
+    @staticmethod
+    def parse_time_left(time_left):
+        try:
+            minutes, seconds = time_left.split(':')
+            return int(minutes) * 60 + int(seconds)
+        except (AttributeError, ValueError):
+            return None
+
+    def forget(self, game_key):
+        for collection in (self.game_due, self.game_decisions, self.odds_rows, self.odds_activity):
+            collection.pop(game_key, None)
+
+    def forget_league(self, league_name):
+        self.league_due.pop(league_name, None)
+
+    def next_wakeup(self, max_sleep, now=None):
+        """
+        Seconds to sleep until the next game is due, never more than max_sleep. Never less than hot_interval either,
+        a game that is still due after a cycle, e.g. skipped for its open circuit, must not make the cycles spin.
+        """
+        if not self.enabled or not self.game_due:
+            return max_sleep
+        now = now or time.monotonic()
+        return min(max(min(self.game_due.values()) - now, self.hot_interval), max_sleep)
+
+    def decisions(self):
+        """The current poll-rate decision of every game: interval, priority, reason and seconds until due."""
+        now = time.monotonic()
+        return {game_key: dict(decision, due_in=round(self.game_due[game_key] - now, 2))
+                for game_key, decision in self.game_decisions.items()}
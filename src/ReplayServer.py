@@ -0,0 +1,258 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from DomSnapshot import DomSnapshot
+from SessionRecorder import SessionRecorder
+
+
+class ReplayServer:
+    """
+    Local HTTP stand-in of the sportsbook serving a SessionRecorder capture archive, at the recorded speed or
+    accelerated. The browser of a PlayManager logs in and collects games from it exactly as from the live site,
+    so collection can be profiled and regression tested on recorded traffic without a network.
+
+    The served page is the recorded page without its scripts. A small script polls the server and swaps in the
+    basketball section of the replay clock, and when a game is clicked it shows the total tables recorded for
+    that game. The recorded network feed frames are fetched by the page one response per frame from FEED_PATH, so
+    the NetworkFeed of the browser reads them like the site's own traffic.
+    """
+
+    LOGIN_PATH = '/login'
+    STATE_PATH = '/__replay/state'
+    FEED_PATH = '/__replay/feed'
+
+    STRIPPED_TAGS = re.compile(r'<script\b.*?</script\s*>|<link\b[^>]*>|<base\b[^>]*>', re.IGNORECASE | re.DOTALL)
+
+    SHELL_SCRIPT = """
+        (function () {
+            const consts = %s;
+    """ + DomSnapshot.READ_GAME_SCRIPT + """
+            const tables = document.createElement('div');
+            let version = -1;
+            let game = '';
+            const removeStaleTables = () => {
+                for (const table of Array.from(document.getElementsByClassName(consts.total_table_class))) {
+                    if (!tables.contains(table)) {
+                        table.remove();
+                    }
+                }
+            };
+            const apply = (state) => {
+                if (state.page_version !== consts.page_version) {
+                    window.location.reload();
+                    return;
+                }
+                if (state.version === version) {
+                    return;
+                }
+                version = state.version;
+                const section = document.evaluate(consts.basketball_section_container_xpath, document, null,
+                    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+                if (section && state.section !== null && section.innerHTML !== state.section) {
+                    section.innerHTML = state.section;
+                }
+                tables.innerHTML = state.tables.join('');
+                removeStaleTables();
+            };
+            const poll = (async) => {
+                const request = new XMLHttpRequest();
+                request.open('GET', consts.state_path + '?game=' + encodeURIComponent(game) + '&since=' + version,
+                    async);
+                if (async) {
+                    request.onload = () => apply(JSON.parse(request.responseText));
+                }
+                request.send();
+                if (!async) {
+                    apply(JSON.parse(request.responseText));
+                }
+            };
+            // The tables of a clicked game are fetched synchronously, so they are shown when the click returns.
+            document.addEventListener('click', (event) => {
+                const element = event.target.closest && event.target.closest(
+                    '.' + CSS.escape(consts.games_in_league_class));
+                if (!element) {
+                    return;
+                }
+                const clicked = readGame(element);
+                game = clicked.first_team + ' vs ' + clicked.second_team;
+                version = -1;
+                poll(false);
+            }, true);
+            // Fetches the frames played after the page was served, one request per frame and at once while behind
+            let frame = consts.first_frame;
+            const pollFeed = () => {
+                const request = new XMLHttpRequest();
+                request.open('GET', consts.feed_path + '?frame=' + frame);
+                request.onload = () => {
+                    if (request.status === 200) {
+                        frame += 1;
+                        pollFeed();
+                    } else {
+                        setTimeout(pollFeed, consts.poll_interval_ms);
+                    }
+                };
+                request.onerror = () => setTimeout(pollFeed, consts.poll_interval_ms);
+                request.send();
+            };
+            document.body.appendChild(tables);
+            removeStaleTables();
+            poll(false);
+            setInterval(() => poll(true), consts.poll_interval_ms);
+            if (consts.has_frames) {
+                pollFeed();
+            }
+        })();
+    """
+
+    SHELL_CONSTS = ['basketball_section_container_xpath', 'games_in_league_class', 'first_team_name_class',
+                    'second_team_name_class', 'game_scores_pair_section', 'quarter_number_class', 'time_left_class',
+                    'total_table_class']
+
+    EMPTY_PAGE = '<html><head></head><body></body></html>'
+
+    def __init__(self, logger, archive_path, elements, speed=1.0, port=0, poll_interval_ms=200):
+        """
+        :param speed: replay speed relative to the recording, e.g. 1 for recorded speed and 10 for ten times faster.
+        :param port: local port to listen on, 0 for any free port.
+        """
+        self.logger = logger
+        self.records = SessionRecorder.read_archive(archive_path)
+        self.speed = speed
+        self.port = port
+        self.consts = {key: elements['consts'][key] for key in self.SHELL_CONSTS}
+        self.consts['state_path'] = self.STATE_PATH
+        self.consts['feed_path'] = self.FEED_PATH
+        self.consts['has_frames'] = any(record['type'] == 'frame' for record in self.records)
+        self.consts['poll_interval_ms'] = poll_interval_ms
+        self.login_username_name = elements['consts']['login_username_element_name']
+        self.login_password_name = elements['consts']['login_password_element_name']
+        self.live_events_path = elements['consts']['live_events_suffix']
+        self.server = None
+        self.thread = None
+        self.started = None
+        self.lock = threading.Lock()
+        self.cursor = 0  # Number of records already played
+        self.page_version = -1  # Index of the page record being served, -1 before the first one
+        self.page_html = self.EMPTY_PAGE
+        self.section = None
+        self.tables = {}  # game_key -> HTML of the total tables of the game
+        self.frames = []  # Payloads of the network feed frames played so far
+        self.duration = self.records[-1]['t'] if self.records else 0
+        logger.info(f'Loaded {len(self.records)} records ({self.duration:.0f} seconds) from {archive_path}')
+
+    def start(self):
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                replay.handle(self)
+
+            def do_POST(self):
+                replay.handle_login(self)
+
+            def log_message(self, format, *args):
+                pass  # Every poll of the page would be logged
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.started = time.monotonic()
+        self.logger.info(f'Replaying at {self.speed}x speed on {self.url()}')
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def url(self, path='/'):
+        return f'http://127.0.0.1:{self.port}{path}'
+
+    def advance(self):
+        """Plays every record up to the replay clock. Returns the number of records played so far."""
+        with self.lock:
+            elapsed = (time.monotonic() - self.started) * self.speed
+            while self.cursor < len(self.records) and self.records[self.cursor]['t'] <= elapsed:
+                record = self.records[self.cursor]
+                if record['type'] == 'page':
+                    self.page_version = self.cursor
+                    self.page_html = record['html']
+                    self.section = None
+                elif record['type'] == 'section':
+                    self.section = record['html']
+                elif record['type'] == 'tables':
+                    self.tables[record['game']] = record['html']
+                elif record['type'] == 'frame':
+                    self.frames.append(record['payload'])
+                self.cursor += 1
+                if self.cursor == len(self.records):
+                    self.logger.info('The replay reached the end of the capture archive.')
+            return self.cursor
+
+    def handle(self, request):
+        url = urlparse(request.path)
+        version = self.advance()
+        if url.path == self.STATE_PATH:
+            query = parse_qs(url.query)
+            state = {'version': version, 'page_version': self.page_version}
+            if query.get('since', [''])[0] != str(version):
+                state['section'] = self.section
+                state['tables'] = self.tables.get(query.get('game', [''])[0], [])
+            self.respond(request, json.dumps(state), 'application/json')
+        elif url.path == self.FEED_PATH:
+            frame = parse_qs(url.query).get('frame', [''])[0]
+            with self.lock:
+                payload = self.frames[int(frame)] if frame.isdigit() and int(frame) < len(self.frames) else None
+            if payload is None:
+                request.send_response(204)
+                request.send_header('Cache-Control', 'no-store')
+                request.end_headers()
+            else:
+                self.respond(request, payload, 'application/json')
+        elif url.path == self.LOGIN_PATH:
+            self.respond(request, self.login_page(), 'text/html')
+        else:
+            self.respond(request, self.replay_page(), 'text/html')
+
+    def handle_login(self, request):
+        """Any credentials are accepted, the browser is sent on to the live events page like after a real login."""
+        request.rfile.read(int(request.headers.get('Content-Length') or 0))
+        if urlparse(request.path).path != self.LOGIN_PATH:
+            request.send_response(404)
+            request.end_headers()
+            return
+        request.send_response(303)
+        request.send_header('Location', self.live_events_path)
+        request.send_header('Content-Length', '0')
+        request.end_headers()
+
+    def login_page(self):
+        # Submitting navigates away, so the login button goes stale as on the site
+        return (f'<html><body><form method="post" action="{self.LOGIN_PATH}">'
+                f'<input type="text" name="{self.login_username_name}">'
+                f'<input type="password" name="{self.login_password_name}">'
+                f'<input type="submit" value="Login"></form></body></html>')
+
+    def replay_page(self):
+        """The page of the replay clock without its own scripts, stylesheets and base URL, with the shell script."""
+        with self.lock:
+            html = self.STRIPPED_TAGS.sub('', self.page_html)
+            consts = dict(self.consts, page_version=self.page_version, first_frame=len(self.frames))
+        script = f'<script>{self.SHELL_SCRIPT % json.dumps(consts)}</script>'
+        body_end = html.lower().rfind('</body>')
+        return html[:body_end] + script + html[body_end:] if body_end >= 0 else html + script
+
+    @staticmethod
+    def respond(request, body, content_type):
+        data = body.encode('utf-8')
+        request.send_response(200)
+        request.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        request.send_header('Content-Length', str(len(data)))
+        request.send_header('Cache-Control', 'no-store')
+        request.end_headers()
+        request.wfile.write(data)
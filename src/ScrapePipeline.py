@@ -0,0 +1,170 @@
+import asyncio
+import shlex
+import threading
+import time
+from collections import deque
+
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from StatePublisher import StateDelta
+
+
+def merge_deltas(older, newer):
+    """
+    One delta carrying the changes of two consecutive ones, the latest change of every game and mark. It skips a
+    version, so the GameWindow redraws from its snapshot, while consumers of the marks still see the marks of both.
+    """
+    def latest(items, key):
+        return tuple({key(item): item for item in items}.values())
+
+    def game(item):
+        return item[0], item[1]
+
+    def mark(item):
+        return item[0]
+
+    return StateDelta(newer.version, latest(older.games_added + newer.games_added, game),
+                      latest(older.games_updated + newer.games_updated, game),
+                      latest(older.games_removed + newer.games_removed, game),
+                      latest(older.marks_added + newer.marks_added, mark),
+                      tuple(dict.fromkeys(older.marks_removed + newer.marks_removed)), newer.snapshot)
+
+
+class Sink:
+    """A consumer of the published states, with its own bounded queue and policy for when the queue is full."""
+
+    DROP_OLDEST = 'drop_oldest'  # Only the latest state matters, e.g. the UI which redraws from a snapshot
+    COALESCE = 'coalesce'  # Nothing may be lost, the new delta is merged into the newest queued one
+
+    def __init__(self, name, consume, maxsize, policy):
+        """:param consume: coroutine function called with every delta, one at a time."""
+        self.name = name
+        self.consume = consume
+        self.maxsize = maxsize
+        self.policy = policy
+        self.queue = deque()
+        self.ready = None  # asyncio.Event set while the queue is not empty, created on the pipeline loop
+
+
+class ScrapePipeline(QObject):
+    """
+    Delivers the states published by the collection to its consumers without ever blocking the collection.
+
+    Fetching the page, normalizing the games and evaluating the marks stay in the PlayManager thread, as they work
+    on the live games state, and end in an immutable StateDelta. submit() fans it out from the publishing thread to
+    the bounded queue of every sink, and each sink consumes its queue in its own task on an asyncio loop running in
+    the pipeline thread. A full queue drops its oldest delta or merges the new one into it, depending on the sink,
+    so a slow consumer only ever costs itself updates, and the collection cadence stays the same.
+
+    The UI sink hands a delta to the Qt event loop through state_ready, and waits for the UI thread to have applied
+    it before handing the next one. The alert sink runs the alert_command for every new mark, when configured.
+    """
+    state_ready = pyqtSignal(object)  # StateDelta for the GameWindow, emitted from the pipeline thread
+
+    ALERT_TIMEOUT = 10
+
+    def __init__(self, logger, metrics, pipeline_config):
+        super().__init__()
+        self.logger = logger
+        self.metrics = metrics
+        self.ui_ack_timeout = pipeline_config['ui_ack_timeout_in_sec']
+        self.alert_command = pipeline_config['alert_command']
+        self.loop = asyncio.new_event_loop()
+        self.thread = None
+        self.tasks = []
+        self.ui_applied = None  # asyncio.Event set once the UI applied the pending delta
+        self.ui_pending_version = None
+        self.sinks = [Sink('ui', self.publish_to_ui, pipeline_config['ui_queue_size'], Sink.DROP_OLDEST)]
+        if self.alert_command:
+            self.sinks.append(Sink('alerts', self.run_alert_command, pipeline_config['alert_queue_size'],
+                                   Sink.COALESCE))
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name='ScrapePipeline', daemon=True)
+        self.thread.start()
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        for sink in self.sinks:
+            sink.ready = asyncio.Event()
+            self.tasks.append(self.loop.create_task(self.run_sink(sink)))
+        self.loop.run_forever()
+        # Stopped, the sinks drop what is still queued
+        for task in self.tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*self.tasks, return_exceptions=True))
+        self.loop.close()
+
+    def stop(self):
+        if self.thread:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=5)
+            self.thread = None
+
+    def submit(self, delta):
+        """Fans a delta out to the sinks. Called from the publishing thread, never blocks it."""
+        self.loop.call_soon_threadsafe(self.dispatch, delta)
+
+    def dispatch(self, delta):
+        for sink in self.sinks:
+            queued = delta
+            if len(sink.queue) >= sink.maxsize:
+                if sink.policy == Sink.DROP_OLDEST:
+                    sink.queue.popleft()
+                    self.metrics.inc('pipeline_dropped_total', sink=sink.name)
+                else:
+                    queued = merge_deltas(sink.queue.pop(), delta)
+                    self.metrics.inc('pipeline_coalesced_total', sink=sink.name)
+            sink.queue.append(queued)
+            sink.ready.set()
+
+    async def run_sink(self, sink):
+        while True:
+            await sink.ready.wait()
+            delta = sink.queue.popleft()
+            if not sink.queue:
+                sink.ready.clear()
+            started = time.perf_counter()
+            try:
+                await sink.consume(delta)
+            except Exception as e:
+                self.logger.warning(f'The {sink.name} sink failed to consume state version {delta.version}: {e}')
+            self.metrics.observe('pipeline_sink_seconds', time.perf_counter() - started, sink=sink.name)
+
+    # UI sink
+
+    async def publish_to_ui(self, delta):
+        self.ui_applied = asyncio.Event()
+        self.ui_pending_version = delta.version
+        self.state_ready.emit(delta)
+        try:
+            await asyncio.wait_for(self.ui_applied.wait(), self.ui_ack_timeout)
+        except asyncio.TimeoutError:
+            self.metrics.inc('pipeline_ack_timeouts_total', sink='ui')
+
+    @pyqtSlot(object)
+    def on_ui_applied(self, delta):
+        """Connected to state_ready after the GameWindow, so it runs on the UI thread once the delta was applied."""
+        self.loop.call_soon_threadsafe(self.acknowledge, delta.version)
+
+    def acknowledge(self, version):
+        if version == self.ui_pending_version:
+            self.ui_applied.set()
+
+    # Alert sink
+
+    async def run_alert_command(self, delta):
+        """Runs the alert command for every new or changed mark, its arguments formatted with the mark's fields."""
+        for game_key, mark in delta.marks_added:
+            values = {'game': game_key}
+            values.update({str(key).lower().replace(' ', '_'): value for key, value in mark.items()
+                           if not hasattr(value, 'items')})
+            values.update({str(key).lower().replace(' ', '_'): value
+                           for field in mark.values() if hasattr(field, 'items') for key, value in field.items()})
+            arguments = [argument.format(**values) for argument in shlex.split(self.alert_command)]
+            process = await asyncio.create_subprocess_exec(*arguments)
+            try:
+                await asyncio.wait_for(process.wait(), self.ALERT_TIMEOUT)
+            except asyncio.TimeoutError:
+                process.kill()
+                self.logger.warning(f'The alert command for game {game_key} timed out.')
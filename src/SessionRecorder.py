@@ -0,0 +1,127 @@
+import gzip
+import itertools
+import json
+import os
+import time
+from datetime import datetime
+
+
+class SessionRecorder:
+    """
+    Records the live events page and the total tables read by a PlayManager into a capture archive, so the session
+    can be replayed offline by the ReplayServer.
+
+    An archive is one gzip compressed segment per session holding a JSON record per line, each with the seconds
+    since the session started in 't':
+        {'type': 'session', 'version', 'started'}  - the first record of every segment.
+        {'type': 'page', 'url', 'html'}            - the whole page, recorded when the browser lands on a new URL.
+        {'type': 'section', 'html'}                - the content of the basketball section.
+        {'type': 'tables', 'game', 'html'}         - the total tables shown for a game, a list of HTML strings.
+        {'type': 'frame', 'payload'}               - a response or WebSocket frame read by the NetworkFeed.
+    Sections and tables are only recorded when they differ from the previous record.
+    """
+
+    FORMAT_VERSION = 1
+    SEGMENT_SUFFIX = '.jsonl.gz'
+
+    PAGE_SCRIPT = """
+        const section = document.evaluate(arguments[0], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE,
+            null).singleNodeValue;
+        return {
+            url: window.location.href,
+            page: window.location.href !== arguments[1] ? document.documentElement.outerHTML : null,
+            section: section ? section.innerHTML : null
+        };
+    """
+
+    TABLES_SCRIPT = """
+        return Array.from(document.getElementsByClassName(arguments[0]), table => table.outerHTML);
+    """
+
+    segment_numbers = itertools.count(1)  # Distinguishes the segments of parallel sessions started together
+
+    def __init__(self, logger, driver, elements, capture_directory):
+        self.logger = logger
+        self.driver = driver
+        self.section_xpath = elements['consts']['basketball_section_container_xpath']
+        self.total_table_class = elements['consts']['total_table_class']
+        self.capture_directory = capture_directory
+        self.path = None
+        self.file = None
+        self.started = None
+        self.last_url = None
+        self.last_section = None
+        self.last_tables = {}  # game_key -> HTML of the last recorded tables
+
+    def open(self):
+        os.makedirs(self.capture_directory, exist_ok=True)
+        now = datetime.now()
+        self.path = os.path.join(self.capture_directory, f"session-{now:%Y%m%d-%H%M%S}-"
+                                                         f"{next(self.segment_numbers)}{self.SEGMENT_SUFFIX}")
+        self.file = gzip.open(self.path, 'wt', encoding='utf-8')
+        self.started = time.monotonic()
+        self.logger.info(f'Recording the session to {self.path}')
+        self.write({'type': 'session', 'version': self.FORMAT_VERSION, 'started': now.isoformat(timespec='seconds')})
+
+    def write(self, record):
+        record['t'] = round(time.monotonic() - self.started, 3)
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def capture_page(self):
+        """Records the page if the browser moved to a new URL and the basketball section if it changed."""
+        try:
+            if self.file is None:
+                self.open()
+            page = self.driver.execute_script(self.PAGE_SCRIPT, self.section_xpath, self.last_url)
+            if page['page'] is not None:
+                self.write({'type': 'page', 'url': page['url'], 'html': page['page']})
+                self.last_url = page['url']
+                self.last_section = None
+            if page['section'] is not None and page['section'] != self.last_section:
+                self.write({'type': 'section', 'html': page['section']})
+                self.last_section = page['section']
+        except Exception as e:
+            self.logger.warning(f'Failed to record the live events page: {e}')
+
+    def capture_tables(self, game_key):
+        """Records the total tables shown for the given game if they changed since they were last recorded."""
+        try:
+            if self.file is None:
+                self.open()
+            tables = self.driver.execute_script(self.TABLES_SCRIPT, self.total_table_class)
+            if tables and tables != self.last_tables.get(game_key):
+                self.write({'type': 'tables', 'game': game_key, 'html': tables})
+                self.last_tables[game_key] = tables
+        except Exception as e:
+            self.logger.warning(f'Failed to record the total tables of game {game_key}: {e}')
+
+    def capture_frames(self, payloads):
+        """Records the network feed frames read by the PlayManager, in the order they were received."""
+        try:
+            if self.file is None:
+                self.open()
+            for payload in payloads:
+                self.write({'type': 'frame', 'payload': payload})
+        except Exception as e:
+            self.logger.warning(f'Failed to record the network feed frames: {e}')
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            self.logger.info(f'Session recording saved to {self.path}')
+
+    @staticmethod
+    def read_archive(path):
+        """
+        :return: the records of a capture archive in recording order. A segment cut short, e.g. when the program was
+                 killed while recording, yields the records written until then.
+        """
+        records = []
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as file:
+                for line in file:
+                    records.append(json.loads(line))
+        except (EOFError, json.JSONDecodeError):
+            pass
+        return records
@@ -0,0 +1,140 @@
+import json
+import os
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class SessionStore:
+    """
+    Keeps the logged in browser session of the site across restarts: the cookies and the local and session storage
+    of the site's origin, one file per user and site in directory.
+
+    Restoring on Chrome costs no page load, the cookies are set over CDP and the storage is seeded by a script run
+    before the site's own scripts on the next page. Other browsers first open the site's origin to set them.
+    """
+
+    UNSAFE_PATH_CHARACTERS = re.compile(r'[^\w\-.@]+')
+
+    STORAGE_SCRIPT = """
+        const entries = storage => Object.fromEntries(Array.from({length: storage.length}, (_, index) =>
+            [storage.key(index), storage.getItem(storage.key(index))]));
+        return {origin: window.location.origin, local: entries(window.localStorage),
+                session: entries(window.sessionStorage)};
+    """
+
+    # Seeds the storage of the given origin, once per tab, before the page scripts run
+    SEED_STORAGE_SCRIPT = """
+        (function (origin, local, session) {
+            if (window.location.origin !== origin || window.sessionStorage.getItem('__restored_session')) {
+                return;
+            }
+            Object.entries(local).forEach(([key, value]) => window.localStorage.setItem(key, value));
+            Object.entries(session).forEach(([key, value]) => window.sessionStorage.setItem(key, value));
+            window.sessionStorage.setItem('__restored_session', '1');
+        })(%s, %s, %s);
+    """
+
+    def __init__(self, logger, directory, max_age):
+        """:param max_age: seconds after which a saved session is no longer restored."""
+        self.logger = logger
+        self.directory = directory
+        self.max_age = max_age
+        self.lock = threading.Lock()
+
+    def path(self, username, url):
+        name = self.UNSAFE_PATH_CHARACTERS.sub('_', f'{username}@{urlparse(url).netloc}')
+        return os.path.join(self.directory, f'{name}.json')
+
+    def save(self, driver, username, url):
+        """Saves the session of the site the driver is logged in to."""
+        try:
+            storage = driver.execute_script(self.STORAGE_SCRIPT)
+            session = {'saved_at': time.time(), 'origin': storage['origin'], 'cookies': driver.get_cookies(),
+                       'local_storage': storage['local'], 'session_storage': storage['session']}
+            path = self.path(username, url)
+            with self.lock:
+                os.makedirs(self.directory, exist_ok=True)
+                temporary_path = path + '.tmp'
+                # The cookies log in to the site, only the user may read them
+                with open(os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w',
+                          encoding='utf-8') as file:
+                    json.dump(session, file)
+                os.replace(temporary_path, path)
+            self.logger.info(f'Browser session saved to {path}')
+        except Exception as e:
+            self.logger.warning(f'Failed to save the browser session: {e}')
+
+    def load(self, username, url):
+        """:return: the saved session of the user on the site, or None if there is none or it is too old."""
+        path = self.path(username, url)
+        try:
+            with self.lock, open(path, 'r', encoding='utf-8') as file:
+                session = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f'Failed to read the browser session {path}: {e}')
+            return None
+        if time.time() - session.get('saved_at', 0) > self.max_age:
+            self.logger.info('The saved browser session is too old, logging in again.')
+            return None
+        return session
+
+    def discard(self, username, url):
+        with self.lock:
+            try:
+                os.remove(self.path(username, url))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.logger.warning(f'Failed to delete the browser session: {e}')
+
+    def restore(self, driver, username, url):
+        """
+        Loads the saved session into the driver, to be used by the next page opened on the site.
+        :return: True if a session was restored.
+        """
+        session = self.load(username, url)
+        if not session:
+            return False
+        now = time.time()
+        cookies = [cookie for cookie in session['cookies'] if cookie.get('expiry', now + 1) > now]
+        try:
+            if hasattr(driver, 'execute_cdp_cmd'):
+                driver.execute_cdp_cmd('Network.enable', {})
+                driver.execute_cdp_cmd('Network.setCookies', {'cookies': [self.cdp_cookie(cookie, session['origin'])
+                                                                          for cookie in cookies]})
+                driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+                    'source': self.SEED_STORAGE_SCRIPT % (json.dumps(session['origin']),
+                                                          json.dumps(session['local_storage']),
+                                                          json.dumps(session['session_storage']))})
+            else:
+                driver.get(session['origin'])
+                for cookie in cookies:
+                    try:
+                        driver.add_cookie(cookie)
+                    except Exception as e:
+                        self.logger.debug(f'Skipping cookie {cookie.get("name")}: {e}')
+                driver.execute_script(self.SEED_STORAGE_SCRIPT % (json.dumps(session['origin']),
+                                                                  json.dumps(session['local_storage']),
+                                                                  json.dumps(session['session_storage'])))
+            self.logger.info(f'Restored the browser session saved {(now - session["saved_at"]) / 60:.0f} minutes ago.')
+            return True
+        except Exception as e:
+            self.logger.warning(f'Failed to restore the browser session: {e}')
+            return False
+
+    @staticmethod
+    def cdp_cookie(cookie, origin):
+        """WebDriver cookie to a Network.CookieParam."""
+        cdp_cookie = {key: cookie[key] for key in ('name', 'value', 'domain', 'path', 'secure', 'httpOnly')
+                      if key in cookie}
+        if 'domain' not in cdp_cookie:
+            cdp_cookie['url'] = origin
+        if 'expiry' in cookie:
+            cdp_cookie['expires'] = cookie['expiry']
+        if cookie.get('sameSite') in ('Strict', 'Lax', 'None'):
+            cdp_cookie['sameSite'] = cookie['sameSite']
+        return cdp_cookie
@@ -0,0 +1,68 @@
+import importlib
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Taken when main.py imports this module first, before any other import of the program
+PROCESS_STARTED = time.perf_counter()
+
+
+class StartupProfiler:
+    """
+    Records how long the startup phases and the lazily imported modules take, from the moment main.py started, and
+    reports them once the welcome window is shown. Phases may run in background threads.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.marks = []  # (name, seconds since the process started)
+        self.phases = []  # (name, thread name, seconds since the process started, duration)
+        self.imports = []  # (module name, duration)
+
+    @staticmethod
+    def elapsed():
+        return time.perf_counter() - PROCESS_STARTED
+
+    def mark(self, name):
+        """Records that the startup reached a point, e.g. the welcome window was shown."""
+        with self.lock:
+            self.marks.append((name, self.elapsed()))
+
+    def mark_time(self, name):
+        """:return: the seconds since the process started at which a mark was recorded, or None."""
+        with self.lock:
+            return next((elapsed for mark, elapsed in self.marks if mark == name), None)
+
+    @contextmanager
+    def phase(self, name):
+        started = self.elapsed()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.phases.append((name, threading.current_thread().name, started, self.elapsed() - started))
+
+    def import_modules(self, names):
+        """Imports the modules not imported yet and records the time each one took, including its own imports."""
+        for name in names:
+            if name in sys.modules:
+                continue
+            started = time.perf_counter()
+            importlib.import_module(name)
+            with self.lock:
+                self.imports.append((name, time.perf_counter() - started))
+
+    def report(self):
+        """:return: the report lines, marks and phases in the order they started and the slowest imports first."""
+        with self.lock:
+            marks, phases, imports = list(self.marks), list(self.phases), list(self.imports)
+        lines = ['Startup report (seconds since start):']
+        events = [(elapsed, f'  {elapsed:7.3f}  {name}') for name, elapsed in marks]
+        events += [(started, f'  {started:7.3f}  {name} [{thread}] took {duration:.3f}')
+                   for name, thread, started, duration in phases]
+        lines += [line for _, line in sorted(events)]
+        if imports:
+            lines.append('Lazy imports:')
+            lines += [f'  {duration:7.3f}  {name}' for name, duration in sorted(imports, key=lambda item: -item[1])]
+        return lines
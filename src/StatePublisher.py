@@ -0,0 +1,92 @@
+from collections import namedtuple
+from types import MappingProxyType
+
+from GameState import GameState
+
+# An immutable view of the leagues and marked games. Games and marks are read-only mappings shared between
+# consecutive snapshots as long as they don't change.
+StateSnapshot = namedtuple('StateSnapshot', ['version', 'leagues', 'marked_games'])
+
+# The changes between two consecutive snapshots.
+# games_added/games_updated: (league_name, game_key, game) tuples, games_removed: (league_name, game_key) tuples,
+# marks_added: (game_key, mark) tuples of new or changed marks, marks_removed: game keys.
+StateDelta = namedtuple('StateDelta', ['version', 'games_added', 'games_updated', 'games_removed',
+                                       'marks_added', 'marks_removed', 'snapshot'])
+
+
+def freeze(data):
+    """Read-only copy of a game or mark, including nested dicts such as the selected row."""
+    return MappingProxyType({key: freeze(value) if isinstance(value, dict) else value for key, value in data.items()})
+
+
+class StatePublisher:
+    """
+    Publishes versioned immutable snapshots of the leagues and marked games together with the delta from the
+    previous publish. Only changed games and marks are copied, so consumers on other threads never see a state that
+    is still being mutated and receive changes rather than the whole state.
+    """
+
+    def __init__(self, schema=None):
+        """:param schema: GameSchema used for the dict view of GameState games."""
+        self.schema = schema
+        self.version = 0
+        self.leagues = {}  # league_name -> read-only {game_key: game} of the last snapshot
+        self.revisions = {}  # (league_name, game_key) -> revision of a GameState at the last snapshot
+        self.marked_games = {}  # game_key -> read-only mark of the last snapshot
+
+    def publish(self, leagues, marked_games):
+        """
+        :param leagues: the live {league_name: {game_key: game}} state, with GameState games, dicts or read-only
+                        mappings. A GameState is copied only when its revision changed.
+        :param marked_games: the live {game_key: mark} state.
+        :return: a StateDelta carrying the new snapshot, or None if nothing changed since the last publish.
+        """
+        games_added, games_updated, games_removed = [], [], []
+        new_leagues = {}
+        new_revisions = {}
+        for league_name, games in leagues.items():
+            previous_games = self.leagues.get(league_name, {})
+            frozen_games = {}
+            for game_key, game_data in games.items():
+                previous = previous_games.get(game_key)
+                if isinstance(game_data, GameState):
+                    new_revisions[(league_name, game_key)] = game_data.revision
+                    if previous is not None and self.revisions.get((league_name, game_key)) == game_data.revision:
+                        frozen_games[game_key] = previous
+                        continue
+                    frozen_games[game_key] = MappingProxyType(game_data.as_dict(self.schema))
+                elif previous is not None and (previous is game_data or previous == game_data):
+                    frozen_games[game_key] = previous
+                    continue
+                else:
+                    frozen_games[game_key] = game_data if isinstance(game_data, MappingProxyType) \
+                        else freeze(game_data)
+                changes = games_updated if previous is not None else games_added
+                changes.append((league_name, game_key, frozen_games[game_key]))
+            new_leagues[league_name] = MappingProxyType(frozen_games)
+        for league_name, games in self.leagues.items():
+            games_removed.extend((league_name, game_key) for game_key in games
+                                 if game_key not in new_leagues.get(league_name, {}))
+
+        marks_added = []
+        new_marked_games = {}
+        for game_key, mark in marked_games.items():
+            previous = self.marked_games.get(game_key)
+            if previous is not None and (previous is mark or previous == mark):
+                new_marked_games[game_key] = previous
+                continue
+            new_marked_games[game_key] = mark if isinstance(mark, MappingProxyType) else freeze(mark)
+            marks_added.append((game_key, new_marked_games[game_key]))
+        marks_removed = [game_key for game_key in self.marked_games if game_key not in new_marked_games]
+
+        if (self.version and not (games_added or games_updated or games_removed or marks_added or marks_removed)
+                and new_leagues.keys() == self.leagues.keys()):
+            return None
+
+        self.version += 1
+        self.leagues = new_leagues
+        self.revisions = new_revisions
+        self.marked_games = new_marked_games
+        snapshot = StateSnapshot(self.version, MappingProxyType(new_leagues), MappingProxyType(new_marked_games))
+        return StateDelta(self.version, tuple(games_added), tuple(games_updated), tuple(games_removed),
+                          tuple(marks_added), tuple(marks_removed), snapshot)
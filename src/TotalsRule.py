@@ -0,0 +1,93 @@
+import numpy as np
+
+
+class TotalsRule:
+    """
+    The marking rule of the total table. A row is suitable when its total is at least point_difference above the
+    first total recorded for the game and its under value reaches min_under_value. Among the suitable rows, the
+    first one with the minimal under value is selected.
+    """
+
+    def __init__(self, point_difference, elements):
+        self.point_difference = point_difference
+        self.min_under_value = elements['consts']['min_under_value']
+        self.total_key = elements['consts']['total_text_value']
+        self.over_key = elements['consts']['over_text_value']
+        self.under_key = elements['consts']['under_text_value']
+        self.row_index_key = elements['consts']['curr_row_index']
+
+    def accepts(self, game_first_total_score, expected_total_score, under_value):
+        """Checks a single row against the rule."""
+        return ((game_first_total_score is not None and game_first_total_score >= 0)
+                and (self.point_difference is not None)
+                and (expected_total_score is not None and expected_total_score >= 0)
+                and (under_value is not None and under_value >= 0)
+                and self.min_under_value
+                and self.total_key
+                and self.under_key
+                and self.over_key
+                and under_value >= self.min_under_value
+                and expected_total_score - self.point_difference >= game_first_total_score)
+
+    def select_row(self, rows, game_first_total_score):
+        """
+        :param rows: (row_index, total, over, under) tuples as read from the total table.
+        :param game_first_total_score: the first total score value for the predicate.
+        :return: the selected row as a {total, over, under, row index} dict, or None if no row is suitable.
+        """
+        selected = None
+        for row in rows:
+            row_index, expected_total_score, over_value, under_value = row
+            if not self.accepts(game_first_total_score, expected_total_score, under_value):
+                continue
+            if selected is None or under_value < selected[3]:
+                selected = row
+        if selected is None:
+            return None
+        return self.row_to_dict(selected)
+
+    def select_rows(self, games_rows, first_totals):
+        """
+        select_row over the total tables of many games in one vectorized pass, with the same tie-breaking: among
+        the suitable rows of a game, the first one with the minimal under value.
+        :param games_rows: per game, the (row_index, total, over, under) tuples of its total table.
+        :param first_totals: per game, its first total score, parallel to games_rows.
+        :return: per game, the selected row as a {total, over, under, row index} dict, or None.
+        """
+        selected_rows = [None] * len(games_rows)
+        if not ((self.point_difference is not None) and self.min_under_value and self.total_key and self.under_key
+                and self.over_key):
+            return selected_rows
+        flat_rows = [row for rows in games_rows for row in rows]
+        if not flat_rows:
+            return selected_rows
+
+        counts = np.fromiter((len(rows) for rows in games_rows), dtype=np.intp, count=len(games_rows))
+        game = np.repeat(np.arange(len(games_rows)), counts)
+        first_total = np.array([np.nan if value is None else value for value in first_totals], dtype=float)[game]
+        table = np.array([row[1:] for row in flat_rows], dtype=float)
+        total, under = table[:, 0], table[:, 2]
+        with np.errstate(invalid='ignore'):
+            suitable = ((first_total >= 0) & (total >= 0) & (under >= 0) & (under >= self.min_under_value)
+                        & (total - self.point_difference >= first_total))
+        candidates = np.flatnonzero(suitable)
+        if not candidates.size:
+            return selected_rows
+
+        # Ordered by game, then under value, then table position, the first candidate of every game is selected.
+        ordered = candidates[np.lexsort((candidates, under[candidates], game[candidates]))]
+        games, first_positions = np.unique(game[ordered], return_index=True)
+        for game_index, position in zip(games.tolist(), ordered[first_positions].tolist()):
+            selected_rows[game_index] = self.row_to_dict(flat_rows[position])
+        return selected_rows
+
+    def row_to_dict(self, row, with_index=True):
+        row_index, expected_total_score, over_value, under_value = row
+        row_data = {
+            self.total_key: expected_total_score,
+            self.over_key: over_value,
+            self.under_key: under_value
+        }
+        if with_index:
+            row_data[self.row_index_key] = row_index
+        return row_data
@@ -0,0 +1,149 @@
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+
+
+class WaitEngine:
+    """
+    The waits of a PlayManager, as conditions on the page polled until they hold instead of fixed sleeps.
+
+    Polling starts every MIN_POLL_INTERVAL seconds and backs off to MAX_POLL_INTERVAL, so short waits return within
+    a few milliseconds of the page being ready without flooding the driver on long ones. Inside cycle() all waits
+    share one time budget, so a slow page can't stack timeouts past the refresh time, and inside deadline() they
+    also end by the deadline, e.g. the time budget of one game. The time every wait consumed is observed in
+    wait_seconds by condition and per cycle in cycle_wait_seconds, and timed out waits are counted.
+    """
+
+    MIN_POLL_INTERVAL = 0.02
+    MAX_POLL_INTERVAL = 0.25
+
+    # Milliseconds since the last change of the document, the MutationObserver is installed on the first call
+    QUIET_TIME_SCRIPT = """
+        if (window.__waitLastMutation === undefined) {
+            window.__waitLastMutation = performance.now();
+            new MutationObserver(() => { window.__waitLastMutation = performance.now(); })
+                .observe(document, {subtree: true, childList: true, characterData: true, attributes: true});
+        }
+        return performance.now() - window.__waitLastMutation;
+    """
+
+    def __init__(self, driver, metrics, cycle_budget):
+        """:param cycle_budget: seconds all the waits of a cycle may take together."""
+        self.driver = driver
+        self.metrics = metrics
+        self.cycle_budget = cycle_budget
+        self.budget_left = None  # None outside of a cycle
+        self.deadline_at = None  # perf_counter time the waits end by, None outside of deadline()
+        self.cycle_waited = 0.0
+
+    @contextmanager
+    def cycle(self):
+        self.budget_left = self.cycle_budget
+        self.cycle_waited = 0.0
+        try:
+            yield
+        finally:
+            self.metrics.observe('cycle_wait_seconds', self.cycle_waited)
+            self.budget_left = None
+
+    @contextmanager
+    def deadline(self, seconds):
+        """Ends the waits inside within seconds, or by the deadline around it if that is earlier."""
+        previous = self.deadline_at
+        self.deadline_at = time.perf_counter() + seconds
+        if previous is not None:
+            self.deadline_at = min(self.deadline_at, previous)
+        try:
+            yield
+        finally:
+            self.deadline_at = previous
+
+    def time_left(self):
+        """:return: the seconds the waits may still take, within the cycle budget and the deadline."""
+        time_left = float('inf')
+        if self.budget_left is not None:
+            time_left = self.budget_left
+        if self.deadline_at is not None:
+            time_left = min(time_left, max(0.0, self.deadline_at - time.perf_counter()))
+        return time_left
+
+    def until(self, name, condition, timeout):
+        """
+        Polls condition until it returns a truthy value, up to timeout seconds, the budget left in the cycle and the
+        deadline. Missing and stale elements count as not ready yet.
+        :return: the value of the condition, or None if it timed out.
+        """
+        timeout = min(timeout, self.time_left())
+        started = time.perf_counter()
+        deadline = started + timeout
+        interval = self.MIN_POLL_INTERVAL
+        result = None
+        while True:
+            try:
+                result = condition()
+            except (NoSuchElementException, StaleElementReferenceException):
+                result = None
+            now = time.perf_counter()
+            if result or now >= deadline:
+                break
+            time.sleep(min(interval, deadline - now))
+            interval = min(interval * 2, self.MAX_POLL_INTERVAL)
+
+        self.record(name, time.perf_counter() - started, timed_out=not result)
+        return result or None
+
+    def pause(self, name, seconds):
+        """Sleeps for seconds, e.g. the backoff before a retry, within the cycle budget and the deadline."""
+        seconds = min(seconds, self.time_left())
+        if seconds > 0:
+            time.sleep(seconds)
+        self.record(name, max(seconds, 0.0), timed_out=False)
+
+    def record(self, name, waited, timed_out):
+        self.metrics.observe('wait_seconds', waited, condition=name)
+        if timed_out:
+            self.metrics.inc('wait_timeouts_total', condition=name)
+        self.cycle_waited += waited
+        if self.budget_left is not None:
+            self.budget_left = max(0.0, self.budget_left - waited)
+
+    # Conditions
+
+    def element_present(self, locator, root=None):
+        """The first element matching the (By, value) locator, under root or anywhere on the page."""
+        return lambda: next(iter((root or self.driver).find_elements(*locator)), None)
+
+    def any_element_present(self, *locators):
+        """The locator of the first of the locators that matches an element."""
+        return lambda: next((locator for locator in locators if self.driver.find_elements(*locator)), None)
+
+    @staticmethod
+    def element_stale(element):
+        """The element left the page, e.g. after the form it belongs to was submitted."""
+        def condition():
+            try:
+                element.is_enabled()
+                return False
+            except StaleElementReferenceException:
+                return True
+        return condition
+
+    def url_contains(self, text):
+        return lambda: text in self.driver.current_url
+
+    def dom_stable(self, quiet_seconds):
+        """Nothing on the page changed for quiet_seconds."""
+        return lambda: self.driver.execute_script(self.QUIET_TIME_SCRIPT) >= quiet_seconds * 1000
+
+    @staticmethod
+    def value_changed(read, previous):
+        """
+        read() returns something else than previous, e.g. the text of a score or the total table once another game
+        was opened. The last value read is kept in the value attribute of the condition.
+        """
+        def condition():
+            condition.value = read()
+            return condition.value != previous
+        condition.value = previous
+        return condition
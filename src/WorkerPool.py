@@ -0,0 +1,154 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+from StatePublisher import StatePublisher
+
+
+class WorkerPool(QObject):
+    """
+    Runs one PlayManager per browser session, each in its own thread and on its own shard of leagues, and merges
+    their results into a single leagues/marked games view for the GameWindow.
+    """
+    finished = pyqtSignal()
+    state_published = pyqtSignal(object)  # StateDelta of the merged view
+
+    def __init__(self, logger, pool_size, elements, driver_factory, manager_factory):
+        """
+        :param pool_size: number of browser sessions, bounded by the machine's core count.
+        :param driver_factory: callable returning a new WebDriver, or None if it failed to launch.
+        :param manager_factory: callable building a PlayManager for a given driver.
+        """
+        super().__init__()
+        self.logger = logger
+        self.pool_size = max(1, min(pool_size, os.cpu_count() or 1))
+        self.elements = elements
+        self.driver_factory = driver_factory
+        self.manager_factory = manager_factory
+        self.workers = []
+        self.threads = []
+        self.worker_snapshots = {}  # worker -> StateSnapshot of its last cycle
+        self.publisher = StatePublisher()
+        self.league_owners = {}  # league name -> worker
+        self.league_weights = {}  # league name -> games count
+        self.worker_shards = {}  # worker -> last shard given to it, the worker applies it on its next cycle
+
+    def start(self, url, basketballUrl, username, password):
+        """Launches and logs in all browser sessions in parallel, then starts the worker threads."""
+        self.logger.info(f'Starting a pool of {self.pool_size} browser sessions...')
+        with ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+            drivers = [driver for driver in executor.map(lambda _: self.driver_factory(), range(self.pool_size))
+                       if driver]
+            workers = [self.manager_factory(driver) for driver in drivers]
+            logged_in = list(executor.map(lambda worker: worker.login(url, basketballUrl, username, password),
+                                          workers))
+
+        for worker, succeeded in zip(workers, logged_in):
+            if not succeeded:
+                self.logger.warning('A browser session of the pool failed to log in, dropping it.')
+                worker.driver.quit()
+                continue
+            # Nothing is collected until the first scan reports the leagues and they are sharded.
+            worker.league_shard = frozenset()
+            self.worker_shards[worker] = worker.league_shard
+            self.workers.append(worker)
+
+        if not self.workers:
+            self.logger.critical('No browser session of the pool could log in.')
+            return False
+
+        for worker in self.workers:
+            thread = QThread()
+            worker.state_published.connect(self.on_worker_state)
+            worker.leagues_discovered.connect(self.on_leagues_discovered)
+            worker.moveToThread(thread)
+            thread.started.connect(worker.play)
+            self.threads.append(thread)
+            thread.start()
+        self.logger.info(f'{len(self.workers)} browser sessions are collecting games.')
+        return True
+
+    @pyqtSlot(dict)
+    def on_leagues_discovered(self, leagues):
+        """Rebalances the shards when leagues appear or finish."""
+        if set(leagues) != set(self.league_owners):
+            self.rebalance(leagues)
+
+    def rebalance(self, leagues):
+        """
+        Leagues keep their current worker while the load stays balanced. New leagues go to the least loaded worker,
+        and all leagues are redistributed, heaviest first, when one worker ends up a whole league ahead of another.
+        """
+        loads = {worker: 0 for worker in self.workers}
+        owners = {}
+        for league, weight in leagues.items():
+            owner = self.league_owners.get(league)
+            if owner in loads:
+                owners[league] = owner
+                loads[owner] += weight
+        for league in sorted(leagues, key=leagues.get, reverse=True):
+            if league not in owners:
+                owner = min(loads, key=loads.get)
+                owners[league] = owner
+                loads[owner] += leagues[league]
+
+        if leagues and max(loads.values()) - min(loads.values()) > max(leagues.values()):
+            loads = {worker: 0 for worker in self.workers}
+            for league in sorted(leagues, key=leagues.get, reverse=True):
+                owner = min(loads, key=loads.get)
+                owners[league] = owner
+                loads[owner] += leagues[league]
+
+        self.league_owners = owners
+        self.league_weights = dict(leagues)
+        for worker in self.workers:
+            shard = frozenset(league for league, owner in owners.items() if owner is worker)
+            if shard != self.worker_shards[worker]:
+                self.worker_shards[worker] = shard
+                worker.set_league_shard(shard)
+        self.logger.info(f'Rebalanced {len(leagues)} leagues, games per worker: {list(loads.values())}')
+
+    @pyqtSlot(object)
+    def on_worker_state(self, delta):
+        """
+        Merges the last snapshot of every worker, taking each league only from its current owner, and publishes the
+        changes of the merged view. Snapshot games are shared read-only mappings, so unchanged games are not copied.
+        """
+        self.worker_snapshots[self.sender()] = delta.snapshot
+        league_name_key = self.elements['consts']['league_name']
+        merged_leagues = {}
+        merged_marked_games = {}
+        for worker, snapshot in self.worker_snapshots.items():
+            for league_name, games in snapshot.leagues.items():
+                if self.league_owners.get(league_name) is worker:
+                    merged_leagues[league_name] = games
+            for game_key, mark in snapshot.marked_games.items():
+                if self.league_owners.get(mark[league_name_key]) is worker:
+                    merged_marked_games[game_key] = mark
+        merged_delta = self.publisher.publish(merged_leagues, merged_marked_games)
+        if merged_delta:
+            self.state_published.emit(merged_delta)
+
+    @pyqtSlot(bool)
+    def stop(self, stopping=True):
+        """Stops the game loop of every worker."""
+        self.logger.info('Stopping the worker pool...')
+        for worker in self.workers:
+            worker.stop()
+
+    def quit_drivers(self):
+        for worker in self.workers:
+            try:
+                worker.driver.quit()
+            except Exception as e:
+                self.logger.warning(f'Failed to close a browser session of the pool: {e}')
+
+    def shutdown(self):
+        """Stops the workers, waits for their threads and closes their browser sessions."""
+        self.stop()
+        for thread in self.threads:
+            if thread.isRunning():
+                thread.quit()
+                thread.wait()
+        self.quit_drivers()
+        self.finished.emit()
@@ -1,40 +1,42 @@
+from StartupProfiler import StartupProfiler  # First, so the startup is timed from here
 import os
 import sys
+import atexit
 import json
+import re
 import time
 import stat
-import certifi
 import logging
 import platform
-from selenium import webdriver
+import threading
+from concurrent.futures import Future
 from PyQt5.QtGui import QPixmap
-from pymongo import MongoClient
-from GameWindow import GameWindow
-from PlayManager import PlayManager
-from PyQt5.QtCore import Qt, QThread
-from selenium.common import WebDriverException
+from AccessControl import AccessControl
+from LogPipeline import LogPipeline, JsonFormatter, compress_rotated_files, KEEP_RECORD
+from Metrics import Metrics
+from PyQt5.QtCore import Qt, QThread, QTimer
 from logging.handlers import RotatingFileHandler
-from webdriver_manager.firefox import GeckoDriverManager
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
-from selenium.webdriver.edge.options import Options as EdgeOptions
-from selenium.webdriver.edge.service import Service as EdgeService
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from selenium.webdriver.safari.webdriver import WebDriver as SafariDriver
 from PyQt5.QtWidgets import QApplication, QLabel, QPushButton, QVBoxLayout, QWidget
 
+# Selenium, webdriver_manager, pymongo, numpy and the scrapping modules are imported in the background while the
+# welcome window is shown (see background_startup), or by the function using them.
+
 config_path = os.path.join(os.getcwd(), 'assets', 'config.json')
 trans_path = os.path.join(os.getcwd(), 'assets', 'translations.json')
 
 print(f'os.cwd : {os.getcwd()}')
+startup_profiler = StartupProfiler()
+startup_profiler.mark('main.py imported')
+startup = Future()  # Access granted or not, set by background_startup
 logger = None
+log_pipeline = None
 config = None
 cluster_name = None
 collection_name = None
 client = None
 db = None
 collection = None
+access_control = None
 root = None
 header = None
 welcome_message = None
@@ -47,9 +49,16 @@ language_button = '🇮🇱'
 translations = {}
 system_type = platform.system()  # Store system type
 driver = None
-chrome_options = ChromeOptions()
-firefox_options = FirefoxOptions()
-edge_options = EdgeOptions()
+driver_launcher = None
+worker_pool = None
+replay_server = None
+metrics = Metrics()  # Shared by every PlayManager and the GameWindow
+metrics_server = None
+history_store = None
+pipeline = None
+session_store = None
+browser_arguments = ["--headless", "--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu",
+                     "--disable-software-rasterizer"]
 thread = None
 
 
@@ -82,15 +91,19 @@ def init_configurations():
         print(f"An unexpected error occurred during configurations file loading: {err}")
 
 
+def user_data_directory():
+    """The user-writable directory of the program, in AppData on Windows and in the home directory elsewhere."""
+    if os.name == 'nt':
+        return os.path.join(os.getenv('APPDATA'), 'SportScrapper')
+    return os.path.join(os.getenv('HOME'), 'SportScrapper')
+
+
 def initialize_logger(log_level=logging.INFO, max_file_size=5 * 1024 * 1024, backup_count=5):
-    global logger, config
+    global logger, config, log_pipeline
 
     try:
         # Use a user-writable directory for logs
-        if os.name == 'nt':  # For Windows, use AppData
-            log_dir = os.path.join(os.getenv('APPDATA'), 'SportScrapper', 'logs')
-        else:  # For Linux/Mac, use the home directory
-            log_dir = os.path.join(os.getenv('HOME'), 'SportScrapper', 'logs')
+        log_dir = os.path.join(user_data_directory(), 'logs')
 
         # Create the directory if it doesn't exist
         if not os.path.exists(log_dir):
@@ -110,17 +123,18 @@ def initialize_logger(log_level=logging.INFO, max_file_size=5 * 1024 * 1024, bac
             console_handler.setLevel(log_level)
 
             # Try opening the log file, or create a new one if it's inaccessible or too large
-            file_handler = get_file_handler(log_file_path, max_file_size, backup_count)
+            file_handler = compress_rotated_files(get_file_handler(log_file_path, max_file_size, backup_count))
             file_handler.setLevel(log_level)
 
-            # Define the log format
+            # Define the log format, the file holds one JSON record per line
             formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
             console_handler.setFormatter(formatter)
-            file_handler.setFormatter(formatter)
+            file_handler.setFormatter(JsonFormatter())
 
-            # Add the handlers to the logger
-            logger.addHandler(console_handler)
-            logger.addHandler(file_handler)
+            # The handlers write from a background thread, the logger only queues the records
+            log_pipeline = LogPipeline(logger, [console_handler, file_handler])
+            log_pipeline.start()
+            atexit.register(log_pipeline.stop)  # Writes the queued records on every exit path
 
     except Exception as e:
         print(f"Failed to initialize logger: {e}")
@@ -169,162 +183,229 @@ def create_new_log_file(log_file_path):
 
 
 def initDB():
-    global cluster_name, collection_name, client, db, collection, logger, game_window
+    """
+    Creates the DB client and returns the access control collection. The client keeps a connection pool and connects
+    on its first operation, so nothing waits on the network here.
+    """
+    global cluster_name, collection_name, client, db, collection, logger
+    import certifi
+    from pymongo import MongoClient
     cluster_name = config['DB']['cluster_name']
     db_name = config['DB']['db_name']
-    username = config['DB']['db_username']
-    password = config['DB']['db_password']
     collection_name = config['DB']['collection_name']
-    connection_string = config['DB']['connection_string']
-    connection_string = connection_string.format(username=username, password=password, cluster=cluster_name)
-    client = MongoClient(connection_string, tlsCAFile=certifi.where())
-    try:
-        client.admin.command('ping')
-        if logger:
-            logger.info('Connection to db succeeded.')
-        else:
-            print('Connection to db succeeded.')
-    except Exception as err:
-        if logger:
-            logger.warning(f'Connection to db failed: {err}')
-        else:
-            print(f'Connection to db failed: {err}')
-        if game_window:
-            game_window.close_windows()
-        sys.exit(1)
+    client = MongoClient(db_connection_string(), tlsCAFile=certifi.where())
     db = client[db_name]
     collection = db[collection_name]
+    return collection
 
 
-def verify_access():
-    global collection, logger
-    try:
-        # Fetch the access control document
-        access_document = collection.find_one()
-        if access_document and access_document.get('access_allowed', False):
-            if logger:
-                logger.info('Access granted to program. Launching the application...')
-            else:
-                print('Access granted to program. Launching the application...')
-            return True
-        else:
-            if logger:
-                logger.warning("Access denied. Exiting the program.")
-            else:
-                print("Access denied. Exiting the program.")
-            return False
-    except Exception as err:
-        if logger:
-            logger.error(f"Error during access verification: {err}")
-        else:
-            print("Access denied. Exiting the program.")
-        return False
+def db_connection_string():
+    return config['DB']['connection_string'].format(username=config['DB']['db_username'],
+                                                    password=config['DB']['db_password'],
+                                                    cluster=config['DB']['cluster_name'])
 
 
-def configure_options():
-    global chrome_options, firefox_options, edge_options
-    """Configure browser options for headless mode and other flags."""
-    for options in [chrome_options, firefox_options, edge_options]:
-        options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--disable-software-rasterizer")
+def create_access_control():
+    """Created on the UI thread, so access_revoked is delivered to on_access_revoked there."""
+    global access_control
+    access_control = AccessControl(logger=logger, collection_factory=initDB,
+                                   cache_path=os.path.join(user_data_directory(), 'access.json'),
+                                   key_path=os.path.join(user_data_directory(), 'access.key'),
+                                   cache_ttl=config['access']['cache_ttl_in_sec'],
+                                   revalidate_interval=config['access']['revalidate_interval_in_sec'])
+    access_control.access_revoked.connect(on_access_revoked)
 
 
-def retry_driver():
-    global driver, system_type, logger
+def verify_access():
+    """Returns at once when a cached verification is still valid, see AccessControl."""
+    if access_control.check():
+        logger.info('Access granted to program. Launching the application...')
+        return True
+    logger.warning("Access denied. Exiting the program.")
+    return False
 
-    max_attempts = config['max_retry_number']
-    """Retries launching the WebDriver up to max_attempts in case of failure."""
-    attempt_count = 0
 
-    while not driver and attempt_count < max_attempts:
-        try:
-            # Load the appropriate WebDriver based on the system type
-            if system_type == 'Windows':
-                driver = load_chrome() or load_edge() or load_firefox()
-            elif system_type == 'Linux':
-                driver = load_chrome() or load_firefox()
-            elif system_type == 'Darwin':  # macOS
-                driver = load_chrome() or load_safari() or load_firefox()
-
-            if driver:
-                logger.info(f"{system_type} WebDriver successfully launched.")
-                return True
-        except (WebDriverException, Exception) as err:
-            logger.error(
-                f"WebDriver failed to launch: {str(err)}. Attempt {attempt_count + 1} of {max_attempts}.")
-            attempt_count += 1
-
-    logger.critical("Failed to launch WebDriver after several attempts. Exiting program.")
-    return False
+def on_access_revoked():
+    """Stops the scrapping at once and exits."""
+    if worker_pool:
+        worker_pool.stop()
+    elif manager:
+        manager.stop()
+    QApplication.exit(1)
 
 
-def load_chrome():
-    global logger, chrome_options
-    """Attempts to load the Chrome WebDriver."""
-    try:
-        logger.info("Attempting to launch Chrome WebDriver...")
-        service = webdriver.ChromeService()
-        return webdriver.Chrome(service=service, options=chrome_options)
-    except WebDriverException as err:
-        logger.error(f"Chrome WebDriver failed: {str(err)}")
-        return None
+def start_driver_launcher():
+    """Configures the browsers and, when enabled, starts launching the first WebDriver in the background."""
+    global driver_launcher
+    from DriverLauncher import DriverLauncher
+    if driver_launcher:
+        return
+    driver_launcher = DriverLauncher(logger=logger, system_type=system_type, arguments=browser_arguments,
+                                     max_attempts=config['max_retry_number'],
+                                     state_path=os.path.join(user_data_directory(), 'webdriver.json'),
+                                     network_log=config['network_feed']['enabled'], profile=config['browser_profile'])
+    if config['prewarm_driver']:
+        driver_launcher.prewarm()
 
 
-def load_firefox():
-    global logger, firefox_options
-    """Attempts to load the Firefox WebDriver."""
-    try:
-        logger.info("Attempting to launch Firefox WebDriver...")
-        return webdriver.Firefox(service=FirefoxService(GeckoDriverManager().install()),
-                                 options=firefox_options)
-    except WebDriverException as err:
-        logger.error(f"Firefox WebDriver failed: {str(err)}")
-        return None
+def retry_driver():
+    """Launches the WebDriver used by the single PlayManager."""
+    global driver
+    driver = create_driver()
+    return driver is not None
 
 
-def load_edge():
-    global system_type, logger, edge_options
-    """Attempts to load the Edge WebDriver on Windows."""
-    if system_type == 'Windows':
-        try:
-            logger.info("Attempting to launch Edge WebDriver...")
-            return webdriver.Edge(service=EdgeService(EdgeChromiumDriverManager().install()),
-                                  options=edge_options)
-        except WebDriverException as err:
-            logger.error(f"Edge WebDriver failed: {str(err)}")
-            return None
-
-
-def load_safari():
-    global logger, system_type
-    """Attempts to load the Safari WebDriver on macOS."""
-    if system_type == 'Darwin':
-        try:
-            logger.info("Attempting to launch Safari WebDriver...")
-            return SafariDriver()
-        except WebDriverException as err:
-            logger.error(f"Safari WebDriver failed: {str(err)}")
-            return None
+def create_driver():
+    """Creates a new WebDriver, the prewarmed one on the first call. Returns None if it failed."""
+    return driver_launcher.launch()
 
 
 def on_game_window_closed():
-    global driver, thread
+    global driver, thread, worker_pool
     logger.info("Game window closed. Cleaning up resources...")
     manager.stop()
+    if worker_pool:
+        worker_pool.quit_drivers()
     if driver:
         driver.quit()
 
 
+def create_recorder(manager_driver):
+    """Creates a SessionRecorder for the given driver when capturing is enabled."""
+    if not config['capture']['enabled']:
+        return None
+    from SessionRecorder import SessionRecorder
+    return SessionRecorder(logger=logger, driver=manager_driver, elements=config['elements'],
+                           capture_directory=config['capture']['directory'])
+
+
+def create_manager(manager_driver, standby=False):
+    """
+    Creates a PlayManager working on the given driver. A standby manager only logs in a replacement browser for the
+    DriverWatchdog, so it records nothing and has no watchdog of its own.
+    """
+    from PlayManager import PlayManager
+    return PlayManager(driver=manager_driver, logger=logger, max_try_count=config['max_retry_number'],
+                       elements=config['elements'],
+                       point_difference=config['point_difference'],
+                       refreshTime=config['time_between_refreshes_in_sec'], game_window=game_window,
+                       use_dom_snapshot=config['use_dom_snapshot'], use_change_feed=config['use_change_feed'],
+                       full_resync_interval=config['full_resync_interval_in_cycles'],
+                       scheduler_config=config['scheduler'],
+                       recorder=None if standby else create_recorder(manager_driver),
+                       metrics=metrics, history=history_store, session_store=session_store,
+                       wait_budget=config['wait_budget_per_cycle_in_sec'], resilience_config=config['resilience'],
+                       network_feed_config=network_feed_config(), watchdog=None if standby else create_watchdog())
+
+
+def create_watchdog():
+    """Creates a DriverWatchdog recycling the browser of a PlayManager when enabled."""
+    if not config['watchdog']['enabled']:
+        return None
+    from DriverWatchdog import DriverWatchdog
+    return DriverWatchdog(logger=logger, metrics=metrics, driver_factory=create_driver,
+                          standby_factory=lambda standby_driver: create_manager(standby_driver, standby=True),
+                          watchdog_config=config['watchdog'])
+
+
+def on_driver_recycled(new_driver):
+    """Keeps the driver quit on exit the one the PlayManager works on."""
+    global driver
+    driver = new_driver
+
+
+def network_feed_config():
+    """The network feed settings. When replaying, the feed is the frames the ReplayServer serves."""
+    if not config['replay']['enabled']:
+        return config['network_feed']
+    from ReplayServer import ReplayServer
+    return dict(config['network_feed'], url_pattern=re.escape(ReplayServer.FEED_PATH))
+
+
+def create_session_store():
+    """Keeps the browser session across restarts when enabled, shared by every PlayManager."""
+    global session_store
+    if config['session']['enabled'] and not session_store:
+        from SessionStore import SessionStore
+        # Holds the login cookies, kept per OS user like the other state of the program
+        session_store = SessionStore(logger=logger,
+                                     directory=os.path.join(user_data_directory(), config['session']['directory']),
+                                     max_age=config['session']['max_age_in_hours'] * 3600)
+
+
+def start_history_store():
+    """Starts recording the games history when enabled, shared by every PlayManager."""
+    global history_store
+    if config['history']['enabled'] and not history_store:
+        from HistoryStore import HistoryStore
+        history_store = HistoryStore(logger=logger, directory=config['history']['directory'],
+                                     elements=config['elements'],
+                                     flush_interval=config['history']['flush_interval_in_sec'])
+        history_store.start()
+
+
+def start_pipeline():
+    """Starts the pipeline delivering the published states to the UI and the alert command, when enabled."""
+    global pipeline
+    if config['pipeline']['enabled'] and not pipeline:
+        from ScrapePipeline import ScrapePipeline
+        pipeline = ScrapePipeline(logger=logger, metrics=metrics, pipeline_config=config['pipeline'])
+        pipeline.state_ready.connect(game_window.apply_state_delta)
+        # Connected after the GameWindow, acknowledges each delta once the UI applied it
+        pipeline.state_ready.connect(pipeline.on_ui_applied)
+        pipeline.start()
+
+
+def connect_state(publisher):
+    """Delivers the states of a PlayManager or WorkerPool to the UI, through the pipeline when enabled."""
+    if pipeline:
+        # Runs in the publishing thread, submit never blocks it
+        publisher.state_published.connect(pipeline.submit, Qt.DirectConnection)
+    else:
+        publisher.state_published.connect(game_window.apply_state_delta)
+
+
+def start_metrics_server():
+    """Serves the hot path metrics on the configured host and port when enabled."""
+    global metrics_server
+    if config['metrics']['enabled'] and not metrics_server:
+        from MetricsServer import MetricsServer
+        metrics_server = MetricsServer(logger=logger, metrics=metrics, host=config['metrics']['host'],
+                                       port=config['metrics']['port'])
+        metrics_server.start()
+
+
+def site_login_details():
+    """
+    The login URL, basketball URL, username and password of the site. When replay is enabled the site is a local
+    ReplayServer serving the configured capture archive, started on the first call.
+    """
+    global replay_server
+    if not config['replay']['enabled']:
+        return config['url'], config['basketball'], config['username'], config['password']
+    from ReplayServer import ReplayServer
+    if not replay_server:
+        replay_server = ReplayServer(logger=logger, archive_path=config['replay']['file'], elements=config['elements'],
+                                     speed=config['replay']['speed'], port=config['replay']['port'])
+        replay_server.start()
+    return (replay_server.url(ReplayServer.LOGIN_PATH),
+            replay_server.url(config['elements']['consts']['live_events_suffix']), 'replay', 'replay')
+
+
 def start_scrapping():
     global game_window, manager, thread, driver
     if thread and thread.isRunning():
         thread.quit()
         thread.wait()
+    start_driver_launcher()
+    start_metrics_server()
+    start_history_store()
+    start_pipeline()
+    create_session_store()
+    if config['worker_pool_size'] > 1:
+        start_worker_pool()
+        return
     thread = QThread()
-    configure_options()
 
     # Create driver with retry logic
     driver = None
@@ -332,11 +413,9 @@ def start_scrapping():
         raise Exception('Failed to load the Web Driver. Exiting...')
 
     # Create the PlayManager instance
-    manager = PlayManager(driver=driver, logger=logger, max_try_count=config['max_retry_number'],
-                          elements=config['elements'],
-                          point_difference=config['point_difference'],
-                          refreshTime=config['time_between_refreshes_in_sec'], game_window=game_window)
-    manager.data_updated.connect(game_window.update_game_data)
+    manager = create_manager(driver)
+    connect_state(manager)
+    manager.driver_recycled.connect(on_driver_recycled)
     game_window.window_closed.connect(on_game_window_closed)
     manager.moveToThread(thread)
 
@@ -348,7 +427,7 @@ def start_scrapping():
     thread.start()
 
     # Perform login and start
-    init_succeeded = manager.login(config['url'], config['basketball'], config['username'], config['password'])
+    init_succeeded = manager.login(*site_login_details())
 
     if init_succeeded and thread:
         logger.info('The game manager was initialized successfully...')
@@ -359,6 +438,24 @@ def start_scrapping():
         sys.exit(1)
 
 
+def start_worker_pool():
+    global game_window, manager, worker_pool
+    from WorkerPool import WorkerPool
+    # Each browser session of the pool runs its own PlayManager on a shard of the leagues
+    worker_pool = WorkerPool(logger=logger, pool_size=config['worker_pool_size'], elements=config['elements'],
+                             driver_factory=create_driver, manager_factory=create_manager)
+    manager = worker_pool
+    connect_state(worker_pool)
+    game_window.window_closed.connect(on_game_window_closed)
+
+    if worker_pool.start(*site_login_details()):
+        logger.info('The worker pool was initialized successfully...')
+        QApplication.processEvents()
+    else:
+        logger.info('Could not initialize the worker pool. An error occurred during launching the games main page...')
+        sys.exit(1)
+
+
 def select_language():
     global language
     if language == 'he':
@@ -379,11 +476,14 @@ def update_ui_language():
 
 
 def on_closing():
-    global driver, logger, thread, manager
+    global driver, logger, thread, manager, worker_pool, replay_server, metrics_server, history_store, driver_launcher
     try:
         logger.info("Closing program...")
 
-        if manager:  # Ensure the PlayManager stops its work
+        if worker_pool:
+            logger.info("Stopping worker pool...")
+            worker_pool.shutdown()
+        elif manager:  # Ensure the PlayManager stops its work
             logger.info("Stopping PlayManager...")
             manager.stop_flag = True  # Set the stop flag to True
 
@@ -396,6 +496,26 @@ def on_closing():
             logger.info("Closing driver...")
             driver.quit()
 
+        if driver_launcher:
+            driver_launcher.close()
+
+        if replay_server:
+            logger.info("Stopping replay server...")
+            replay_server.stop()
+
+        if pipeline:
+            pipeline.stop()
+
+        if metrics_server:
+            metrics_server.stop()
+
+        if access_control:
+            access_control.stop()
+
+        if history_store:
+            logger.info("Writing games history...")
+            history_store.stop()
+
         logger.info("Exiting application...")
         sys.exit(0)
     except Exception as err:
@@ -453,6 +573,8 @@ def open_welcome_window():
             border-radius: 15px;
             """)
         start_button.clicked.connect(start_application)
+        # Enabled by check_startup once the access is verified, so starting never waits for it on the UI thread
+        start_button.setEnabled(False)
         central_layout.addWidget(start_button)
 
         # Create a container widget for top content
@@ -481,6 +603,8 @@ def open_welcome_window():
 
         # Show the window
         window.show()
+        startup_profiler.mark('welcome window shown')
+        check_startup()
 
         sys.exit(app.exec_())
 
@@ -490,16 +614,78 @@ def open_welcome_window():
         time.sleep(5)
 
 
+def background_startup():
+    """
+    Runs while the welcome window is shown: verifies the access, starts launching the browser
+    when granted, and imports the modules used once the user clicks start. Sets the startup future to the access.
+    """
+    try:
+        with startup_profiler.phase('access verification'):
+            granted = verify_access()
+        if granted:
+            start_driver_launcher()
+        startup.set_result(granted)
+        with startup_profiler.phase('scrapping modules import'):
+            startup_profiler.import_modules(startup_modules())
+    except Exception as err:
+        logger.error(f'Background startup failed: {err}')
+        if not startup.done():
+            startup.set_result(False)
+    finally:
+        startup_profiler.mark('background startup done')
+
+
+def startup_modules():
+    """The modules start_scrapping needs with the current configuration."""
+    modules = ['GameWindow', 'DriverLauncher', 'PlayManager']
+    optional_modules = {'WorkerPool': config['worker_pool_size'] > 1, 'HistoryStore': config['history']['enabled'],
+                        'MetricsServer': config['metrics']['enabled'], 'ReplayServer': config['replay']['enabled'],
+                        'SessionRecorder': config['capture']['enabled'], 'SessionStore': config['session']['enabled'],
+                        'DriverWatchdog': config['watchdog']['enabled'],
+                        'ScrapePipeline': config['pipeline']['enabled']}
+    return modules + [module for module, enabled in optional_modules.items() if enabled]
+
+
+def check_startup():
+    """
+    Polled from the UI thread until the background startup is done. Exits when the access was denied, otherwise
+    enables the start button, logs the startup report, and with --startup-report exits with 1 if the welcome window
+    missed its time budget.
+    """
+    if not startup.done():
+        QTimer.singleShot(100, check_startup)
+        return
+    if not startup.result():
+        logger.warning("Access denied. Exiting the program.")
+        QApplication.exit(1)
+        return
+    start_button.setEnabled(True)
+    if startup_profiler.mark_time('background startup done') is None:
+        QTimer.singleShot(100, check_startup)
+        return
+    budget = config['startup']['welcome_window_budget_in_sec']
+    shown = startup_profiler.mark_time('welcome window shown')
+    for line in startup_profiler.report():
+        logger.info(line, extra=KEEP_RECORD)
+    if shown > budget:
+        logger.warning(f'The welcome window was shown after {shown:.2f} seconds, over its {budget} seconds budget.')
+    if '--startup-report' in sys.argv:
+        QApplication.exit(1 if shown > budget else 0)
+
+
 def start_application():
     global game_window, logger, config, translations, language, thread
+    from GameWindow import GameWindow
     try:
 
         # Create and display the game window immediately after access verification
-        game_window = GameWindow(logger=logger, elements=config['elements'], translation=translations[language])
+        game_window = GameWindow(logger=logger, elements=config['elements'], translation=translations[language],
+                                 metrics=metrics)
         game_window.show()
         QApplication.processEvents()  # Force the window to display immediately
 
-        if verify_access():
+        # Done, the start button is only enabled once the access was verified
+        if startup.done() and startup.result():
             start_scrapping()
         else:
             logger.warning("Access Denied, You do not have permission to run this software.")
@@ -520,11 +706,13 @@ if __name__ == '__main__':
         try:
             initialize_logger()
             init_configurations()
+            log_pipeline.configure(config['logging']['per_call_site_rate_per_sec'],
+                                   config['logging']['per_call_site_burst'])
             if logger:
                 logger.info('Configurations file and translation were loaded successfully!')
             else:
                 print('Configurations file and translation were loaded successfully! But logger wasn\'t found')
-            initDB()
+            startup_profiler.mark('configurations loaded')
         except Exception as e:
             if logger:
                 logger.error(f'Failed to load system resources. Error : ${str(e)}')
@@ -535,12 +723,10 @@ if __name__ == '__main__':
             sys.exit(1)
         try:
             if config and config['url'] and config['username'] and config['password']:
-                if verify_access():
-                    open_welcome_window()
-                else:
-                    if game_window:
-                        game_window.close_windows()
-                    sys.exit(1)
+                # The access verification, the browser and the heavy imports run behind the welcome window
+                create_access_control()
+                threading.Thread(target=background_startup, name='BackgroundStartup', daemon=True).start()
+                open_welcome_window()
         except Exception as e:
             if logger:
                 logger.error(f'Received an error during system operation : ${str(e)}')
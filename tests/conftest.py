@@ -0,0 +1,20 @@
+import json
+import logging
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+
+@pytest.fixture
+def elements():
+    with open(os.path.join(ROOT, 'assets', 'config.json'), encoding='utf-8') as config_file:
+        return json.load(config_file)['elements']
+
+
+@pytest.fixture
+def logger():
+    return logging.getLogger('tests')
@@ -0,0 +1,44 @@
+import json
+
+from AccessControl import AccessControl
+
+
+class FakeCollection:
+    def __init__(self, document):
+        self.document = document
+
+    def find_one(self):
+        return self.document
+
+
+def access_control(logger, tmp_path, document=None, key_name='access.key'):
+    return AccessControl(logger, lambda: FakeCollection(document), str(tmp_path / 'access.json'),
+                         str(tmp_path / key_name), cache_ttl=600, revalidate_interval=300)
+
+
+def test_a_grant_is_cached_with_a_key_created_on_the_first_run(logger, tmp_path):
+    control = access_control(logger, tmp_path, {'access_allowed': True})
+
+    control.write_cache()
+
+    assert len((tmp_path / 'access.key').read_bytes()) == AccessControl.KEY_SIZE
+    assert access_control(logger, tmp_path).cached_grant_time() is not None
+
+
+def test_a_grant_signed_by_another_installation_is_ignored(logger, tmp_path):
+    access_control(logger, tmp_path).write_cache()
+
+    assert access_control(logger, tmp_path, key_name='other.key').cached_grant_time() is None
+    other_machine = access_control(logger, tmp_path)
+    other_machine.installation = '000000000000:someone'
+    assert other_machine.cached_grant_time() is None
+
+
+def test_an_edited_grant_is_ignored(logger, tmp_path):
+    control = access_control(logger, tmp_path)
+    control.write_cache()
+    cache = json.loads((tmp_path / 'access.json').read_text())
+    cache['checked_at'] += 3600
+    (tmp_path / 'access.json').write_text(json.dumps(cache))
+
+    assert control.cached_grant_time() is None
@@ -0,0 +1,38 @@
+import pytest
+
+from Backtester import backtest_partition, parse_grid
+from HistoryStore import HistoryStore
+
+START = 1767261600  # 2026-01-01 10:00 UTC, the same date in every timezone
+
+
+def write_history(logger, elements, directory):
+    """One game whose second total table offers an under of exactly 1.9, 10 points above its first total."""
+    store = HistoryStore(logger, str(directory), elements)
+    store.buffer('scores', START, 'NBA', 'A vs B', (0, 0, 'ATS', '10:00'))
+    store.buffer('scores', START + 100, 'NBA', 'A vs B', (10, 8, '1Q', '08:00'))
+    store.buffer('totals', START + 150, 'NBA', 'A vs B', ((0, 140.5, 1.85, 1.95),))
+    store.buffer('totals', START + 200, 'NBA', 'A vs B', ((0, 140.5, 1.85, 1.95), (1, 150.5, 1.95, 1.9)))
+    store.buffer('scores', START + 3000, 'NBA', 'A vs B', (70, 65, '4Q', '00:00'))
+    store.flush()
+    return store.partitions[next(iter(store.partitions))]['path']
+
+
+def test_parse_grid():
+    assert parse_grid('8:10:1') == [8, 9, 10]
+    assert parse_grid('1.7:1.8:0.05') == [1.7, 1.75, 1.8]
+    assert parse_grid('1.8,1.9') == [1.8, 1.9]
+
+
+def test_backtest_partition_marks_at_the_exact_threshold(logger, elements, tmp_path):
+    path = write_history(logger, elements, tmp_path)
+
+    league_name, results = backtest_partition(path, elements, [(10, 1.9), (10, 1.95), (11, 1.9)])
+
+    assert league_name == 'NBA'
+    result = results[(10, 1.9)]
+    assert (result['games'], result['marks'], result['settled'], result['wins']) == (1, 1, 1, 1)
+    assert result['profit'] == pytest.approx(0.9)
+    assert result['mark_quarters'] == {'1Q': 1}
+    assert results[(10, 1.95)]['marks'] == 0
+    assert results[(11, 1.9)]['marks'] == 0
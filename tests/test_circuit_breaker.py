@@ -0,0 +1,39 @@
+from CircuitBreaker import CircuitBreaker
+from Metrics import Metrics
+
+
+def breaker(logger, metrics):
+    return CircuitBreaker(logger, metrics, 'game', failure_threshold=3, cooldown=60)
+
+
+def test_circuit_opens_after_failures_in_a_row(logger):
+    metrics = Metrics()
+    circuit_breaker = breaker(logger, metrics)
+    circuit_breaker.record_failure('NBA/A vs B', now=100)
+    circuit_breaker.record_success('NBA/A vs B')
+    circuit_breaker.record_failure('NBA/A vs B', now=100)
+    circuit_breaker.record_failure('NBA/A vs B', now=100)
+    assert circuit_breaker.allow('NBA/A vs B', now=100)
+
+    circuit_breaker.record_failure('NBA/A vs B', now=100)
+
+    assert not circuit_breaker.allow('NBA/A vs B', now=159)
+    assert circuit_breaker.allow('NBA/C vs D', now=159)
+    assert metrics.counters == {('circuit_transitions_total', (('scope', 'game'), ('state', 'open'))): 1}
+
+
+def test_circuit_closes_on_success_after_cooldown(logger):
+    metrics = Metrics()
+    circuit_breaker = breaker(logger, metrics)
+    for _ in range(3):
+        circuit_breaker.record_failure('NBA/A vs B', now=100)
+    assert circuit_breaker.allow('NBA/A vs B', now=160)
+
+    # A failure of the trial reopens the circuit for another cooldown
+    circuit_breaker.record_failure('NBA/A vs B', now=160)
+    assert not circuit_breaker.allow('NBA/A vs B', now=219)
+    circuit_breaker.record_success('NBA/A vs B')
+
+    assert circuit_breaker.allow('NBA/A vs B', now=219)
+    assert metrics.counters[('circuit_transitions_total', (('scope', 'game'), ('state', 'closed')))] == 1
+    assert metrics.counters[('circuit_transitions_total', (('scope', 'game'), ('state', 'open')))] == 2
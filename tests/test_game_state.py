@@ -0,0 +1,28 @@
+from GameState import GameSchema, GameState
+
+
+def test_update_from_bumps_the_revision_only_on_changes():
+    game_state = GameState('A', 'B', 10, 8, '1Q', '08:30')
+
+    assert not game_state.update_from(GameState('A', 'B', 10, 8, '1Q', '08:30'))
+    assert game_state.revision == 0
+    assert game_state.update_from(GameState('A', 'B', 12, 8, '1Q', '08:10'))
+    assert (game_state.revision, game_state.total_score) == (1, 20)
+
+    newer = GameState('A', 'B', 14, 8, '1Q', '07:50')
+    newer.set_first_total(140.5, '1Q', '07:50')
+    assert game_state.update_from(newer)
+    assert (game_state.revision, game_state.first_total_score) == (2, 140.5)
+    assert not game_state.update_from(newer)
+
+
+def test_as_dict_uses_the_configured_field_names(elements):
+    schema = GameSchema(elements)
+    game_state = GameState('A', 'B', 10, 8, '1Q', '08:30')
+
+    game = game_state.as_dict(schema)
+
+    assert game[schema.first_team] == 'A'
+    assert game[schema.total_score] == 18
+    assert game[schema.first_total_score] is None
+    assert not hasattr(game_state, '__dict__')
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+
+from GameState import GameState
+from HistoryStore import HistoryStore
+
+
+def test_history_round_trip(logger, elements, tmp_path):
+    store = HistoryStore(logger, str(tmp_path), elements)
+    consts = elements['consts']
+    store.record_game('NBA', 'A vs B', GameState('A', 'B', 10, 8, '1Q', '08:30'))
+    store.record_game('NBA', 'A vs B', GameState('A', 'B', 10, 8, '1Q', '08:30'))  # Unchanged, dropped
+    store.record_game('NBA', 'C vs D', GameState('C', 'D', 0, 0, 'ATS', '--:--'))
+    store.record_totals('NBA', 'A vs B', [(0, 140.5, 1.85, 1.95), (1, 150.5, 1.95, 1.9)])
+    store.record_mark('NBA', 'A vs B', 140.5, {consts['curr_row_index']: 1, consts['total_text_value']: 150.5,
+                                                consts['over_text_value']: 1.95, consts['under_text_value']: 1.9})
+    store.flush()
+
+    [path] = [partition['path'] for partition in store.partitions.values()]
+    assert HistoryStore.partitions_of(str(tmp_path), os.path.basename(os.path.dirname(path))) == [path]
+    scores, dictionary = HistoryStore.load_partition(path, 'scores')
+    assert dictionary == {'league': 'NBA', 'games': ['A vs B', 'C vs D'], 'quarters': ['1Q', 'ATS']}
+    assert scores['game'].tolist() == [0, 1]
+    assert scores['first_team_score'].tolist() == [10, 0]
+    assert scores['quarter'].tolist() == [0, 1]
+    assert scores['seconds_left'].tolist() == [510, -1]
+    totals, _ = HistoryStore.load_partition(path, 'totals')
+    assert totals['row_index'].tolist() == [0, 1]
+    assert np.allclose(totals['under'], [1.95, 1.9])
+    marks, _ = HistoryStore.load_partition(path, 'marks')
+    assert marks['total'].tolist() == [150.5]
+
+
+def test_load_partition_cuts_a_truncated_batch(logger, elements, tmp_path):
+    store = HistoryStore(logger, str(tmp_path), elements)
+    store.record_game('NBA', 'A vs B', GameState('A', 'B', 10, 8, '1Q', '08:30'))
+    store.record_game('NBA', 'A vs B', GameState('A', 'B', 12, 8, '1Q', '08:10'))
+    store.flush()
+    [path] = [partition['path'] for partition in store.partitions.values()]
+    # The program stopped after appending the time column of a third row
+    with open(os.path.join(path, 'scores.time.bin'), 'ab') as column:
+        np.array([1.0], dtype='<f8').tofile(column)
+
+    scores, _ = HistoryStore.load_partition(path, 'scores')
+
+    assert all(len(column) == 2 for column in scores.values())
+    assert scores['first_team_score'].tolist() == [10, 12]
+    totals, _ = HistoryStore.load_partition(path, 'totals')
+    assert all(len(column) == 0 for column in totals.values())
+
+
+def test_forget_game_drops_the_last_values_of_an_ended_game(logger, elements, tmp_path):
+    store = HistoryStore(logger, str(tmp_path), elements)
+    store.record_game('NBA', 'A vs B', GameState('A', 'B', 10, 8, '1Q', '08:30'))
+    store.record_totals('NBA', 'A vs B', [(0, 140.5, 1.85, 1.95)])
+    store.record_game('NBA', 'C vs D', GameState('C', 'D', 2, 0, '1Q', '11:00'))
+    store.forget_game('NBA', 'A vs B')
+    store.flush()
+
+    assert list(store.last_values) == [('scores', 'NBA', 'C vs D')]
+    [path] = [partition['path'] for partition in store.partitions.values()]
+    scores, _ = HistoryStore.load_partition(path, 'scores')
+    assert scores['game'].tolist() == [0, 1]
@@ -0,0 +1,50 @@
+import io
+import json
+import logging
+
+from LogPipeline import KEEP_RECORD, JsonFormatter, LogPipeline
+
+
+def pipeline(name, rate_per_sec=5, burst=20):
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    return logger, LogPipeline(logger, [handler], rate_per_sec, burst), stream
+
+
+def records(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_exceptions_stay_structured():
+    logger, log_pipeline, stream = pipeline('tests.exceptions')
+    log_pipeline.start()
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception('Failed to read game %s', 'A vs B')
+    log_pipeline.stop()
+
+    [record] = records(stream)
+    assert record['message'] == 'Failed to read game A vs B'
+    assert record['level'] == 'ERROR'
+    assert record['exception'].startswith('Traceback') and 'ZeroDivisionError' in record['exception']
+
+
+def test_info_lines_are_rate_limited_per_call_site():
+    logger, log_pipeline, stream = pipeline('tests.rate_limit', rate_per_sec=0.001, burst=2)
+    log_pipeline.start()
+    for index in range(5):
+        logger.info(f'Collecting game {index}')
+        logger.warning(f'Game {index} failed')
+    logger.info('Marked game', extra=KEEP_RECORD)
+    log_pipeline.stop()
+
+    messages = [record['message'] for record in records(stream)]
+    assert [message for message in messages if message.startswith('Collecting')] == \
+        ['Collecting game 0', 'Collecting game 1']
+    assert len([message for message in messages if message.endswith('failed')]) == 5
+    assert messages[-1] == 'Marked game'
@@ -0,0 +1,18 @@
+from Metrics import Metrics
+
+
+class FakeDriver:
+    def execute(self, driver_command, params=None):
+        return {'value': None}
+
+
+def test_instrument_driver_counts_each_command_once():
+    metrics = Metrics()
+    driver = FakeDriver()
+    counter = metrics.instrument_driver(driver)
+
+    assert metrics.instrument_driver(driver) is counter
+    driver.execute('findElement')
+
+    assert counter.calls == 1
+    assert metrics.counters[('webdriver_calls_total', (('command', 'findElement'),))] == 1
@@ -0,0 +1,48 @@
+import base64
+import json
+
+from Metrics import Metrics
+from NetworkFeed import NetworkFeed
+
+FEED_CONFIG = {'url_pattern': '/api/live', 'max_silence_in_sec': 10,
+               'fields': {'games': 'events', 'id': 'id', 'league_name': 'league', 'first_team': 'home.name',
+                          'second_team': 'away.name', 'first_team_score': 'home.score',
+                          'second_team_score': 'away.score', 'quarter_number': 'period', 'time_left': 'clock',
+                          'totals': 'totals', 'total': 'line', 'over': 'over', 'under': 'under'}}
+
+
+def entry(method, **params):
+    return {'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+
+def frame(payload_data, opcode=1):
+    return entry('Network.webSocketFrameReceived', requestId='1',
+                 response={'opcode': opcode, 'payloadData': payload_data})
+
+
+class FakeDriver:
+    def __init__(self, entries):
+        self.entries = entries
+
+    def get_log(self, log_type):
+        entries, self.entries = self.entries, []
+        return entries
+
+
+def test_drain_skips_unreadable_frames_and_keeps_the_rest(logger):
+    metrics = Metrics()
+    game = {'events': [{'id': 7, 'league': 'NBA', 'home': {'name': 'A', 'score': 10}, 'away': {'name': 'B'},
+                        'totals': [{'line': '150.5', 'over': 1.9, 'under': 1.9}]}]}
+    driver = FakeDriver([entry('Network.webSocketCreated', requestId='1', url='wss://site/api/live'),
+                         frame(base64.b64encode(b'\x1f\x8b\x08\xff').decode(), opcode=2),
+                         frame('not base64 {', opcode=2),
+                         frame(json.dumps(game))])
+    network_feed = NetworkFeed(driver, logger, metrics, FEED_CONFIG)
+
+    payloads = network_feed.drain()
+
+    assert payloads == [json.dumps(game)]
+    assert metrics.counters == {('feed_frames_total', (('status', 'unreadable'),)): 2}
+    [read_game] = network_feed.read_games(payloads)
+    assert (read_game['first_team'], read_game['first_team_score']) == ('A', 10)
+    assert read_game['rows'] == [(0, 150.5, 1.9, 1.9)]
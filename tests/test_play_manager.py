@@ -0,0 +1,84 @@
+import itertools
+import time
+
+from PlayManager import PlayManager
+
+SCHEDULER_CONFIG = {'enabled': True, 'hot_interval_in_sec': 0, 'cold_interval_in_sec': 0,
+                    'hot_time_left_in_sec': 180, 'odds_moving_threshold': 1}
+CLICK_SECONDS = 0.02
+
+
+class FakeDriver:
+    current_url = '/sportsbook/live/events'
+
+    def execute(self, driver_command, params=None):
+        return {'value': None}
+
+    def execute_script(self, script, *args):
+        return []
+
+
+class FakeGameElement:
+    def __init__(self, opened, game_key):
+        self.opened = opened
+        self.game_key = game_key
+
+    def click(self):
+        time.sleep(CLICK_SECONDS)
+        self.opened.append(self.game_key)
+
+
+def snapshot(opened, league_count, games_per_league):
+    leagues = []
+    for league_index in range(league_count):
+        games = []
+        for game_index in range(games_per_league):
+            first_team, second_team = f'A{league_index}{game_index}', f'B{league_index}{game_index}'
+            games.append({'first_team': first_team, 'second_team': second_team, 'scores': ['40', '38'],
+                          'quarter_number': '2Q', 'time_left': '05:00',
+                          'element': FakeGameElement(opened, f'{first_team} vs {second_team}')})
+        leagues.append({'name': f'League {league_index}', 'expanded': True, 'header': None, 'games': games})
+    return leagues
+
+
+def play_manager(logger, elements, cycle_budget):
+    resilience_config = {'game_budget_in_sec': 1, 'cycle_budget_in_sec': cycle_budget, 'retry_backoff_in_sec': 0,
+                         'max_retry_backoff_in_sec': 0, 'failure_threshold': 3, 'cooldown_in_sec': 60}
+    return PlayManager(FakeDriver(), logger, 1, elements, 10, 1, None, use_dom_snapshot=True,
+                       scheduler_config=SCHEDULER_CONFIG, resilience_config=resilience_config)
+
+
+def test_every_game_is_read_within_a_few_cycles_when_the_budget_is_short(logger, elements, monkeypatch):
+    opened = []
+    leagues = snapshot(opened, league_count=3, games_per_league=3)
+    manager = play_manager(logger, elements, cycle_budget=CLICK_SECONDS * 2.5)
+    table_versions = itertools.count()
+    monkeypatch.setattr(manager.dom_snapshot, 'collect', lambda: leagues)
+    monkeypatch.setattr(manager.dom_snapshot, 'collect_total_rows',
+                        lambda: [(0, 140.5 + next(table_versions), 1.9, 1.9)])
+
+    manager.run_cycle()
+    # Every game is updated from the snapshot, though only a few of their total tables fit in the cycle
+    assert sum(len(games) for games in manager.basketballLeagues.values()) == 9
+    assert 0 < len(opened) < 9
+
+    for _ in range(4):
+        manager.run_cycle()
+
+    all_games = {game['element'].game_key for league in leagues for game in league['games']}
+    assert set(opened) == all_games
+    first_totals = [game.first_total_score for games in manager.basketballLeagues.values() for game in games.values()]
+    assert None not in first_totals
+
+
+def test_a_league_shard_is_applied_when_the_next_cycle_starts(logger, elements, monkeypatch):
+    manager = play_manager(logger, elements, cycle_budget=1)
+    monkeypatch.setattr(manager.dom_snapshot, 'collect', lambda: snapshot([], league_count=2, games_per_league=1))
+    monkeypatch.setattr(manager.dom_snapshot, 'collect_total_rows', lambda: [])
+
+    manager.set_league_shard(frozenset({'League 1'}))
+
+    assert manager.owns_league('League 0')
+    manager.run_cycle()
+    assert not manager.owns_league('League 0')
+    assert list(manager.basketballLeagues) == ['League 1']
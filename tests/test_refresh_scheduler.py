@@ -0,0 +1,64 @@
+from GameState import GameState
+from RefreshScheduler import RefreshScheduler
+
+SCHEDULER_CONFIG = {'enabled': True, 'hot_interval_in_sec': 0.5, 'cold_interval_in_sec': 15,
+                    'hot_time_left_in_sec': 180, 'odds_moving_threshold': 1}
+
+
+def game(quarter_number='2Q', time_left='05:00'):
+    return GameState('A', 'B', 40, 38, quarter_number, time_left)
+
+
+def scheduler(logger, elements, base_interval=5):
+    return RefreshScheduler(logger, elements, base_interval, SCHEDULER_CONFIG)
+
+
+def test_next_wakeup_waits_for_the_first_due_game(logger, elements):
+    refresh_scheduler = scheduler(logger, elements)
+    refresh_scheduler.game_polled('A vs B', game(), False, now=100)
+    refresh_scheduler.game_polled('C vs D', game(), True, now=100)
+
+    assert refresh_scheduler.next_wakeup(5, now=100) == 0.5
+    assert refresh_scheduler.next_wakeup(0.2, now=100) == 0.2
+
+
+def test_next_wakeup_never_spins_on_a_game_still_due(logger, elements):
+    refresh_scheduler = scheduler(logger, elements)
+    refresh_scheduler.game_polled('A vs B', game(), False, now=100)
+
+    assert refresh_scheduler.next_wakeup(5, now=200) == 0.5
+
+
+def test_reschedule_due_polls_the_games_a_feed_did_not_change(logger, elements):
+    refresh_scheduler = scheduler(logger, elements)
+    refresh_scheduler.game_polled('A vs B', game(), False, now=100)
+    refresh_scheduler.game_polled('C vs D', game(quarter_number='ATS'), False, now=100)
+    leagues = {'NBA': {'A vs B': game(), 'C vs D': game(quarter_number='ATS')}}
+
+    refresh_scheduler.reschedule_due(leagues, {}, now=106)
+
+    assert refresh_scheduler.game_due == {'A vs B': 111, 'C vs D': 115}
+    assert not refresh_scheduler.is_due('A vs B', now=110)
+
+
+def test_decide_by_game_state(logger, elements):
+    refresh_scheduler = scheduler(logger, elements)
+
+    assert refresh_scheduler.decide('A vs B', game(), True)[2] == 'marked'
+    assert refresh_scheduler.decide('A vs B', game(quarter_number='ATS'), False)[2] == 'not started'
+    assert refresh_scheduler.decide('A vs B', game(quarter_number='NS'), False)[2] == 'not started'
+    assert refresh_scheduler.decide('A vs B', game(quarter_number='2Q B'), False)[2] == 'break'
+    assert refresh_scheduler.decide('A vs B', game(quarter_number='4Q', time_left='02:30'), False)[2] == \
+        'closing minutes'
+    assert refresh_scheduler.decide('A vs B', game(quarter_number='1OT', time_left='02:00'), False)[2] == \
+        'closing minutes'
+    assert refresh_scheduler.decide('A vs B', game(quarter_number='4Q', time_left='05:00'), False) == \
+        (5, RefreshScheduler.NORMAL, 'in play')
+
+
+def test_decide_hot_while_the_odds_move(logger, elements):
+    refresh_scheduler = scheduler(logger, elements)
+    refresh_scheduler.record_odds('A vs B', [(0, 150.5, 1.9, 1.9)])
+    refresh_scheduler.record_odds('A vs B', [(0, 151.5, 1.85, 1.95)])
+
+    assert refresh_scheduler.decide('A vs B', game(), False) == (0.5, RefreshScheduler.HOT, 'odds moving')
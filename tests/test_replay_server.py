@@ -0,0 +1,27 @@
+import gzip
+import json
+import urllib.parse
+import urllib.request
+
+from ReplayServer import ReplayServer
+
+
+def test_login_form_submits_and_redirects_to_the_live_events(logger, elements, tmp_path):
+    archive_path = str(tmp_path / 'capture.jsonl.gz')
+    with gzip.open(archive_path, 'wt', encoding='utf-8') as archive:
+        archive.write(json.dumps({'t': 0, 'type': 'page', 'html': '<html><body></body></html>'}) + '\n')
+    replay = ReplayServer(logger, archive_path, elements)
+    replay.start()
+    try:
+        consts = elements['consts']
+        login_page = urllib.request.urlopen(replay.url(ReplayServer.LOGIN_PATH)).read().decode('utf-8')
+        assert f'method="post" action="{ReplayServer.LOGIN_PATH}"' in login_page
+
+        credentials = urllib.parse.urlencode({consts['login_username_element_name']: 'user',
+                                              consts['login_password_element_name']: 'password'}).encode('utf-8')
+        response = urllib.request.urlopen(replay.url(ReplayServer.LOGIN_PATH), data=credentials)
+
+        assert response.status == 200
+        assert response.geturl() == replay.url(consts['live_events_suffix'])
+    finally:
+        replay.stop()
@@ -0,0 +1,58 @@
+import asyncio
+
+from Metrics import Metrics
+from ScrapePipeline import ScrapePipeline, Sink, merge_deltas
+from StatePublisher import StateDelta
+
+PIPELINE_CONFIG = {'ui_ack_timeout_in_sec': 1, 'alert_command': 'true', 'ui_queue_size': 1, 'alert_queue_size': 2}
+
+
+def delta(version, games=(), marks=(), removed_marks=()):
+    return StateDelta(version, (), tuple(('NBA', game_key, {'version': version}) for game_key in games), (),
+                      tuple((game_key, {'version': version}) for game_key in marks), tuple(removed_marks),
+                      f'snapshot {version}')
+
+
+def pipeline(logger, metrics):
+    scrape_pipeline = ScrapePipeline(logger, metrics, PIPELINE_CONFIG)
+    for sink in scrape_pipeline.sinks:
+        sink.ready = asyncio.Event()
+    return scrape_pipeline
+
+
+def test_merge_deltas_keeps_the_latest_change_of_both():
+    merged = merge_deltas(delta(1, games=['A vs B', 'C vs D'], marks=['A vs B'], removed_marks=['E vs F']),
+                          delta(2, games=['A vs B'], marks=['C vs D'], removed_marks=['E vs F']))
+
+    assert merged.version == 2 and merged.snapshot == 'snapshot 2'
+    assert merged.games_updated == (('NBA', 'A vs B', {'version': 2}), ('NBA', 'C vs D', {'version': 1}))
+    assert merged.marks_added == (('A vs B', {'version': 1}), ('C vs D', {'version': 2}))
+    assert merged.marks_removed == ('E vs F',)
+
+
+def test_dispatch_drops_or_coalesces_per_sink(logger):
+    metrics = Metrics()
+    scrape_pipeline = pipeline(logger, metrics)
+    ui_sink, alert_sink = scrape_pipeline.sinks
+    assert (ui_sink.policy, alert_sink.policy) == (Sink.DROP_OLDEST, Sink.COALESCE)
+
+    for version in range(1, 5):
+        scrape_pipeline.dispatch(delta(version, marks=[f'game {version}']))
+
+    assert list(ui_sink.queue) == [delta(4, marks=['game 4'])]
+    assert [queued.version for queued in alert_sink.queue] == [1, 4]
+    assert [game_key for game_key, _ in alert_sink.queue[1].marks_added] == ['game 2', 'game 3', 'game 4']
+    assert metrics.counters == {('pipeline_dropped_total', (('sink', 'ui'),)): 3,
+                                ('pipeline_coalesced_total', (('sink', 'alerts'),)): 2}
+
+
+def test_a_coalescing_sink_does_not_change_what_the_next_sinks_get(logger):
+    scrape_pipeline = pipeline(logger, Metrics())
+    scrape_pipeline.sinks.reverse()
+    alert_sink, ui_sink = scrape_pipeline.sinks
+
+    for version in range(1, 4):
+        scrape_pipeline.dispatch(delta(version, marks=[f'game {version}']))
+
+    assert list(ui_sink.queue) == [delta(3, marks=['game 3'])]
+    assert len(alert_sink.queue[1].marks_added) == 2
@@ -0,0 +1,49 @@
+import pytest
+
+from GameState import GameSchema, GameState
+from StatePublisher import StatePublisher
+
+
+def game(first_team_score=40):
+    return GameState('A', 'B', first_team_score, 38, '2Q', '05:00')
+
+
+def test_publish_versions_and_deltas(elements):
+    schema = GameSchema(elements)
+    publisher = StatePublisher(schema)
+    first_game, second_game = game(), game()
+    leagues = {'NBA': {'A vs B': first_game, 'C vs D': second_game}}
+
+    first = publisher.publish(leagues, {})
+    assert first.version == 1 and first.snapshot.version == 1
+    assert [game_key for _, game_key, _ in first.games_added] == ['A vs B', 'C vs D']
+    assert publisher.publish(leagues, {}) is None
+
+    first_game.update_from(game(42))
+    mark = {schema.league_name: 'NBA', schema.selected_row_field: {'Total': 150.5}}
+    second = publisher.publish(leagues, {'A vs B': mark})
+    assert second.version == 2
+    assert [(league_name, game_key) for league_name, game_key, _ in second.games_updated] == [('NBA', 'A vs B')]
+    assert second.snapshot.leagues['NBA']['A vs B'][schema.first_team_score] == 42
+    assert [game_key for game_key, _ in second.marks_added] == ['A vs B']
+    # Unchanged games are shared with the previous snapshot
+    assert second.snapshot.leagues['NBA']['C vs D'] is first.snapshot.leagues['NBA']['C vs D']
+
+    del leagues['NBA']['C vs D']
+    third = publisher.publish(leagues, {})
+    assert third.version == 3
+    assert third.games_removed == (('NBA', 'C vs D'),)
+    assert third.marks_removed == ('A vs B',)
+
+
+def test_snapshots_are_read_only(elements):
+    schema = GameSchema(elements)
+    mark = {schema.league_name: 'NBA', schema.selected_row_field: {'Total': 150.5}}
+    delta = StatePublisher(schema).publish({'NBA': {'A vs B': game()}}, {'A vs B': mark})
+
+    with pytest.raises(TypeError):
+        delta.snapshot.leagues['NBA']['A vs B'][schema.first_team_score] = 0
+    with pytest.raises(TypeError):
+        delta.snapshot.marked_games['A vs B'][schema.selected_row_field]['Total'] = 0
+    mark[schema.selected_row_field]['Total'] = 0
+    assert delta.snapshot.marked_games['A vs B'][schema.selected_row_field]['Total'] == 150.5
@@ -0,0 +1,43 @@
+import random
+
+from TotalsRule import TotalsRule
+
+
+def rule(elements, point_difference=10, min_under_value=1.8):
+    return TotalsRule(point_difference, {'consts': dict(elements['consts'], min_under_value=min_under_value)})
+
+
+def test_select_row_takes_the_first_minimal_under(elements):
+    totals_rule = rule(elements)
+    rows = [(0, 140.5, 1.9, 1.9), (1, 150.5, 2.0, 1.85), (2, 151.5, 2.0, 1.85), (3, 152.5, 2.1, 1.7)]
+
+    selected = totals_rule.select_row(rows, 140.5)
+
+    consts = elements['consts']
+    assert selected == {consts['total_text_value']: 150.5, consts['over_text_value']: 2.0,
+                        consts['under_text_value']: 1.85, consts['curr_row_index']: 1}
+    assert totals_rule.select_rows([rows], [140.5]) == [selected]
+
+
+def test_select_row_rejects_unsuitable_rows(elements):
+    totals_rule = rule(elements)
+
+    assert totals_rule.select_row([(0, 149.5, 2.0, 1.9), (1, 155.5, 1.7, 1.75)], 140.5) is None
+    assert totals_rule.select_row([(0, 155.5, 2.0, 1.9)], None) is None
+    assert totals_rule.select_rows([[(0, 149.5, 2.0, 1.9)], [(0, 155.5, 2.0, 1.9)], []], [140.5, None, 140.5]) == \
+        [None, None, None]
+
+
+def test_select_rows_matches_select_row(elements):
+    generator = random.Random(7)
+    totals_rule = rule(elements)
+    games_rows, first_totals = [], []
+    for _ in range(300):
+        first_total = generator.choice([None, 130.5, 140.5, 150.5])
+        rows = [(row_index, generator.choice([135.5, 140.5, 145.5, 150.5, 160.5]), 1.9,
+                 generator.choice([1.7, 1.8, 1.85, 1.9, 2.0])) for row_index in range(generator.randint(0, 8))]
+        games_rows.append(rows)
+        first_totals.append(first_total)
+
+    assert totals_rule.select_rows(games_rows, first_totals) == \
+        [totals_rule.select_row(rows, first_total) for rows, first_total in zip(games_rows, first_totals)]